@@ -0,0 +1,10 @@
+"""
+Solving, generating, and checking sudoku puzzles.
+
+Nothing in this package imports pygame except sudoku.gui, which is only imported to open the window, so worker
+processes and command line tools start without it. Command line tools import argparse in their main() for the same
+reason. `python -m sudoku benchmark imports` checks how long importing each module takes.
+"""
+
+from .board import Board
+from .solver import count_solutions, iter_solutions, new_random_board, solve
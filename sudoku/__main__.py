@@ -0,0 +1,47 @@
+import importlib
+import sys
+
+
+# The module and function each command runs, and what it does. A module is only imported when its command is run, so
+# e.g. solving a batch never imports pygame.
+COMMANDS = {
+    'solve': ('parallel', 'main', "solve one puzzle, on several processes with -w"),
+    'batch': ('batch', 'main', "solve a file of puzzles on a process pool"),
+    'generate': ('generator', 'main', "generate puzzles with a unique solution and a difficulty"),
+    'store': ('store', 'main', "build or inspect a store of generated puzzles"),
+    'check': ('vectorized', 'main', "validate or solve a file of puzzles with NumPy"),
+    'serve': ('server', 'main', "serve the solver over TCP"),
+    'load-test': ('load_test', 'main', "time requests against a solving server"),
+    'benchmark': ('benchmark', 'main', "benchmark the solvers, engines, and import times"),
+    'gui': ('gui.solver_gui', 'cli', "play boards and watch them being solved in a window (needs pygame)"),
+}
+
+
+def main(argv=None):
+    """
+    Runs one command of the command line, e.g. python -m sudoku batch puzzles.txt.
+
+    Parameters:
+        argv (List of str): The command and its arguments. Defaults to the arguments of the process.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m sudoku', description="Solve, generate, and check sudoku puzzles.",
+        epilog="commands:\n" + '\n'.join('  {:<11}{}'.format(name, command[2]) for name, command in COMMANDS.items())
+        + "\n\nRun python -m sudoku <command> -h for the arguments of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help="the command to run, listed below")
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help="the arguments of the command")
+    args = parser.parse_args(argv)
+
+    module_name, function_name, _ = COMMANDS[args.command]
+    module = importlib.import_module('.' + module_name, __package__)
+    # The command parses its own arguments, and names itself in its usage and errors.
+    sys.argv = ['python -m sudoku ' + args.command] + args.arguments
+    getattr(module, function_name)()
+
+
+if __name__ == '__main__':
+    main()
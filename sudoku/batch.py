@@ -0,0 +1,153 @@
+import collections
+
+from . import formats, solver
+from .board import Board
+
+
+# The solution cache of this process, made by the first chunk which asks for one.
+_cache = None
+
+
+def read_puzzles(lines):
+    """
+    Reads puzzles from lines of text, one puzzle per line.
+
+    Blank lines and lines starting with # are skipped.
+
+    Parameters:
+        lines (Iterable of str): The lines to read, e.g. an open file.
+
+    Yields:
+        str: Each puzzle with surrounding whitespace removed.
+    """
+
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def solve_string(puzzle, engine=None, cache=None):
+    """
+    Solves a puzzle given as a string with one character per cell, e.g. 81 characters for a 9x9 board.
+
+    Parameters:
+        puzzle (str or Board): The numbers of the board in row-major order, with 0 or . for empty cells and the
+            letters A-P for the numbers 10-25, or a board as read by formats.read_puzzles(), which is left unchanged.
+        engine (str): The name of the solving engine to use. None for the default engine for the size of board.
+        cache (SolutionCache): Solutions of earlier puzzles to check first. None to always search.
+
+    Returns:
+        str: The solved board as a string in the same form. Returns None if the puzzle has no solution.
+    """
+
+    board = puzzle.copy() if isinstance(puzzle, Board) else Board.from_string(puzzle)
+    if not solver.solve(board, engine, cache=cache):
+        return None
+    return board.to_string()
+
+
+def _solve_chunk(args):
+    """Solves a list of puzzles in a worker process."""
+    global _cache
+    puzzles, engine, cache_size, canonical = args
+    if cache_size and (_cache is None or _cache.maxsize != cache_size or _cache.canonical != canonical):
+        from .cache import SolutionCache
+        _cache = SolutionCache(cache_size, canonical)
+    cache = _cache if cache_size else None
+    return [solve_string(puzzle, engine, cache) for puzzle in puzzles]
+
+
+def _chunks(puzzles, chunk_size, engine, cache_size, canonical):
+    """Groups puzzles into lists of chunk_size so they can be sent to the workers in one message."""
+    chunk = []
+    for puzzle in puzzles:
+        chunk.append(puzzle)
+        if len(chunk) == chunk_size:
+            yield chunk, engine, cache_size, canonical
+            chunk = []
+    if chunk:
+        yield chunk, engine, cache_size, canonical
+
+
+def solve_many(puzzles, workers=None, chunk_size=256, engine=None, cache_size=0, canonical=False):
+    """
+    Solves many puzzles, spread across a pool of worker processes.
+
+    Puzzles are read lazily and sent to the workers in chunks, and only a few chunks are waiting for the workers at
+    a time, so puzzles can be streamed from a file of any size in constant memory.
+
+    Parameters:
+        puzzles (Iterable of str or Board): The puzzles as strings, with 0 or . for empty cells, or as boards.
+        workers (int): The number of worker processes. Defaults to the number of CPUs. With 1 worker the puzzles
+            are solved in the calling process.
+        chunk_size (int): How many puzzles are sent to a worker at a time.
+        engine (str): The name of the solving engine to use. None for the default engine for the size of board.
+        cache_size (int): How many solutions each worker keeps in a SolutionCache, so that repeated puzzles sent to
+            the same worker are not solved again. 0 for no cache.
+        canonical (bool): Also find puzzles in the cache which are equivalent to cached ones, as in SolutionCache.
+
+    Yields:
+        str: The solution of each puzzle as a string, in the same order as the input. None is yielded for a puzzle
+            with no solution.
+    """
+
+    import multiprocessing
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    chunks = _chunks(puzzles, chunk_size, engine, cache_size, canonical)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk)
+        return
+
+    # Pool.imap() would read every chunk ahead of the workers, so chunks are sent one at a time as results come back.
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_solve_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve a file of sudoku puzzles, one puzzle per line.")
+    parser.add_argument('input', help="file of puzzles, or - for standard input; may be compressed with gzip")
+    parser.add_argument('-o', '--output', default='-',
+                        help="file to write the solutions to, compressed if it ends with .gz (default: stdout)")
+    parser.add_argument('-f', '--format', choices=formats.FORMATS, default=None,
+                        help="format of the input (default: guessed from its name)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=256, help="puzzles sent to a worker at a time")
+    parser.add_argument('--engine', default=None, choices=list(solver.ENGINES),
+                        help="solving engine (default: bitmask for 9x9 boards, dlx for larger ones)")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="solutions each worker caches to answer repeated puzzles (default: 0)")
+    parser.add_argument('--canonical', action='store_true',
+                        help="also answer puzzles equivalent to cached ones, at about 2ms for each puzzle not cached")
+    args = parser.parse_args()
+
+    in_file = formats.open_file(args.input)
+    out_file = formats.open_file(args.output, 'w')
+    try:
+        puzzles = formats.read_puzzles(in_file, args.format or formats.guess_format(args.input))
+        solutions = solve_many(puzzles, args.workers, args.chunk_size, args.engine, args.cache_size, args.canonical)
+        for solution in solutions:
+            out_file.write((solution or 'unsolvable').encode('ascii') + b'\n')
+    finally:
+        if args.input != '-':
+            in_file.close()
+        if args.output != '-':
+            out_file.close()
+        else:
+            out_file.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,456 @@
+import compileall
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import batch, solver
+
+
+# Puzzles which every engine can solve in a reasonable amount of time, from easy boards to ones which send the naive
+# backtracker into long searches. Empty cells are 0.
+PUZZLES = [
+    "003020600900305001001806400008102900700000008006708200002609500800203009005010300",
+    "200080300060070084030500209000105408000000000402706000301007040720040060004010003",
+    "480006902002008001900370060840010200003704100001060049020085007700900600609200018",
+    "030050040008010500460000012070502080000603000040109030250000098001020600080060020",
+    "043080250600000000000001094900004070000608000010200003820500000000000005034090710",
+    "001900003900700160030005007050000009004302600200000070600100030042007006500006800",
+    "000000907000420180000705026100904000050000040000507009920108000034059000507000000",
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "100920000524010000000000070050008102000000000402700090060000000000030945000071006",
+    "000900002050123400030000160908000000070000090000000205091000050007439020400007000",
+]
+
+# The bundled puzzle corpora, one 81 character puzzle per line.
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzles')
+CORPORA = ('easy', 'hard', '17clue')
+
+# Tracing allocations slows code down several times, so peak memory is measured on the first few inputs only.
+MEMORY_SAMPLE = 10
+
+# The metric a regression is judged on, and whether a higher value of it is better.
+REGRESSION_METRIC = ('puzzles_per_sec', True)
+
+# The modules which worker processes and the command line tools start by importing. None of them may import pygame,
+# and starting a process which imports one of them should take no longer than STARTUP_BUDGET_MS. The server is left
+# out: it starts once and runs for a long time, and asyncio alone takes most of the budget to import.
+STARTUP_MODULES = ('sudoku', 'sudoku.solver', 'sudoku.formats', 'sudoku.batch', 'sudoku.generator', 'sudoku.parallel',
+                   'sudoku.store', 'sudoku.__main__')
+STARTUP_BUDGET_MS = 100
+
+# The directory the sudoku package is in, which the processes timed by time_startup() import it from by default.
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The code run by time_startup(), which prints how long the import took and whether pygame was imported.
+_STARTUP_CODE = ("import sys, time; start = time.perf_counter(); import {}; "
+                 "print(time.perf_counter() - start, 'pygame' in sys.modules)")
+
+
+def load_corpus(name):
+    """
+    Reads one of the bundled puzzle corpora.
+
+    Parameters:
+        name (str): The name of the corpus, one of CORPORA.
+
+    Returns:
+        List of str: The puzzles as 81 character strings.
+    """
+
+    with open(os.path.join(CORPUS_DIR, name + '.txt')) as corpus_file:
+        return list(batch.read_puzzles(corpus_file))
+
+
+def percentile(sorted_values, fraction):
+    """
+    Finds a percentile of some values using the nearest rank.
+
+    Parameters:
+        sorted_values (List of float): The values in ascending order.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The smallest value which at least the given fraction of the values are less than or equal to.
+    """
+
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies):
+    """
+    Summarizes the time each call of a benchmark took.
+
+    Parameters:
+        latencies (List of float): The time in seconds of each call.
+
+    Returns:
+        dict: The number of calls, calls per second, and the mean, p50, p95, p99, and max latency in milliseconds.
+    """
+
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'puzzles_per_sec': len(ordered) / total if total else float('inf'),
+        'mean_ms': total / len(ordered) * 1000,
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def time_calls(function, inputs):
+    """
+    Calls a function once for every input and times each call.
+
+    Parameters:
+        function (Callable): The function to benchmark. It is given one input per call.
+        inputs (List): The inputs, which are prepared before timing starts.
+
+    Returns:
+        List of float: The time in seconds of each call.
+    """
+
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def peak_memory(function, inputs):
+    """
+    Measures the most memory a function allocates while working through its inputs.
+
+    Parameters:
+        function (Callable): The function to benchmark. It is given one input per call.
+        inputs (List): The inputs, which are prepared before measuring starts.
+
+    Returns:
+        int: The peak number of bytes allocated, measured with tracemalloc.
+    """
+
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            function(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_corpus(name, puzzles, seed):
+    """
+    Benchmarks solve() and random_solve() on a corpus of puzzles.
+
+    Nodes are counted by solving each puzzle again with a SearchStats, so that counting does not affect the timings.
+
+    Parameters:
+        name (str): The name of the corpus, used in the result keys.
+        puzzles (List of str): The puzzles as 81 character strings.
+        seed (int): The seed for random_solve(), so that runs are comparable.
+
+    Returns:
+        dict: The results for 'solve/<name>' and 'random_solve/<name>'.
+    """
+
+    results = {}
+
+    boards = [solver.board_from_string(puzzle) for puzzle in puzzles]
+    stats = summarize(time_calls(solver.solve, boards))
+    nodes = []
+    backtracks = 0
+    for puzzle in puzzles:
+        search_stats = solver.SearchStats()
+        solver.solve(solver.board_from_string(puzzle), stats=search_stats)
+        nodes.append(search_stats.nodes)
+        backtracks += search_stats.backtracks
+    stats['nodes_total'] = sum(nodes)
+    stats['nodes_max'] = max(nodes)
+    stats['backtracks_total'] = backtracks
+    stats['peak_memory_bytes'] = peak_memory(solver.solve, [solver.board_from_string(puzzle)
+                                                            for puzzle in puzzles[:MEMORY_SAMPLE]])
+    results['solve/' + name] = stats
+
+    random.seed(seed)
+    boards = [solver.board_from_string(puzzle) for puzzle in puzzles]
+    stats = summarize(time_calls(solver.random_solve, boards))
+    random.seed(seed)
+    boards = [solver.board_from_string(puzzle) for puzzle in puzzles[:MEMORY_SAMPLE]]
+    stats['peak_memory_bytes'] = peak_memory(solver.random_solve, boards)
+    results['random_solve/' + name] = stats
+    return results
+
+
+def benchmark_generator(count, num_clues, seed):
+    """
+    Benchmarks new_random_board().
+
+    Parameters:
+        count (int): How many boards to generate.
+        num_clues (int): The number of clues of each board.
+        seed (int): The seed for the random module, so that runs are comparable.
+
+    Returns:
+        dict: The results for 'new_random_board/<num_clues>'.
+    """
+
+    random.seed(seed)
+    stats = summarize(time_calls(solver.new_random_board, [num_clues] * count))
+    random.seed(seed)
+    stats['peak_memory_bytes'] = peak_memory(solver.new_random_board, [num_clues] * min(count, MEMORY_SAMPLE))
+    return {'new_random_board/{}'.format(num_clues): stats}
+
+
+def run_suite(corpora, generate_count, num_clues, seed):
+    """
+    Runs the whole benchmark suite.
+
+    Parameters:
+        corpora (List of str): The names of the corpora to solve.
+        generate_count (int): How many boards new_random_board() generates. 0 to skip it.
+        num_clues (int): The number of clues of each generated board.
+        seed (int): The seed for the random parts of the suite.
+
+    Returns:
+        dict: The environment the suite ran in and the results of each benchmark.
+    """
+
+    results = {}
+    for name in corpora:
+        results.update(benchmark_corpus(name, load_corpus(name), seed))
+    if generate_count:
+        results.update(benchmark_generator(generate_count, num_clues, seed))
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Compares two runs of the suite and finds the benchmarks which got slower.
+
+    Parameters:
+        baseline (dict): The results of the earlier run, as returned by run_suite().
+        current (dict): The results of the later run.
+        threshold (float): How much slower a benchmark may get before it counts as a regression, e.g. 0.1 for 10%.
+
+    Returns:
+        List of tuple: Contains (name, baseline value, current value, change) for every benchmark in both runs, where
+            change is the fractional slowdown (negative if it got faster).
+        List of str: The names of the benchmarks which regressed.
+    """
+
+    metric, higher_is_better = REGRESSION_METRIC
+    rows = []
+    regressions = []
+    for name, old_stats in sorted(baseline['results'].items()):
+        new_stats = current['results'].get(name)
+        if new_stats is None:
+            continue
+        old = old_stats[metric]
+        new = new_stats[metric]
+        change = (old / new - 1) if higher_is_better else (new / old - 1)
+        rows.append((name, old, new, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def run_engines(puzzles, engines, repeat=1):
+    """
+    Solves every puzzle with every engine, checking that all engines agree on the solution.
+
+    Parameters:
+        puzzles (List of str): The puzzles to solve as 81 character strings.
+        engines (List of str): The names of the engines to compare.
+        repeat (int): How many times each puzzle is solved by each engine. The fastest time is kept.
+
+    Returns:
+        List of List of float: The time in seconds each engine took for each puzzle, one row per puzzle.
+    """
+
+    results = []
+    for puzzle in puzzles:
+        times = []
+        expected = None
+        for engine in engines:
+            best = None
+            for _ in range(repeat):
+                board = solver.board_from_string(puzzle)
+                start = time.perf_counter()
+                solved = solver.solve(board, engine)
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best:
+                    best = elapsed
+
+            answer = board if solved else None
+            if expected is None:
+                expected = answer
+            elif answer != expected:
+                raise AssertionError("Engine {!r} disagrees with {!r} on {}".format(engine, engines[0], puzzle))
+            times.append(best)
+        results.append(times)
+    return results
+
+
+def time_startup(module, repeat=5, root=PACKAGE_ROOT):
+    """
+    Times starting a new Python process which imports a module, the way a worker process or a command does.
+
+    Parameters:
+        module (str): The name of the module to import.
+        repeat (int): How many processes to start. The fastest times are kept.
+        root (str): The directory to import the sudoku package from.
+
+    Returns:
+        dict: The fastest time in milliseconds of the whole process ('process_ms') and of the import alone
+            ('import_ms'), and whether the import pulled in pygame ('pygame').
+    """
+
+    process_ms = import_ms = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', _STARTUP_CODE.format(module)], cwd=root,
+                                stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.split()
+        elapsed = (time.perf_counter() - start) * 1000
+        if process_ms is None or elapsed < process_ms:
+            process_ms = elapsed
+        elapsed = float(output[-2]) * 1000
+        if import_ms is None or elapsed < import_ms:
+            import_ms = elapsed
+    return {'process_ms': process_ms, 'import_ms': import_ms, 'pygame': output[-1] == 'True'}
+
+
+def print_suite(report):
+    """Prints the results of run_suite() as a table."""
+    print('{:<26}{:>8}{:>12}{:>10}{:>10}{:>10}{:>12}{:>12}'.format(
+        'benchmark', 'count', 'puzzles/s', 'p50 ms', 'p95 ms', 'p99 ms', 'nodes', 'peak KiB'))
+    for name, stats in sorted(report['results'].items()):
+        print('{:<26}{:>8}{:>12.1f}{:>10.3f}{:>10.3f}{:>10.3f}{:>12}{:>12.1f}'.format(
+            name, stats['count'], stats['puzzles_per_sec'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'],
+            stats.get('nodes_total', '-'), stats['peak_memory_bytes'] / 1024))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the sudoku solvers and generator.")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help="run the benchmark suite on the bundled corpora")
+    run_parser.add_argument('--corpora', nargs='+', default=list(CORPORA), choices=CORPORA,
+                            help="corpora to solve (default: all)")
+    run_parser.add_argument('--generate', type=int, default=50, help="boards for new_random_board() to generate")
+    run_parser.add_argument('--clues', type=int, default=30, help="clues of each generated board")
+    run_parser.add_argument('--seed', type=int, default=0, help="seed for the random parts of the suite")
+    run_parser.add_argument('-o', '--output', help="file to write the results to as JSON")
+    run_parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    run_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="slowdown which counts as a regression (default: 0.10)")
+
+    compare_parser = subparsers.add_parser('compare', help="compare two JSON results files")
+    compare_parser.add_argument('baseline', help="JSON results of the earlier run")
+    compare_parser.add_argument('current', help="JSON results of the later run")
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="slowdown which counts as a regression (default: 0.10)")
+
+    engines_parser = subparsers.add_parser('engines', help="compare the solving engines head to head")
+    engines_parser.add_argument('--engines', nargs='+', default=list(solver.ENGINES), choices=list(solver.ENGINES),
+                                help="engines to compare (default: all)")
+    engines_parser.add_argument('--repeat', type=int, default=3, help="solves per puzzle and engine, fastest is kept")
+
+    imports_parser = subparsers.add_parser('imports', help="time starting a process which imports each module")
+    imports_parser.add_argument('modules', nargs='*', default=list(STARTUP_MODULES),
+                                help="modules to import (default: the headless modules)")
+    imports_parser.add_argument('--repeat', type=int, default=5, help="processes per module, fastest is kept")
+    imports_parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS,
+                                help="most milliseconds a process may take to start (default: {})".format(
+                                    STARTUP_BUDGET_MS))
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(2)
+
+    if args.command == 'engines':
+        results = run_engines(PUZZLES, args.engines, args.repeat)
+        print(' '.join(['puzzle'.ljust(9)] + [engine.rjust(14) for engine in args.engines]))
+        for n, times in enumerate(results):
+            print(' '.join([str(n + 1).ljust(9)] + ['{:12.2f}ms'.format(t * 1000) for t in times]))
+        totals = [sum(times[i] for times in results) for i in range(len(args.engines))]
+        print(' '.join(['total'.ljust(9)] + ['{:12.2f}ms'.format(t * 1000) for t in totals]))
+        return
+
+    if args.command == 'imports':
+        # Time importing compiled modules, as after an install, rather than compiling them. A copy of the package is
+        # compiled, so that nothing is written into the source tree.
+        with tempfile.TemporaryDirectory() as root:
+            package = os.path.join(root, 'sudoku')
+            shutil.copytree(os.path.dirname(os.path.abspath(__file__)), package,
+                            ignore=shutil.ignore_patterns('__pycache__'))
+            compileall.compile_dir(package, quiet=1)
+            startup = time_startup('sys', args.repeat, root)['process_ms']
+            print("python starts in {:.1f}ms\n".format(startup))
+            print('{:<20}{:>12}{:>12}{:>8}'.format('module', 'import ms', 'process ms', 'pygame'))
+            failures = []
+            for module in args.modules:
+                stats = time_startup(module, args.repeat, root)
+                flag = ''
+                if stats['process_ms'] > args.budget:
+                    flag = '  OVER BUDGET'
+                if stats['pygame']:
+                    flag += '  IMPORTS PYGAME'
+                if flag:
+                    failures.append(module)
+                print('{:<20}{:>12.1f}{:>12.1f}{:>8}{}'.format(module, stats['import_ms'], stats['process_ms'],
+                                                               'yes' if stats['pygame'] else 'no', flag))
+        if failures:
+            print("\n{} module(s) took more than {:g}ms to start or imported pygame".format(len(failures), args.budget))
+            sys.exit(1)
+        return
+
+    if args.command == 'compare':
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        with open(args.current) as current_file:
+            current = json.load(current_file)
+    else:
+        current = run_suite(args.corpora, args.generate, args.clues, args.seed)
+        print_suite(current)
+        if args.output:
+            with open(args.output, 'w') as output_file:
+                json.dump(current, output_file, indent=2, sort_keys=True)
+        if not args.baseline:
+            return
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    rows, regressions = compare(baseline, current, args.threshold)
+    print()
+    print('{:<26}{:>14}{:>14}{:>10}'.format('benchmark', 'baseline/s', 'current/s', 'slowdown'))
+    for name, old, new, change in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print('{:<26}{:>14.1f}{:>14.1f}{:>+9.1f}%{}'.format(name, old, new, change * 100, flag))
+    if regressions:
+        print("\n{} benchmark(s) slowed down by more than {:.0%}".format(len(regressions), args.threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
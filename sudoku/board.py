@@ -0,0 +1,285 @@
+import math
+
+# The sizes of board which are supported. A board of size n has n rows, n columns, and n boxes of sqrt(n) x sqrt(n)
+# cells, and is filled with the numbers 1 to n.
+SIZES = (4, 9, 16, 25)
+
+# The characters used for the numbers 0-25 in the text form of a board. Numbers above 9 are written as letters.
+DIGITS = '0123456789ABCDEFGHIJKLMNOP'
+
+
+class _BitCount:
+    """Counts the bits of a bitmask when indexed by it, like BIT_COUNT but for bitmasks too wide for a lookup table."""
+
+    __slots__ = ()
+
+    def __getitem__(self, mask):
+        return bin(mask).count('1')
+
+
+class Geometry:
+    """
+    The lookup tables for one size of board. Cells are indexed in row-major order.
+
+    Attributes:
+        size (int): The number of rows, columns, and boxes, which is also the largest number.
+        box_size (int): The number of rows and columns in a box.
+        num_cells (int): The number of cells.
+        row_of (List of int): The row of every cell.
+        col_of (List of int): The column of every cell.
+        box_of (List of int): The box of every cell.
+        units (List of List of int): The cell indices of each unit: the rows, then the columns, then the boxes.
+        peers (List of tuple): The other cells which share a row, column, or box with each cell.
+        cell_units (List of tuple): The indices in units of the row, column, and box of each cell.
+        unit_positions (List of tuple): The units as (row, column) positions, for boards stored as 2D arrays.
+        peer_positions (List of tuple): The peers as (row, column) positions, for boards stored as 2D arrays.
+        all_numbers (int): The bitmask of every number, where the number n is stored as the bit 1 << (n - 1).
+        bits (tuple): The bit of each number from 1 to size.
+        bit_count (List of int): The number of bits set in each bitmask, indexed by the bitmask.
+        number_of_bit (dict): The number stored as each bit.
+        bit_of_number (dict): The bit each number is stored as.
+    """
+
+    def __init__(self, size):
+        """
+        The constructor for a Geometry.
+
+        Parameters:
+            size (int): The size of the board, one of SIZES.
+        """
+
+        if size not in SIZES:
+            raise ValueError("Unsupported board size {}, expected one of {}".format(
+                size, ', '.join(str(supported) for supported in SIZES)))
+        box_size = math.isqrt(size)
+        num_cells = size * size
+        self.size = size
+        self.box_size = box_size
+        self.num_cells = num_cells
+        self.row_of = [idx // size for idx in range(num_cells)]
+        self.col_of = [idx % size for idx in range(num_cells)]
+        self.box_of = [(idx // (size * box_size)) * box_size + (idx % size) // box_size for idx in range(num_cells)]
+        self.units = [[idx for idx in range(num_cells) if self.row_of[idx] == n] for n in range(size)] \
+            + [[idx for idx in range(num_cells) if self.col_of[idx] == n] for n in range(size)] \
+            + [[idx for idx in range(num_cells) if self.box_of[idx] == n] for n in range(size)]
+        self.cell_units = [(self.row_of[idx], size + self.col_of[idx], 2 * size + self.box_of[idx])
+                           for idx in range(num_cells)]
+        self.peers = [tuple(sorted(set(self.units[row] + self.units[column] + self.units[box]) - {idx}))
+                      for idx, (row, column, box) in enumerate(self.cell_units)]
+        self.unit_positions = [tuple((self.row_of[idx], self.col_of[idx]) for idx in unit) for unit in self.units]
+        self.peer_positions = [tuple((self.row_of[peer], self.col_of[peer]) for peer in self.peers[idx])
+                               for idx in range(num_cells)]
+        self.all_numbers = (1 << size) - 1
+        self.bits = tuple(1 << (num - 1) for num in range(1, size + 1))
+        # A lookup table of every bitmask would have 2 ** 25 entries for 25x25 boards, so they count bits instead.
+        if size <= 16:
+            self.bit_count = [bin(mask).count('1') for mask in range(self.all_numbers + 1)]
+        else:
+            self.bit_count = _BitCount()
+        self.number_of_bit = {1 << (num - 1): num for num in range(1, size + 1)}
+        self.bit_of_number = {num: 1 << (num - 1) for num in range(1, size + 1)}
+
+
+_geometries = {}
+
+
+def get_geometry(size):
+    """
+    Gets the lookup tables for a size of board, building them the first time they are needed.
+
+    Parameters:
+        size (int): The size of the board, one of SIZES.
+
+    Returns:
+        Geometry: The lookup tables.
+    """
+
+    geometry = _geometries.get(size)
+    if geometry is None:
+        geometry = _geometries[size] = Geometry(size)
+    return geometry
+
+
+def geometry_of(board):
+    """
+    Gets the lookup tables for the size of a board.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        Geometry: The lookup tables.
+    """
+
+    if isinstance(board, Board):
+        return get_geometry(board.size)
+    return get_geometry(len(board))
+
+
+# The lookup tables of a standard 9x9 board, which the 9x9 code paths use directly. Cells are indexed 0-80.
+GEOMETRY = get_geometry(9)
+
+# The row, column, and 3x3 box of every cell.
+ROW_OF = GEOMETRY.row_of
+COL_OF = GEOMETRY.col_of
+BOX_OF = GEOMETRY.box_of
+
+# The cell indices of each of the 27 units: the 9 rows, then the 9 columns, then the 9 3x3 boxes.
+UNITS = GEOMETRY.units
+
+# The 20 other cells which share a row, column, or 3x3 box with each cell.
+PEERS = GEOMETRY.peers
+
+# The indices in UNITS of the row, column, and 3x3 box of each cell.
+CELL_UNITS = GEOMETRY.cell_units
+
+# The same units and peers as (row, column) positions, for boards stored as 2D arrays.
+UNIT_POSITIONS = GEOMETRY.unit_positions
+PEER_POSITIONS = GEOMETRY.peer_positions
+
+# Translation tables between the text form of a board and the numbers stored in a Board. Letters may be upper or lower
+# case. Characters which are not a number or a blank are mapped to 255 so they can be detected after translating.
+_FROM_TEXT = bytearray([255] * 256)
+for _num, _char in enumerate(DIGITS):
+    _FROM_TEXT[ord(_char)] = _num
+    _FROM_TEXT[ord(_char.lower())] = _num
+_FROM_TEXT[ord('.')] = 0
+_FROM_TEXT = bytes(_FROM_TEXT)
+_TO_TEXT = DIGITS.encode('ascii').ljust(256, b'?')
+
+# The size of board whose text form has each length.
+_SIZE_OF_LENGTH = {size * size: size for size in SIZES}
+
+
+class Board:
+    """
+    A sudoku board stored as one byte per cell.
+
+    A Board can be used wherever a List of List of int is expected: board[row] is a writable view of a row, so
+    board[row][column] reads and writes a cell.
+
+    Attributes:
+        cells (bytearray): The numbers of the board in row-major order, with 0 for empty cells.
+        size (int): The number of rows and columns, one of SIZES.
+    """
+
+    __slots__ = ('cells', 'size')
+
+    def __init__(self, cells=None, size=9):
+        """
+        The constructor for a Board.
+
+        Parameters:
+            cells (Iterable of int): The size * size numbers of the board in row-major order. Defaults to a blank
+                board.
+            size (int): The number of rows and columns, one of SIZES.
+        """
+
+        get_geometry(size)
+        self.size = size
+        self.cells = bytearray(size * size) if cells is None else bytearray(cells)
+        if len(self.cells) != size * size:
+            raise ValueError("A {0}x{0} board must have {1} cells, got {2}".format(size, size * size, len(self.cells)))
+
+    @classmethod
+    def from_string(cls, puzzle):
+        """
+        Creates a board from a string with one character per cell. The size of the board is given by its length,
+        e.g. 81 characters for a 9x9 board.
+
+        Parameters:
+            puzzle (str or bytes): The numbers of the board in row-major order, with 0 or . for empty cells and
+                the letters A-P for the numbers 10-25.
+
+        Returns:
+            Board: The new board.
+        """
+
+        if isinstance(puzzle, str):
+            puzzle = puzzle.encode('ascii')
+        size = _SIZE_OF_LENGTH.get(len(puzzle))
+        if size is None:
+            raise ValueError("A puzzle must have {} characters, got {}".format(
+                ', '.join(str(length) for length in _SIZE_OF_LENGTH), len(puzzle)))
+        board = cls.__new__(cls)
+        board.size = size
+        board.cells = bytearray(puzzle).translate(_FROM_TEXT)
+        if max(board.cells) > size:
+            raise ValueError("A {0}x{0} puzzle may only contain the numbers 0-{1} and .".format(size, DIGITS[size]))
+        return board
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Creates a board from a 2D array of numbers.
+
+        Parameters:
+            rows (List of List of int): A 2D array which represents a sudoku board.
+
+        Returns:
+            Board: The new board.
+        """
+
+        return cls((num for row in rows for num in row), len(rows))
+
+    @property
+    def geometry(self):
+        """Geometry: The lookup tables for the size of the board."""
+        return get_geometry(self.size)
+
+    def to_string(self):
+        """
+        Converts the board into a string with one character per cell.
+
+        Returns:
+            str: The numbers of the board in row-major order, with 0 for empty cells and the letters A-P for the
+                numbers 10-25.
+        """
+
+        return self.cells.translate(_TO_TEXT).decode('ascii')
+
+    def to_rows(self):
+        """
+        Converts the board into a 2D array of numbers.
+
+        Returns:
+            List of List of int: A 2D array which represents a sudoku board.
+        """
+
+        size = self.size
+        return [list(self.cells[row * size:row * size + size]) for row in range(size)]
+
+    def copy(self):
+        """Returns a new board with the same numbers."""
+        board = Board.__new__(Board)
+        board.size = self.size
+        board.cells = self.cells[:]
+        return board
+
+    def __getitem__(self, row):
+        size = self.size
+        return memoryview(self.cells)[row * size:row * size + size]
+
+    def __iter__(self):
+        view = memoryview(self.cells)
+        size = self.size
+        for row in range(size):
+            yield view[row * size:row * size + size]
+
+    def __len__(self):
+        return self.size
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.cells == other.cells
+        return NotImplemented
+
+    def __hash__(self):
+        # Boards are mutable, so a board must not be changed while it is used as a dictionary key or in a set.
+        return hash(bytes(self.cells))
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return 'Board.from_string({!r})'.format(self.to_string())
@@ -0,0 +1,356 @@
+import collections
+import itertools
+
+from .board import Board
+
+
+# The largest size of board which is put in canonical form. Above it there are too many ways to arrange the columns
+# to search through, so larger boards are only matched when they are repeated exactly.
+MAX_CANONICAL_SIZE = 9
+
+# The most arrangements of a board which place its clues equally well that are kept and compared by their numbers.
+# Only boards with few clues or very regular clues, e.g. a blank or solved board, have more. Past this limit the
+# canonical form of a board is still a valid transformation of it, but equivalent boards may not share it.
+_MAX_TIES = 100
+
+# For each size of box, the orders of the columns of a stack, and for each order the bitmask of the clues of a row of
+# the stack in that order, by the bitmask in their own order. Made the first time a board of that size is put in
+# canonical form.
+_stack_orders = {}
+
+
+class Transform:
+    """
+    A symmetry of sudoku which maps a board to another board with the same number of solutions.
+
+    Cell i of the transformed board holds the number labels[num] where num is the number in cell positions[i] of the
+    original board.
+
+    Attributes:
+        size (int): The number of rows and columns of the boards it transforms.
+        positions (tuple): The index in the original board of each cell of the transformed board.
+        labels (tuple): The new label of each number 0 to size. 0 always stays 0.
+    """
+
+    __slots__ = ('size', 'positions', 'labels', '_table', '_inverse_positions', '_inverse_table')
+
+    def __init__(self, size, positions, labels):
+        """
+        The constructor for a Transform.
+
+        Parameters:
+            size (int): The number of rows and columns of the boards it transforms.
+            positions (Iterable of int): The index in the original board of each cell of the transformed board.
+            labels (Iterable of int): The new label of each number 0 to size.
+        """
+
+        self.size = size
+        self.positions = tuple(positions)
+        self.labels = tuple(labels)
+        self._table = bytes(self.labels) + bytes(256 - len(self.labels))
+        inverse_positions = [0] * len(self.positions)
+        for idx, position in enumerate(self.positions):
+            inverse_positions[position] = idx
+        self._inverse_positions = inverse_positions
+        inverse_labels = [0] * len(self.labels)
+        for num, label in enumerate(self.labels):
+            inverse_labels[label] = num
+        self._inverse_table = bytes(inverse_labels) + bytes(256 - len(inverse_labels))
+
+    def apply(self, cells):
+        """
+        Transforms a board.
+
+        Parameters:
+            cells (bytes or bytearray): The numbers of the board in row-major order.
+
+        Returns:
+            bytes: The numbers of the transformed board in row-major order.
+        """
+
+        return bytes([cells[position] for position in self.positions]).translate(self._table)
+
+    def invert(self, cells):
+        """
+        Undoes the transformation of a board, e.g. to map the solution of a transformed board back to the original.
+
+        Parameters:
+            cells (bytes or bytearray): The numbers of the transformed board in row-major order.
+
+        Returns:
+            bytes: The numbers of the original board in row-major order.
+        """
+
+        return bytes([cells[idx] for idx in self._inverse_positions]).translate(self._inverse_table)
+
+
+def _arrange_rows(columns, size, box_size):
+    """
+    Finds the arrangement of rows which puts the most clues first, given the clues of the columns chosen so far.
+
+    The clues are packed into ints, box_size bits to a row of a stack, which compare in one step the way the tuples of
+    the clues would.
+
+    Parameters:
+        columns (List of List of int): For each stack chosen so far, the clues of every row in that stack as a bitmask
+            with the first column in the highest bit.
+
+    Returns:
+        tuple: Contains (key, bands) where key compares the arrangement with others, higher being better, and bands
+            is a list of (band key, rows) in order with the rows of each band in order.
+    """
+
+    values = [0] * size
+    for column in columns:
+        for row in range(size):
+            values[row] = values[row] << box_size | column[row]
+    bands = []
+    for band in range(box_size):
+        rows = sorted(range(band * box_size, band * box_size + box_size), key=values.__getitem__, reverse=True)
+        band_key = 0
+        for column in columns:
+            for row in rows:
+                band_key = band_key << box_size | column[row]
+        bands.append((band_key, rows))
+    bands.sort(reverse=True)
+    key = 0
+    for column in columns:
+        for _, rows in bands:
+            for row in rows:
+                key = key << box_size | column[row]
+    return key, bands
+
+
+def _tied_orders(items, key):
+    """Yields every order of items, which are already sorted by key, that keeps them sorted by key."""
+    groups = [list(group) for _, group in itertools.groupby(items, key)]
+    for orders in itertools.product(*(itertools.permutations(group) for group in groups)):
+        yield [item for order in orders for item in order]
+
+
+def canonical_form(board):
+    """
+    Finds the canonical form of a sudoku board, which is shared by every board that is the same puzzle with its
+    numbers relabelled, rows permuted within their bands, bands permuted, columns permuted within their stacks, stacks
+    permuted, or the board transposed.
+
+    The clues are first moved as far up and left as they can go, then the arrangements which place them equally well
+    are told apart by the numbers they read in row-major order once relabelled in the order they first appear.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board of at most MAX_CANONICAL_SIZE rows.
+
+    Returns:
+        tuple: Contains (canonical, transform) where canonical is the canonical form as a new Board and transform is
+            the Transform which maps the board to it.
+    """
+
+    if not isinstance(board, Board):
+        board = Board.from_rows(board)
+    size = board.size
+    if size > MAX_CANONICAL_SIZE:
+        raise ValueError("Only boards of up to {0}x{0} have a canonical form".format(MAX_CANONICAL_SIZE))
+    box_size = board.geometry.box_size
+    cells = board.cells
+    if box_size not in _stack_orders:
+        perms = list(itertools.permutations(range(box_size)))
+        permuted = [[sum(1 << (box_size - 1 - k) for k in range(box_size) if mask >> (box_size - 1 - perm[k]) & 1)
+                     for mask in range(1 << box_size)] for perm in perms]
+        _stack_orders[box_size] = perms, permuted
+    perms, permuted = _stack_orders[box_size]
+
+    # For each orientation, the clues of every row in each stack, for every order of the columns in that stack.
+    orientations = []
+    for transposed in (False, True):
+        stack_clues = []
+        for stack in range(box_size):
+            masks = []
+            for row in range(size):
+                mask = 0
+                for column in range(stack * box_size, stack * box_size + box_size):
+                    idx = column * size + row if transposed else row * size + column
+                    mask = mask << 1 | (cells[idx] != 0)
+                masks.append(mask)
+            stack_clues.append([[table[mask] for mask in masks] for table in permuted])
+        orientations.append((transposed, stack_clues))
+
+    # Choose the stacks one at a time. The clues in the stacks chosen so far fix the start of the key, so only the
+    # choices with the best key so far can lead to the best key overall.
+    choices = [(transposed, stack_clues, (), ()) for transposed, stack_clues in orientations]
+    for _ in range(box_size):
+        best_key = None
+        best = []
+        for transposed, stack_clues, stacks, stack_perms in choices:
+            for stack in range(box_size):
+                if stack in stacks:
+                    continue
+                for perm in range(len(perms)):
+                    choice = (transposed, stack_clues, stacks + (stack,), stack_perms + (perm,))
+                    columns = [stack_clues[s][p] for s, p in zip(choice[2], choice[3])]
+                    key = _arrange_rows(columns, size, box_size)[0]
+                    if best_key is None or key > best_key:
+                        best_key = key
+                        best = [choice]
+                    elif key == best_key and len(best) < _MAX_TIES:
+                        best.append(choice)
+        choices = best
+
+    # Among the arrangements with the best placed clues, pick the one whose relabelled numbers read lowest.
+    best_cells = None
+    best_positions = None
+    best_labels = None
+    ties = 0
+    for transposed, stack_clues, stacks, stack_perms in choices:
+        columns = [stack_clues[s][p] for s, p in zip(stacks, stack_perms)]
+        bands = _arrange_rows(columns, size, box_size)[1]
+        values = [tuple(column[row] for column in columns) for row in range(size)]
+        column_order = [stack * box_size + perms[perm][k] for stack, perm in zip(stacks, stack_perms)
+                        for k in range(box_size)]
+        for band_order in _tied_orders(bands, lambda band: band[0]):
+            row_orders = [list(_tied_orders(rows, values.__getitem__)) for _, rows in band_order]
+            for rows in itertools.product(*row_orders):
+                if transposed:
+                    positions = [column * size + row for band in rows for row in band for column in column_order]
+                else:
+                    positions = [row * size + column for band in rows for row in band for column in column_order]
+                labels = [0] * (size + 1)
+                next_label = 1
+                for position in positions:
+                    num = cells[position]
+                    if num and not labels[num]:
+                        labels[num] = next_label
+                        next_label += 1
+                for num in range(1, size + 1):
+                    if not labels[num]:
+                        labels[num] = next_label
+                        next_label += 1
+                transformed = bytes([labels[cells[position]] for position in positions])
+                if best_cells is None or transformed < best_cells:
+                    best_cells = transformed
+                    best_positions = positions
+                    best_labels = labels
+                ties += 1
+                if ties >= _MAX_TIES:
+                    break
+            if ties >= _MAX_TIES:
+                break
+        if ties >= _MAX_TIES:
+            break
+
+    return Board(best_cells, size), Transform(size, best_positions, best_labels)
+
+
+class SolutionCache:
+    """
+    A least recently used cache of solutions, which finds the solution of a puzzle it has seen before and, if it is
+    canonical, of any puzzle equivalent to one it has seen before by a symmetry of sudoku.
+
+    Pass a SolutionCache as the cache argument of solver.solve().
+
+    Attributes:
+        maxsize (int): The most entries kept. A solved puzzle takes up to two: its own and its canonical form's.
+        canonical (bool): True if a puzzle which isn't cached as it is is also looked up by its canonical form.
+        hits (int): The number of puzzles whose solution was found in the cache.
+        misses (int): The number of puzzles which had to be solved.
+    """
+
+    def __init__(self, maxsize=1024, canonical=False):
+        """
+        The constructor for a SolutionCache.
+
+        Parameters:
+            maxsize (int): The most entries to keep.
+            canonical (bool): Also find the solutions of puzzles equivalent to cached ones. Finding the canonical form
+                of a puzzle takes about 2 milliseconds on every miss, longer than solving most puzzles takes, so this
+                only pays off when many puzzles are hard and equivalent to each other.
+        """
+
+        self.maxsize = maxsize
+        self.canonical = canonical
+        self.hits = 0
+        self.misses = 0
+        self._solutions = collections.OrderedDict()
+
+    def _get(self, cells):
+        """Returns the cached solution of the cells, None if they have no solution, or False if they are not cached."""
+        solution = self._solutions.get(cells, False)
+        if solution is not False:
+            self._solutions.move_to_end(cells)
+        return solution
+
+    def _put(self, cells, solution):
+        """Caches the solution of the cells, removing the least recently used entry if the cache is full."""
+        self._solutions[cells] = solution
+        self._solutions.move_to_end(cells)
+        if len(self._solutions) > self.maxsize:
+            self._solutions.popitem(last=False)
+
+    def solve(self, board, solve_board):
+        """
+        Solves a sudoku board in place, using the cached solution if there is one.
+
+        A board is looked up as it is, then by its canonical form if the cache is canonical. When a board has to be
+        solved its solution is cached under both.
+
+        Parameters:
+            board (List of List of int or Board): A sudoku board.
+            solve_board (function): Solves a board in place and returns True if it was solved, for a cache miss.
+
+        Returns:
+            bool: True if the board is solved. Returns False if the board has no solution.
+        """
+
+        if isinstance(board, Board):
+            cells = bytes(board.cells)
+        else:
+            cells = bytes([num for row in board for num in row])
+        size = len(board)
+
+        transform = None
+        solution = self._get(cells)
+        if solution is False and self.canonical and size <= MAX_CANONICAL_SIZE:
+            canonical, transform = canonical_form(Board(cells, size))
+            canonical_cells = bytes(canonical.cells)
+            solution = self._get(canonical_cells)
+            if solution is not False:
+                if solution is not None:
+                    solution = transform.invert(solution)
+                self._put(cells, solution)
+
+        if solution is not False:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if solve_board(board):
+                if isinstance(board, Board):
+                    solution = bytes(board.cells)
+                else:
+                    solution = bytes([num for row in board for num in row])
+            else:
+                solution = None
+            self._put(cells, solution)
+            if transform is not None:
+                self._put(canonical_cells, solution and transform.apply(solution))
+            return solution is not None
+
+        if solution is None:
+            return False
+        if isinstance(board, Board):
+            board.cells[:] = solution
+        else:
+            for row in range(size):
+                board[row][:] = solution[row * size:row * size + size]
+        return True
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        self._solutions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._solutions)
+
+    def __repr__(self):
+        return 'SolutionCache(maxsize={}, canonical={}, entries={}, hits={}, misses={})'.format(
+            self.maxsize, self.canonical, len(self._solutions), self.hits, self.misses)
@@ -0,0 +1,368 @@
+import io
+import os
+import sys
+
+from .board import Board, DIGITS, SIZES, _FROM_TEXT, _SIZE_OF_LENGTH, _TO_TEXT
+
+
+# The puzzle file formats:
+#   line: one puzzle per line as a string with one character per cell, e.g. 81 characters for a 9x9 board, with 0 or
+#       . for empty cells. Blank lines and lines starting with # are skipped, as is anything after whitespace.
+#   sdm: the same lines with only digits, 0 for empty cells, and nothing else in the file.
+#   csv: puzzle,solution,more fields per line, e.g. the output of generator.py, with an optional header line.
+FORMATS = ('line', 'sdm', 'csv')
+
+# The names of the fields of a CSV file without a header, as written by generator.py.
+CSV_FIELDS = ('puzzle', 'solution', 'difficulty')
+
+# How many bytes are read and parsed at a time.
+BLOCK_SIZE = 1 << 20
+
+# How many boards are written at a time.
+WRITE_BATCH = 4096
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+# The translation table from board.py with newlines and carriage returns kept apart, so a block translated with it
+# can be split into lines.
+_LINE_END = 254
+_RETURN_END = 253
+_FROM_LINES = bytearray(_FROM_TEXT)
+_FROM_LINES[ord('\n')] = _LINE_END
+_FROM_LINES[ord('\r')] = _RETURN_END
+_FROM_LINES = bytes(_FROM_LINES)
+
+# The numbers allowed on each size of board. Deleting them from a board's cells leaves nothing if they are all valid,
+# which is much faster than finding the largest.
+_NUMBERS = {size: bytes(range(size + 1)) for size in SIZES}
+
+_RETURN = ord('\r')
+_COMMENT = ord('#')
+
+
+def _board(cells, size):
+    """Wraps the numbers of a board, which are already checked, in a Board without copying them again."""
+    board = Board.__new__(Board)
+    board.size = size
+    board.cells = cells
+    return board
+
+
+def _to_board(numbers, start, end, line_number):
+    """Takes a board from the translated numbers of a block, raising ValueError if they are not a valid board."""
+    size = _SIZE_OF_LENGTH.get(end - start)
+    if size is None:
+        raise ValueError("Line {}: a puzzle must have {} characters, got {}".format(
+            line_number, ', '.join(str(length) for length in _SIZE_OF_LENGTH), end - start))
+    cells = bytearray(memoryview(numbers)[start:end])
+    if cells.translate(None, _NUMBERS[size]):
+        raise ValueError("Line {}: a {}x{} puzzle may only contain the characters {} and .".format(
+            line_number, size, size, DIGITS[:size + 1]))
+    return _board(cells, size)
+
+
+def guess_format(path):
+    """
+    Guesses the format of a puzzle file from its name: csv for .csv, sdm for .sdm, and line for anything else. A
+    .gz ending is ignored.
+
+    Parameters:
+        path (str): The path of the file.
+
+    Returns:
+        str: One of FORMATS.
+    """
+
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension == '.sdm':
+        return 'sdm'
+    return 'line'
+
+
+def open_file(path, mode='r'):
+    """
+    Opens a puzzle file to read or write bytes. Files whose name ends with .gz are compressed with gzip, and when
+    reading, so is any file which starts with the gzip magic bytes.
+
+    Parameters:
+        path (str): The path of the file. - for standard input or output.
+        mode (str): 'r' to read the file or 'w' to write it.
+
+    Returns:
+        file: A binary file object.
+    """
+
+    import gzip
+
+    if mode not in ('r', 'w'):
+        raise ValueError("Unknown mode {!r}, expected 'r' or 'w'".format(mode))
+    if path == '-':
+        if mode == 'w':
+            return sys.stdout.buffer
+        if sys.stdin.buffer.peek(2)[:2] == _GZIP_MAGIC:
+            return gzip.GzipFile(fileobj=sys.stdin.buffer)
+        return sys.stdin.buffer
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 'b')
+    if mode == 'w':
+        return open(path, 'wb')
+    with open(path, 'rb') as puzzle_file:
+        compressed = puzzle_file.read(2) == _GZIP_MAGIC
+    return gzip.open(path, 'rb') if compressed else open(path, 'rb')
+
+
+def _blocks(file, block_size):
+    """
+    Reads a file in blocks of whole lines, each ending with a newline.
+
+    Yields:
+        bytes: Each block.
+    """
+
+    rest = b''
+    while True:
+        data = file.read(block_size)
+        if not data:
+            break
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            rest += data
+            continue
+        yield rest + data[:end] if rest else data[:end]
+        rest = data[end:]
+    if rest:
+        yield rest + b'\n'
+
+
+def read_lines(file, block_size=BLOCK_SIZE):
+    """
+    Reads puzzles in the line or sdm format.
+
+    The file is read a block at a time, and each block is translated from text to numbers and split into lines in
+    one step each. The numbers of each line become the cells of its board, so no string is made for a line or a cell
+    and a file of any size is read in constant memory.
+
+    Parameters:
+        file (file): A binary file object, e.g. from open_file().
+        block_size (int): How many bytes to read at a time.
+
+    Yields:
+        Board: Each puzzle.
+    """
+
+    line_number = 0
+    for block in _blocks(file, block_size):
+        lines = bytearray(block).translate(_FROM_LINES).split(bytes([_LINE_END]))
+        # The block ends with a newline, which leaves an empty line after it.
+        lines.pop()
+        # The text of the lines, split only if a line needs it.
+        text_lines = None
+        for idx, cells in enumerate(lines):
+            if cells and cells[-1] == _RETURN_END:
+                del cells[-1]
+            size = _SIZE_OF_LENGTH.get(len(cells))
+            if size is not None and not cells.translate(None, _NUMBERS[size]):
+                board = Board.__new__(Board)
+                board.size = size
+                board.cells = cells
+                yield board
+            elif cells:
+                # A comment, whitespace around the puzzle, or a mistake, which are told apart from the text.
+                if text_lines is None:
+                    text_lines = block.split(b'\n')
+                text = text_lines[idx].split(None, 1)
+                if text and text[0][0] != _COMMENT:
+                    yield _to_board(text[0].translate(_FROM_TEXT), 0, len(text[0]), line_number + idx + 1)
+        line_number += len(lines)
+
+
+def _field_names(first_fields):
+    """Returns the field names of a header line, or None if the line starts with a puzzle."""
+    first = first_fields[0].strip()
+    if len(first) in _SIZE_OF_LENGTH and max(first.translate(_FROM_TEXT)) != 255:
+        return None
+    return [field.strip().decode('utf-8') for field in first_fields]
+
+
+def read_csv(file, block_size=BLOCK_SIZE):
+    """
+    Reads puzzles in the csv format, with their solutions and other fields.
+
+    If the first line doesn't start with a puzzle it is a header which names the fields. Otherwise the fields are
+    named by CSV_FIELDS, and any more fields by their column number from 0.
+
+    Parameters:
+        file (file): A binary file object, e.g. from open_file().
+        block_size (int): How many bytes to read at a time.
+
+    Yields:
+        tuple: Contains (puzzle, solution, metadata) where puzzle is a Board, solution is a Board or None if the
+            line has none, and metadata is a dict of the other fields by name, as strings.
+    """
+
+    import csv
+
+    names = None
+    line_number = 0
+    for block in _blocks(file, block_size):
+        numbers = block.translate(_FROM_TEXT)
+        start = 0
+        while start < len(block):
+            newline = block.find(b'\n', start)
+            end = newline
+            if end > start and block[end - 1] == _RETURN:
+                end -= 1
+            line_number += 1
+            line = block[start:end]
+            line_start = start
+            start = newline + 1
+            if not line.strip() or line[0] == _COMMENT:
+                continue
+
+            quoted = b'"' in line
+            if quoted:
+                # Quoted fields are left to the csv module, and their boards are translated on their own.
+                fields = [field.encode('utf-8') for field in next(csv.reader([line.decode('utf-8')]))]
+            else:
+                fields = line.split(b',')
+            if names is None:
+                names = _field_names(fields)
+                if names is not None:
+                    continue
+                names = list(CSV_FIELDS)
+            while len(names) < len(fields):
+                names.append(str(len(names)))
+
+            if quoted:
+                puzzle = _to_board(fields[0].translate(_FROM_TEXT), 0, len(fields[0]), line_number)
+            else:
+                puzzle = _to_board(numbers, line_start, line_start + len(fields[0]), line_number)
+            solution = None
+            if len(fields) > 1 and fields[1]:
+                if quoted:
+                    solution = _to_board(fields[1].translate(_FROM_TEXT), 0, len(fields[1]), line_number)
+                else:
+                    solution_start = line_start + len(fields[0]) + 1
+                    solution = _to_board(numbers, solution_start, solution_start + len(fields[1]), line_number)
+            metadata = {names[idx]: fields[idx].decode('utf-8') for idx in range(2, len(fields))}
+            yield puzzle, solution, metadata
+
+
+def read_puzzles(source, format=None, block_size=BLOCK_SIZE):
+    """
+    Reads the puzzles of a file in any of FORMATS, compressed with gzip or not.
+
+    Parameters:
+        source (str or file): The path of the file, or a binary file object which is left open.
+        format (str): One of FORMATS. None to guess it from the path, or line for a file object.
+        block_size (int): How many bytes to read at a time.
+
+    Yields:
+        Board: Each puzzle.
+    """
+
+    if format is None:
+        format = guess_format(source) if isinstance(source, str) else 'line'
+    if format not in FORMATS:
+        raise ValueError("Unknown format {!r}, expected one of {}".format(format, ', '.join(FORMATS)))
+    if isinstance(source, str):
+        with open_file(source) as puzzle_file:
+            yield from read_puzzles(puzzle_file, format, block_size)
+        return
+    if format == 'csv':
+        for puzzle, _, _ in read_csv(source, block_size):
+            yield puzzle
+    else:
+        yield from read_lines(source, block_size)
+
+
+def _to_text(board, table=_TO_TEXT):
+    """Returns the text form of a board as bytes."""
+    if isinstance(board, Board):
+        return board.cells.translate(table)
+    return bytes([num for row in board for num in row]).translate(table)
+
+
+def write_lines(boards, file, blank='0'):
+    """
+    Writes puzzles in the line format, one per line.
+
+    Parameters:
+        boards (Iterable of Board or List of List of int): The puzzles.
+        file (file): A binary file object, e.g. from open_file().
+        blank (str): The character for empty cells, 0 or .
+    """
+
+    if blank not in ('0', '.'):
+        raise ValueError("blank must be '0' or '.'")
+    table = _TO_TEXT if blank == '0' else b'.' + _TO_TEXT[1:]
+    lines = []
+    for board in boards:
+        lines.append(_to_text(board, table))
+        if len(lines) == WRITE_BATCH:
+            lines.append(b'')
+            file.write(b'\n'.join(lines))
+            lines = []
+    if lines:
+        lines.append(b'')
+        file.write(b'\n'.join(lines))
+
+
+def write_sdm(boards, file):
+    """
+    Writes 9x9 puzzles in the sdm format, one per line with 0 for empty cells.
+
+    Parameters:
+        boards (Iterable of Board or List of List of int): The puzzles.
+        file (file): A binary file object, e.g. from open_file().
+    """
+
+    def checked():
+        for board in boards:
+            if len(board) != 9:
+                raise ValueError("The sdm format only holds 9x9 puzzles, got {0}x{0}".format(len(board)))
+            yield board
+
+    write_lines(checked(), file)
+
+
+def write_csv(records, file, fieldnames=None):
+    """
+    Writes puzzles in the csv format.
+
+    Parameters:
+        records (Iterable of tuple): Contains (puzzle, solution, metadata) for each puzzle as yielded by read_csv().
+            The solution may be None and the metadata a dict of strings, or None.
+        file (file): A binary file object, e.g. from open_file().
+        fieldnames (List of str): The names of the metadata fields to write, in order, after a header line. None for
+            no header, in which case the metadata is written in its own order.
+    """
+
+    import csv
+
+    if fieldnames is not None:
+        file.write((','.join(['puzzle', 'solution'] + list(fieldnames)) + '\n').encode('utf-8'))
+    lines = []
+    for puzzle, solution, metadata in records:
+        metadata = metadata or {}
+        values = metadata.values() if fieldnames is None else [metadata.get(name, '') for name in fieldnames]
+        fields = [str(value) for value in values]
+        if any(',' in field or '"' in field or '\n' in field for field in fields):
+            text = io.StringIO()
+            csv.writer(text, lineterminator='').writerow(fields)
+            extra = text.getvalue().encode('utf-8')
+        else:
+            extra = ','.join(fields).encode('utf-8')
+        line = _to_text(puzzle) + b',' + (b'' if solution is None else _to_text(solution))
+        lines.append(line + b',' + extra if fields else line)
+        if len(lines) == WRITE_BATCH:
+            lines.append(b'')
+            file.write(b'\n'.join(lines))
+            lines = []
+    if lines:
+        lines.append(b'')
+        file.write(b'\n'.join(lines))
+
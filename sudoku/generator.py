@@ -0,0 +1,272 @@
+import itertools
+import random
+import sys
+
+from . import solver
+from .board import SIZES, get_geometry
+
+
+# Difficulty levels from easiest to hardest, graded by the techniques needed to solve a puzzle:
+#   easy: naked singles only (a cell with one candidate).
+#   medium: hidden singles as well (a number with one possible cell in a row, column, or box).
+#   hard: harder techniques as well: pointing, claiming, naked and hidden pairs and triples, or X-wings.
+#   expert: logic is not enough and the solver has to guess.
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+
+# The difficulty level of each of solver.TECHNIQUES.
+_TECHNIQUE_LEVELS = {technique: 2 for technique in solver.TECHNIQUES}
+_TECHNIQUE_LEVELS['naked_single'] = 0
+_TECHNIQUE_LEVELS['hidden_single'] = 1
+
+
+def puzzle_seed(seed, index):
+    """
+    Derives the seed of one puzzle of a batch from the seed of the batch.
+
+    The seed is a hash of the batch seed and the index, so every puzzle has its own stream of random numbers which
+    doesn't overlap the others and doesn't depend on which worker generates the puzzle or what it generated before.
+
+    Parameters:
+        seed (int or str): The seed of the batch.
+        index (int): The index of the puzzle in the batch.
+
+    Returns:
+        int: The seed of the puzzle, a 64-bit number.
+    """
+
+    import hashlib
+
+    digest = hashlib.sha256('{}:{}'.format(seed, index).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def random_grid(size=9, rng=None):
+    """
+    Creates a random complete sudoku board.
+
+    A blank board is filled by a search which tries numbers in a random order, then the result is relabelled and
+    shuffled by a random symmetry of sudoku so that every board in its equivalence class is equally likely.
+
+    Parameters:
+        size (int): The number of rows and columns, one of board.SIZES.
+        rng (random.Random): The random number generator to use. None for the random module.
+
+    Returns:
+        List of List of int: A 2D array which represents a solved sudoku board.
+    """
+
+    board = solver.new_blank_board(size)
+    solver.random_solve(board, rng)
+    return shuffle_board(board, rng)
+
+
+def _random_band_order(box_size, rng):
+    """Returns a random order of the rows which only moves rows within their band and bands as a whole."""
+    bands = rng.sample(range(box_size), box_size)
+    return [band * box_size + row for band in bands for row in rng.sample(range(box_size), box_size)]
+
+
+def shuffle_board(board, rng=None):
+    """
+    Applies a random symmetry of sudoku to a board.
+
+    The numbers are relabelled, rows are permuted within their bands, bands are permuted, columns are permuted within
+    their stacks, stacks are permuted, and the board may be transposed. Each of these keeps a valid board valid and
+    keeps the number of solutions of a puzzle the same.
+
+    Parameters:
+        board (List of List of int): A 2D array which represents a sudoku board.
+        rng (random.Random): The random number generator to use. None for the random module.
+
+    Returns:
+        List of List of int: A new board which is a random transformation of the given board.
+    """
+
+    if rng is None:
+        rng = random
+    size = len(board)
+    box_size = get_geometry(size).box_size
+    labels = [0] + rng.sample(range(1, size + 1), size)
+    row_order = _random_band_order(box_size, rng)
+    column_order = _random_band_order(box_size, rng)
+    if rng.random() < 0.5:
+        return [[labels[board[column][row]] for column in column_order] for row in row_order]
+    return [[labels[board[row][column]] for column in column_order] for row in row_order]
+
+
+def grade(board, hardest=None):
+    """
+    Grades the difficulty of a puzzle by the techniques which are needed to solve it.
+
+    Parameters:
+        board (List of List of int): A 2D array which represents a sudoku board.
+        hardest (str): The hardest difficulty to tell apart, one of DIFFICULTIES. A harder puzzle is graded as the
+            next difficulty up without trying the techniques it needs, which is faster. None to grade fully.
+
+    Returns:
+        str: One of DIFFICULTIES. Returns None if the clues break the rules of sudoku or lead to a contradiction.
+    """
+
+    max_level = len(DIFFICULTIES) - 1 if hardest is None else DIFFICULTIES.index(hardest)
+    techniques = [technique for technique in solver.TECHNIQUES if _TECHNIQUE_LEVELS[technique] <= max_level]
+    puzzle = [list(row) for row in board]
+    deductions = solver.deduce(puzzle, techniques)
+    if deductions is None:
+        return None
+    if any(0 in row for row in puzzle):
+        return DIFFICULTIES[min(max_level + 1, len(DIFFICULTIES) - 1)]
+    return DIFFICULTIES[max((_TECHNIQUE_LEVELS[deduction.technique] for deduction in deductions), default=0)]
+
+
+def make_puzzle(solution, difficulty=None, rng=None):
+    """
+    Removes clues from a complete board while keeping its solution unique.
+
+    Clues are removed in a random order. A clue is put back if removing it would allow a second solution or, when a
+    difficulty is given, would make the puzzle harder than that difficulty.
+
+    Parameters:
+        solution (List of List of int): A 2D array which represents a solved sudoku board.
+        difficulty (str): The hardest difficulty the puzzle may have, one of DIFFICULTIES. None for no limit.
+        rng (random.Random): The random number generator which orders the clues. None for the random module.
+
+    Returns:
+        List of List of int: A new board with as few clues as could be reached.
+    """
+
+    if rng is None:
+        rng = random
+    max_level = len(DIFFICULTIES) if difficulty is None else DIFFICULTIES.index(difficulty)
+    size = len(solution)
+    puzzle = [list(row) for row in solution]
+    indices = list(range(size * size))
+    rng.shuffle(indices)
+    for idx in indices:
+        row, column = divmod(idx, size)
+        num = puzzle[row][column]
+        puzzle[row][column] = 0
+
+        # A puzzle which logic can solve always has a unique solution, so only harder ones need counting.
+        level = DIFFICULTIES.index(grade(puzzle, difficulty))
+        if level > max_level or (level == len(DIFFICULTIES) - 1 and solver.count_solutions(puzzle) != 1):
+            puzzle[row][column] = num
+    return puzzle
+
+
+def generate(difficulty=None, size=9, rng=None):
+    """
+    Generates a puzzle with a unique solution.
+
+    Parameters:
+        difficulty (str): The difficulty of the puzzle, one of DIFFICULTIES. None for any difficulty.
+        size (int): The number of rows and columns, one of board.SIZES.
+        rng (random.Random): The random number generator to use. None for the random module. A generator seeded
+            with the same seed always gives the same puzzle for the same difficulty and size.
+
+    Returns:
+        tuple: Contains (puzzle, solution, difficulty) where puzzle and solution are 2D arrays which represent sudoku
+            boards and difficulty is the grade of the puzzle.
+    """
+
+    while True:
+        solution = random_grid(size, rng)
+        puzzle = make_puzzle(solution, difficulty, rng)
+        level = grade(puzzle)
+        if difficulty is None or level == difficulty:
+            return puzzle, solution, level
+
+
+def generate_from_seed(seed, difficulty=None, size=9):
+    """
+    Generates the puzzle of a seed. A puzzle can be kept as its seed, difficulty, and size instead of its clues, and
+    generated again when it is needed.
+
+    Parameters:
+        seed (int or str): The seed, e.g. from puzzle_seed().
+        difficulty (str): The difficulty of the puzzle, one of DIFFICULTIES. None for any difficulty.
+        size (int): The number of rows and columns, one of board.SIZES.
+
+    Returns:
+        tuple: Contains (puzzle, solution, difficulty) as returned by generate().
+    """
+
+    return generate(difficulty, size, random.Random(seed))
+
+
+def _generate_one(args):
+    """Generates one puzzle in a worker process, from its own seed if it has one."""
+    difficulty, size, seed = args
+    if seed is None:
+        return generate(difficulty, size)
+    return generate_from_seed(seed, difficulty, size)
+
+
+def generate_batch(n, difficulty=None, workers=None, chunk_size=4, size=9, seed=None):
+    """
+    Generates many puzzles, spread across a pool of worker processes.
+
+    Parameters:
+        n (int): The number of puzzles to generate.
+        difficulty (str): The difficulty of the puzzles, one of DIFFICULTIES. None for any difficulty.
+        workers (int): The number of worker processes. Defaults to the number of CPUs. With 1 worker the puzzles
+            are generated in the calling process.
+        chunk_size (int): How many puzzles a worker generates before sending them back.
+        size (int): The number of rows and columns, one of board.SIZES.
+        seed (int or str): The seed of the batch. Puzzle i is generated from puzzle_seed(seed, i), so the batch is
+            the same for any number of workers and any puzzle can be generated again on its own. None for puzzles
+            which can't be reproduced.
+
+    Yields:
+        tuple: Contains (puzzle, solution, difficulty) for each puzzle, in the order they are finished, or in order
+            of their index if there is a seed.
+    """
+
+    import multiprocessing
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if seed is None:
+        jobs = itertools.repeat((difficulty, size, None), n)
+    else:
+        jobs = ((difficulty, size, puzzle_seed(seed, idx)) for idx in range(n))
+
+    if workers <= 1:
+        for job in jobs:
+            yield _generate_one(job)
+        return
+
+    # Every worker reseeds itself so that forked workers don't all produce the same puzzles. Seeded puzzles use
+    # their own generators instead, and are put back in order.
+    with multiprocessing.Pool(workers, initializer=random.seed) as pool:
+        if seed is None:
+            yield from pool.imap_unordered(_generate_one, jobs, chunk_size)
+        else:
+            yield from pool.imap(_generate_one, jobs, chunk_size)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate sudoku puzzles with a unique solution.")
+    parser.add_argument('-n', type=int, default=1, help="number of puzzles to generate")
+    parser.add_argument('-d', '--difficulty', choices=DIFFICULTIES, default=None, help="difficulty of the puzzles")
+    parser.add_argument('-o', '--output', default='-', help="file to write the puzzles to (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('-s', '--size', type=int, choices=SIZES, default=9, help="number of rows and columns")
+    parser.add_argument('--seed', default=None,
+                        help="seed of the batch, which makes the same puzzles for any number of workers")
+    args = parser.parse_args()
+
+    out_file = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for puzzle, solution, level in generate_batch(args.n, args.difficulty, args.workers, size=args.size,
+                                                      seed=args.seed):
+            out_file.write('{},{},{}\n'.format(solver.board_to_string(puzzle), solver.board_to_string(solution),
+                                               level))
+    finally:
+        if out_file is not sys.stdout:
+            out_file.close()
+
+
+if __name__ == '__main__':
+    main()
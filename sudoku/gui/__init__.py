@@ -0,0 +1,4 @@
+"""
+The window for playing boards and watching them being solved, which needs pygame. Nothing outside this package imports
+it, so the rest of sudoku works without pygame installed.
+"""
@@ -0,0 +1,270 @@
+import pygame
+
+from ..board import DIGITS
+
+
+# Fonts, number glyphs, and bordered cell backgrounds shared by every BoardCell. They are created the first time they
+# are needed, so making new cells for a new board does not load fonts or draw borders again.
+_fonts = {}
+_glyphs = {}
+_blanks = {}
+
+# Colors of the numbers and cell backgrounds.
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+# Numbers which were typed in or placed by the solver, to tell them apart from the clues.
+ENTERED = (0, 0, 180)
+# Candidates shown as pencil marks in empty cells.
+PENCIL = (110, 110, 110)
+# Backgrounds of the selected cell, of a cell whose number is repeated in its row, column, or box, and of both.
+SELECTED = (200, 220, 255)
+CONFLICT = (255, 190, 190)
+SELECTED_CONFLICT = (240, 170, 220)
+
+
+def get_font(size):
+    """
+    Gets the font for cell numbers in a certain size.
+
+    Parameters:
+        size (int): The size of the font.
+
+    Returns:
+        pygame.font.Font: The font.
+    """
+
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.SysFont('Comic Sans MS', size)
+    return font
+
+
+def get_glyph(number, size=50, color=BLACK):
+    """
+    Gets the rendered image of a number.
+
+    Parameters:
+        number (int): The number to render.
+        size (int): The size of the font.
+        color (tuple): The color of the number.
+
+    Returns:
+        pygame.Surface: The number drawn in the color.
+    """
+
+    glyph = _glyphs.get((number, size, color))
+    if glyph is None:
+        glyph = _glyphs[(number, size, color)] = get_font(size).render(DIGITS[number], False, color)
+    return glyph
+
+
+def get_blank(row, column, width, height, box_size=3, fill=WHITE):
+    """
+    Gets a cell background with the borders for a cell's position.
+
+    Borders on the edges of a box are thick. Cells share one of nine border patterns, depending on whether they are on
+    the first, last, or a middle row and column of their box.
+
+    Parameters:
+        row (int): The row number of the cell.
+        column (int): The column number of the cell.
+        width (int): How many pixels wide the cell is.
+        height (int): How many pixels high the cell is.
+        box_size (int): The number of rows and columns in a box.
+        fill (tuple): The color of the background.
+
+    Returns:
+        pygame.Surface: The background.
+    """
+
+    box_row = row % box_size
+    box_column = column % box_size
+    last_column = box_size * box_size - 1
+
+    # Determine thickness of the top and bottom lines.
+    if box_row == box_size - 1:  # Bottom needs to be thick because the cell is on the bottom row of a box.
+        bottom_thickness = 5
+        top_thickness = 1
+    elif box_row == 0 and row != 0:  # Top needs to be thick because the cell is on the the top row of a box.
+        bottom_thickness = 1
+        top_thickness = 5
+    else:
+        bottom_thickness = 1
+        top_thickness = 1
+
+    # Determine thickness of left and right lines.
+    if box_column == box_size - 1 and column != last_column:  # Right needs to be thick: rightmost column of a box.
+        right_thickness = 5
+        left_thickness = 1
+    elif box_column == 0 and column != 0:  # Left needs to be thick because the cell is on the leftmost column of a box.
+        right_thickness = 1
+        left_thickness = 5
+    else:
+        right_thickness = 1
+        left_thickness = 1
+
+    key = (width, height, top_thickness, bottom_thickness, left_thickness, right_thickness, fill)
+    blank = _blanks.get(key)
+    if blank is None:
+        blank = _blanks[key] = pygame.Surface((width, height))
+        blank.fill(fill)
+
+        # Draws the lines of the cell on a blank Surface
+        pygame.draw.line(blank, (0, 0, 0), (0, 0), (width, 0), top_thickness)  # top line
+        pygame.draw.line(blank, (0, 0, 0), (0, 0), (0, height), left_thickness)  # left line
+        pygame.draw.line(blank, (0, 0, 0), (0, height), (width, height), bottom_thickness)  # bottom line
+        pygame.draw.line(blank, (0, 0, 0), (width, 0), (width, height), right_thickness)  # right line
+    return blank
+
+
+class BoardCell:
+    """
+    This class represents one cell/box on a sudoku board.
+
+    Attributes:
+        number (int): The number contained in this cell.
+        row (int): The row number in which this cell is located.
+        column (int): The column number in which this cell is located.
+        width (int): How many pixels wide the cell will be when drawn.
+        height (int): How many pixels high the cell will be when drawn.
+        box_size (int): The number of rows and columns in a box of the board.
+        given (bool): True if the number is a clue, which is drawn in black. Other numbers are drawn in blue.
+        selected (bool): True if the cell is selected for typing a number into.
+        conflict (bool): True if the number is repeated in the cell's row, column, or box.
+        candidates (int): The bitmask of the numbers shown as pencil marks while the cell is empty, where the number
+            n is stored as the bit 1 << (n - 1).
+        font_size (int): The size of the font for the number, which fits the height of the cell.
+        font (pygame.font.Font): The font for the number, shared with the other cells.
+        pencil_size (int): The size of the font for the pencil marks, which fit box_size to a row.
+        blank (pygame.Surface): A blank white Surface with black borders, shared with the other cells.
+        rect (pygame.Rect): The area of the screen the cell is drawn in.
+        number_pos (tuple): The position on the screen the number is drawn at.
+        dirty (bool): True if the cell has changed since it was last drawn.
+    """
+
+    def __init__(self, number, row, column, width, height, box_size=3, x=0, y=0, given=True):
+        """
+        The constructor for a BoardCell.
+
+        Parameters:
+            number (int): The number contained in this cell.
+            row (int): The row number in which this cell is located.
+            column (int): The column number in which this cell is located.
+            width (int): How many pixels wide the cell will be when drawn.
+            height (int): How many pixels high the cell will be when drawn.
+            box_size (int): The number of rows and columns in a box of the board.
+            x (int): The position on the screen of the left edge of the board.
+            y (int): The position on the screen of the top edge of the board.
+            given (bool): True if the number is a clue.
+        """
+
+        self._number = number
+        self.row = row
+        self.column = column
+        self.width = width
+        self.height = height
+        self.box_size = box_size
+        self.given = given
+        self._selected = False
+        self._conflict = False
+        self._candidates = 0
+        self.rect = pygame.Rect(x + column * width, y + row * height, width, height)
+        self.number_pos = (x + column * width + width / 3, y + row * height)
+        self.dirty = True
+        # 50 for the 80 pixel cells of a 9x9 board in the standard window.
+        self.font_size = height * 5 // 8
+        self.font = get_font(self.font_size)
+        self.pencil_size = max(height * 5 // (8 * box_size), 6)
+        self.blank = get_blank(row, column, width, height, box_size)
+
+    @property
+    def number(self):
+        """int: The number contained in this cell. Changing it marks the cell as dirty."""
+        return self._number
+
+    @number.setter
+    def number(self, number):
+        if number != self._number:
+            self._number = number
+            self.dirty = True
+
+    @property
+    def selected(self):
+        """bool: True if the cell is selected. Changing it marks the cell as dirty."""
+        return self._selected
+
+    @selected.setter
+    def selected(self, selected):
+        if selected != self._selected:
+            self._selected = selected
+            self.dirty = True
+
+    @property
+    def conflict(self):
+        """bool: True if the number is repeated in the cell's units. Changing it marks the cell as dirty."""
+        return self._conflict
+
+    @conflict.setter
+    def conflict(self, conflict):
+        if conflict != self._conflict:
+            self._conflict = conflict
+            self.dirty = True
+
+    @property
+    def candidates(self):
+        """int: The bitmask of the pencil marks. Changing it marks the cell as dirty."""
+        return self._candidates
+
+    @candidates.setter
+    def candidates(self, candidates):
+        if candidates != self._candidates:
+            self._candidates = candidates
+            self.dirty = True
+
+    def draw_blank(self, screen):
+        """
+        Draws a blank box with black borders around it at the cell's position, shaded if the cell is selected or in
+        conflict.
+
+        Parameters:
+            screen (Surface): A surface which will be drawn on.
+        """
+
+        if self._conflict or self._selected:
+            if self._conflict:
+                fill = SELECTED_CONFLICT if self._selected else CONFLICT
+            else:
+                fill = SELECTED
+            screen.blit(get_blank(self.row, self.column, self.width, self.height, self.box_size, fill), self.rect)
+        else:
+            screen.blit(self.blank, self.rect)
+        self.dirty = False
+
+    def draw(self, screen):
+        """
+        Draws the BoardCell's number with black borders around it at the cell's position.
+
+        An empty cell is drawn with its pencil marks, each number in its own spot of a box_size x box_size grid.
+
+        Parameters:
+            screen (Surface): A surface which will be drawn on.
+        """
+
+        # Erase anything that was drawn at this cell's position previously.
+        self.draw_blank(screen)
+
+        # Draw the cell onto the screen.
+        if self.number != 0:
+            color = BLACK if self.given else ENTERED
+            screen.blit(get_glyph(self.number, self.font_size, color), self.number_pos)
+            return
+        candidates = self._candidates
+        num = 1
+        while candidates:
+            if candidates & 1:
+                spot_row, spot_column = divmod(num - 1, self.box_size)
+                screen.blit(get_glyph(num, self.pencil_size, PENCIL),
+                            (self.rect.x + (spot_column * self.width + self.width / 4) // self.box_size,
+                             self.rect.y + spot_row * self.height // self.box_size))
+            candidates >>= 1
+            num += 1
@@ -9,8 +9,6 @@ import os.path
 import pygame
 import pygame.locals as pl
 
-pygame.font.init()
-
 
 class TextInput:
     """
@@ -42,6 +40,10 @@ class TextInput:
         :param max_string_length: Allowed length of text
         """
 
+        # Fonts are initialized here rather than on import, so that importing this module costs nothing until a
+        # TextInput is made. Initializing them again is a no-op.
+        pygame.font.init()
+
         # Text related vars:
         self.antialias = antialias
         self.text_color = text_color
@@ -0,0 +1,646 @@
+import argparse
+import math
+import time
+
+import pygame
+
+from .. import solver
+from ..board import DIGITS, SIZES, get_geometry
+from ..play import PlayBoard
+from . import pygame_textinput
+from .board_cell import BoardCell
+
+
+class Grid:
+    """
+    This class represents a sudoku board/grid.
+
+    The board can be played by selecting a cell and typing numbers into it. The numbers in each row, column, and box
+    are kept track of by a PlayBoard as they are typed, so a move only redraws the cells it affects.
+
+    Attributes:
+        width (int): How many pixels wide the grid will be when drawn.
+        height (int): How many pixels high the grid will be when drawn.
+        screen (Surface): A surface which will be drawn on.
+        x (int): The position on the screen of the left edge of the grid.
+        y (int): The position on the screen of the top edge of the grid.
+        size (int): The number of rows and columns of the board.
+        board (List of List of int or Board): The sudoku board which is shown.
+        clues (List of List of int): The numbers the board started with, used to reset it.
+        cells (List of List of BoardCell): A 2D array of BoardCells that represents a sudoku board.
+        play (PlayBoard): The numbers typed into the board, with their conflicts and candidates.
+        selected (tuple): The (row, column) of the selected cell. None if no cell is selected.
+        show_candidates (bool): True if empty cells show their candidates as pencil marks.
+        steps (generator): The steps of the solve in progress, from solver.solve_steps(). None if not solving.
+        skipping (bool): True if the solve in progress is running to its result without showing its steps.
+    """
+
+    def __init__(self, width, height, screen, num_clues=30, board=None, size=9, x=0, y=0):
+        """
+        The constructor for a Grid
+
+        Parameters:
+            width (int): How many pixels wide the grid will be when drawn.
+            height (int): How many pixels high the grid will be when drawn.
+            screen (Surface): A surface which will be drawn on.
+            num_clues (int): The number of clues which the board will have. Must be from [0, size * size].
+            board (List of List of int or Board): A board to show instead of generating a new one.
+            size (int): The number of rows and columns of a generated board, one of board.SIZES. Ignored if a board
+                is given.
+            x (int): The position on the screen of the left edge of the grid.
+            y (int): The position on the screen of the top edge of the grid.
+        """
+
+        self.width = width
+        self.height = height
+        self.screen = screen
+        self.x = x
+        self.y = y
+        self.steps = None
+        self.skipping = False
+        self._stats = None
+        self.selected = None
+        self.show_candidates = False
+        if board is None:
+            board = solver.new_random_board(num_clues, size)
+        self.set_board(board)
+
+    def new_board(self, num_clues):
+        """
+        Creates a new board of the same size and new cells.
+
+        Parameters:
+            num_clues (int): The number of clues which the board will have. Must be from [0, size * size].
+        """
+
+        self.set_board(solver.new_random_board(num_clues, self.size))
+
+    def set_board(self, board):
+        """
+        Shows a board and creates new cells for it.
+
+        Parameters:
+            board (List of List of int or Board): A sudoku board.
+        """
+
+        self.cancel_solve()
+        self.size = len(board)
+        self.board = board
+        self.clues = [[board[row][column] for column in range(self.size)] for row in range(self.size)]
+        self.play = PlayBoard(board)
+        self.selected = None
+        self.cells = self.initialize_cells()
+        self.refresh_cells()
+
+    def initialize_cells(self):
+        """Initializes cells by creating a 2D array of BoardCells from the board."""
+        box_size = get_geometry(self.size).box_size
+        cell_size = self.width // self.size
+        cells = []
+        for row in range(self.size):
+            cells.append([BoardCell(self.board[row][column], row, column, cell_size, cell_size, box_size, self.x,
+                                    self.y, self.clues[row][column] != 0)
+                          for column in range(self.size)])
+        return cells
+
+    def refresh_cells(self):
+        """
+        Updates the number, conflict, and pencil marks of every cell from the play state, or only the number from the
+        board while a solve is in progress.
+        """
+
+        solving = self.solving
+        for idx in range(self.size * self.size):
+            row, column = divmod(idx, self.size)
+            cell = self.cells[row][column]
+            if solving:
+                cell.number = self.board[row][column]
+                cell.conflict = False
+                cell.candidates = 0
+            else:
+                cell.number = self.play.cells[idx]
+                cell.conflict = self.play.is_conflict(idx)
+                cell.candidates = self.play.candidates(idx) if self.show_candidates else 0
+
+    def _refresh_move(self, idx, changed):
+        """Updates the cells affected by a move: the cells whose conflicts changed, and the candidates of its peers."""
+        size = self.size
+        row, column = divmod(idx, size)
+        self.board[row][column] = self.play.cells[idx]
+        for changed_idx in changed:
+            cell = self.cells[changed_idx // size][changed_idx % size]
+            cell.number = self.play.cells[changed_idx]
+            cell.conflict = self.play.is_conflict(changed_idx)
+        if self.show_candidates:
+            self.cells[row][column].candidates = self.play.candidates(idx)
+            for peer in self.play.geometry.peers[idx]:
+                self.cells[peer // size][peer % size].candidates = self.play.candidates(peer)
+
+    def cell_at(self, pos):
+        """
+        Finds the cell at a position on the screen.
+
+        Parameters:
+            pos (tuple): The (x, y) position.
+
+        Returns:
+            tuple: Contains the indices (row, column). Returns None if the position is outside the grid.
+        """
+
+        cell_size = self.width // self.size
+        column = (pos[0] - self.x) // cell_size
+        row = (pos[1] - self.y) // cell_size
+        if pos[0] < self.x or pos[1] < self.y or row >= self.size or column >= self.size:
+            return None
+        return (row, column)
+
+    def select(self, position):
+        """
+        Selects a cell to type numbers into.
+
+        Parameters:
+            position (tuple): The (row, column) of the cell. None to select no cell.
+        """
+
+        if self.selected is not None:
+            self.cells[self.selected[0]][self.selected[1]].selected = False
+        self.selected = position
+        if position is not None:
+            self.cells[position[0]][position[1]].selected = True
+
+    def move_selection(self, row_change, column_change):
+        """Selects the cell next to the selected cell, wrapping around the edges of the board."""
+        if self.selected is not None:
+            self.select(((self.selected[0] + row_change) % self.size, (self.selected[1] + column_change) % self.size))
+
+    def enter(self, num):
+        """
+        Puts a number in the selected cell, unless it holds a clue or a solve is in progress.
+
+        Parameters:
+            num (int): The number, from 1 to size, or 0 to empty the cell.
+
+        Returns:
+            bool: True if the board changed.
+        """
+
+        if self.selected is None or self.solving:
+            return False
+        idx = self.selected[0] * self.size + self.selected[1]
+        changed = self.play.set(idx, num)
+        if not changed:
+            return False
+        self._refresh_move(idx, changed)
+        return True
+
+    def undo(self):
+        """
+        Takes back the last number typed and selects its cell.
+
+        Returns:
+            bool: True if a move was taken back.
+        """
+
+        if self.solving:
+            return False
+        move = self.play.undo()
+        if move is None:
+            return False
+        self._refresh_move(*move)
+        self.select(divmod(move[0], self.size))
+        return True
+
+    def redo(self):
+        """
+        Types the last number which was taken back again and selects its cell.
+
+        Returns:
+            bool: True if a move was made again.
+        """
+
+        if self.solving:
+            return False
+        move = self.play.redo()
+        if move is None:
+            return False
+        self._refresh_move(*move)
+        self.select(divmod(move[0], self.size))
+        return True
+
+    def toggle_candidates(self):
+        """Shows or hides the candidates of the empty cells as pencil marks."""
+        self.show_candidates = not self.show_candidates
+        self.refresh_cells()
+
+    @property
+    def solved(self):
+        """bool: True if every cell is filled and no number is repeated in a row, column, or box."""
+        return self.play.is_solved()
+
+    def draw_clues(self):
+        """Draws all clues onto the screen."""
+        for row in self.cells:
+            for cell in row:
+                cell.draw(self.screen)
+
+    def draw_changed(self):
+        """
+        Draws only the cells whose numbers have changed since they were last drawn.
+
+        Returns:
+            List of pygame.Rect: The areas of the screen which were drawn on.
+        """
+
+        rects = []
+        for row in self.cells:
+            for cell in row:
+                if cell.dirty:
+                    cell.draw(self.screen)
+                    rects.append(cell.rect)
+        return rects
+
+    @property
+    def solving(self):
+        """bool: True if a solve is in progress."""
+        return self.steps is not None
+
+    def start_solve(self, stats=None):
+        """
+        Starts solving the board from its clues. The steps of the search are applied to the cells by advance_solve().
+
+        Numbers typed into the board are set aside while it is solved, and come back if the solve is cancelled.
+
+        Parameters:
+            stats (solver.SearchStats): Counters to add the work of the search to. None to not count.
+        """
+
+        self.cancel_solve()
+        for row in range(self.size):
+            for column in range(self.size):
+                self.board[row][column] = self.clues[row][column]
+        self.steps = solver.solve_steps(self.board, stats)
+        self.skipping = False
+        self._stats = stats
+        self.refresh_cells()
+
+    def advance_solve(self, num_steps, timeout=None):
+        """
+        Applies the next steps of the solve in progress to the cells. Once the solve is being skipped to its result,
+        the search runs for up to timeout seconds instead, without showing its steps.
+
+        Parameters:
+            num_steps (int): The most steps to apply.
+            timeout (float): The most seconds to run a skipped solve for. Defaults to SKIP_TIME_PER_FRAME.
+
+        Returns:
+            bool: True if the solve is still in progress, False once it has finished.
+        """
+
+        if self.steps is None:
+            return False
+        if self.skipping:
+            deadline = time.perf_counter() + (SKIP_TIME_PER_FRAME if timeout is None else timeout)
+            while time.perf_counter() < deadline:
+                # The board is updated by the search itself, so the steps only need to be run.
+                for _ in range(SKIP_STEPS_PER_CHECK):
+                    if next(self.steps, None) is None:
+                        self.steps = None
+                        self._take_result()
+                        return False
+            return True
+        for _ in range(num_steps):
+            step = next(self.steps, None)
+            if step is None:
+                self.steps = None
+                self._take_result()
+                return False
+            row = step[1]
+            column = step[2]
+            self.cells[row][column].number = step[3] if step[0] == 'place' else 0
+        return True
+
+    def finish_solve(self, timeout=None):
+        """
+        Skips to the result of the solve in progress without showing the rest of the search.
+
+        The steps come from the bitmask search, which can take seconds on 17 clue puzzles and longer on boards larger
+        than 9x9. Dancing Links is tried on the clues first, for up to timeout seconds. If it doesn't finish either,
+        the rest of the search is run by advance_solve() a part of each frame, so the window stays responsive.
+
+        Parameters:
+            timeout (float): The most seconds to try Dancing Links for. Defaults to SKIP_DLX_TIMEOUT.
+        """
+
+        if self.steps is None or self.skipping:
+            return
+        board = [row[:] for row in self.clues]
+        if timeout is None:
+            timeout = SKIP_DLX_TIMEOUT
+        if solver.bounded_solve(board, timeout=timeout, stats=self._stats, engine='dlx').status == 'budget_exceeded':
+            self.skipping = True
+            return
+        self.steps.close()
+        self.steps = None
+        for row in range(self.size):
+            for column in range(self.size):
+                self.board[row][column] = board[row][column]
+        self._take_result()
+
+    def _take_result(self):
+        """Replaces the numbers typed into the board with the result of the finished solve."""
+        self.play = PlayBoard(self.board, self.clues)
+        self.refresh_cells()
+
+    def cancel_solve(self):
+        """Stops the solve in progress and puts back the numbers which were on the board before it started."""
+        if self.steps is None:
+            return
+        self.steps.close()
+        self.steps = None
+        self.skipping = False
+        for idx, num in enumerate(self.play.cells):
+            self.board[idx // self.size][idx % self.size] = num
+        self.refresh_cells()
+
+
+# Bounds for how many steps of the search are shown per frame.
+MAX_STEPS_PER_FRAME = 4096
+
+# How many seconds Dancing Links may try to solve a board whose solve is skipped, and how many seconds of each frame
+# the search may then run for instead if it couldn't, shared between the boards. The time is checked every
+# SKIP_STEPS_PER_CHECK steps.
+SKIP_DLX_TIMEOUT = 0.1
+SKIP_TIME_PER_FRAME = 0.02
+SKIP_STEPS_PER_CHECK = 64
+
+
+# The space in pixels between boards when several are shown side by side.
+BOARD_GAP = 10
+
+# Keys which empty the selected cell, and the change of row and column of the keys which move the selection.
+CLEAR_KEYS = (pygame.K_BACKSPACE, pygame.K_DELETE, pygame.K_0, pygame.K_PERIOD)
+MOVE_KEYS = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
+
+
+def layout_grids(num_boards, width, height):
+    """
+    Places boards side by side in rows, as close to a square as they fit.
+
+    Parameters:
+        num_boards (int): The number of boards.
+        width (int): How many pixels wide the area for the boards is.
+        height (int): How many pixels high the area for the boards is.
+
+    Returns:
+        tuple: Contains (board_size, positions) where board_size is how many pixels wide and high each board is and
+            positions is a list of the (x, y) position of each board.
+    """
+
+    columns = math.ceil(math.sqrt(num_boards))
+    rows = math.ceil(num_boards / columns)
+    gap = BOARD_GAP if num_boards > 1 else 0
+    board_size = min((width - gap * (columns - 1)) // columns, (height - gap * (rows - 1)) // rows)
+    positions = [((board_size + gap) * (idx % columns), (board_size + gap) * (idx // columns))
+                 for idx in range(num_boards)]
+    return board_size, positions
+
+
+def main(steps_per_frame=1, size=9, num_clues=None, num_boards=1):
+    """
+    Runs the sudoku generator and solver window.
+
+    Click a cell to select it, then type a number into it. Numbers above 9 are typed as letters. Backspace, delete, or
+    0 empties the cell, the arrows move the selection, escape deselects it, ctrl+z and ctrl+y undo and redo, and ctrl+p
+    shows or hides the candidates of the empty cells as pencil marks. Numbers repeated in a row, column, or box are
+    highlighted as they are typed.
+
+    While a board is being solved: space pauses and resumes, the up and down arrows double and halve the speed, enter
+    skips to the result, and escape cancels the solve.
+
+    Parameters:
+        steps_per_frame (int): How many steps of the search are shown per frame, at 30 frames per second.
+        size (int): The number of rows and columns of the boards, one of board.SIZES.
+        num_clues (int): The number of clues of the first board. Defaults to 30 on a 9x9 board and half of the cells
+            on other sizes, as sparser large boards take long to generate.
+        num_boards (int): The number of boards shown side by side, e.g. 16 for a tournament. The buttons generate
+            and solve all of them at once.
+    """
+
+    if num_clues is None:
+        num_clues = 30 if size == 9 else size * size // 2
+
+    pygame.init()
+    sc_width = 720
+    sc_height = 800
+    screen = pygame.display.set_mode((sc_width, sc_height))
+    caption = "Sudoku Generator & Solver"
+    pygame.display.set_caption(caption)
+    grid_width = 720
+    grid_height = 720
+    height_diff = sc_height - grid_height
+    font = pygame.font.SysFont('Comic Sans MS', 20)
+    white = (255, 255, 255)
+    clock = pygame.time.Clock()
+    run = True
+    paused = False
+
+    # Button to create a new board
+    new_board_button = pygame.Rect(sc_width * 2.5/5, grid_height + height_diff / 4, sc_width / 7, height_diff / 2)
+    new_board_text = font.render("New Board", False, (0, 0, 0))
+
+    # Button to solve the current board, which skips to the result while a solve is in progress
+    solve_button = pygame.Rect(sc_width * 3.5/5, grid_height + height_diff / 4, sc_width / 7, height_diff / 2)
+    solve_text = font.render("Solve", False, (0, 0, 0))
+    skip_text = font.render("Skip", False, (0, 0, 0))
+
+    # Text field for number of clues
+    text_input = pygame_textinput.TextInput(str(num_clues))
+    clues_text = font.render("Number of Clues: ", False, (0, 0, 0))
+
+    # Generate the starting sudoku boards
+    board_size, positions = layout_grids(num_boards, grid_width, grid_height)
+    grids = [Grid(board_size, board_size, screen, num_clues, size=size, x=x, y=y) for x, y in positions]
+    # The grid with the selected cell, which typed keys go to. None if no cell is selected.
+    active = None
+
+    # Area behind the text field, which is cleared whenever the text field changes.
+    text_area = pygame.Rect(sc_width / 3, grid_height + height_diff / 4, new_board_button.left - sc_width / 3,
+                            height_diff * 3 / 4)
+    text_state = None
+    solve_label = None
+    full_redraw = True
+
+    while run:
+        clock.tick(30)
+
+        events = pygame.event.get()
+        solving = any(grid.solving for grid in grids)
+        # Keys control the solve while it is in progress, or play the selected cell, so they are not typed into the
+        # text field.
+        controls_solve = solving
+        controls_play = active is not None and not solving
+        for event in events:
+            if event.type == pygame.QUIT:
+                run = False
+
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+
+            if event.type == pygame.KEYDOWN and controls_solve:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    steps_per_frame = min(steps_per_frame * 2, MAX_STEPS_PER_FRAME)
+                elif event.key == pygame.K_DOWN:
+                    steps_per_frame = max(steps_per_frame // 2, 1)
+                elif event.key == pygame.K_RETURN:
+                    for grid in grids:
+                        grid.finish_solve(SKIP_DLX_TIMEOUT / len(grids))
+                    paused = False
+                elif event.key == pygame.K_ESCAPE:
+                    for grid in grids:
+                        grid.cancel_solve()
+
+            elif event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL:
+                if event.key == pygame.K_p:
+                    for grid in grids:
+                        grid.toggle_candidates()
+                elif active is not None and event.key == pygame.K_z:
+                    if event.mod & pygame.KMOD_SHIFT:
+                        active.redo()
+                    else:
+                        active.undo()
+                elif active is not None and event.key == pygame.K_y:
+                    active.redo()
+
+            elif event.type == pygame.KEYDOWN and controls_play:
+                typed = event.unicode.upper()
+                if event.key in CLEAR_KEYS:
+                    active.enter(0)
+                elif event.key in MOVE_KEYS:
+                    active.move_selection(*MOVE_KEYS[event.key])
+                elif event.key == pygame.K_ESCAPE:
+                    active.select(None)
+                    active = None
+                elif typed and typed in DIGITS[1:size + 1]:
+                    active.enter(DIGITS.index(typed))
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_pos = event.pos
+
+                # Check if user clicks on the new board button or the solve button.
+                if new_board_button.collidepoint(mouse_pos):
+                    try:
+                        # Generate new board based on user input.
+                        user_input = int(text_input.get_text())
+                        if user_input <= size * size and user_input > 0:
+                            for grid in grids:
+                                grid.new_board(user_input)
+                            active = None
+                        else:
+                            text_input.clear_text()
+                    except:
+                        text_input.clear_text()
+                elif solve_button.collidepoint(mouse_pos):
+                    if solving:
+                        for grid in grids:
+                            grid.finish_solve(SKIP_DLX_TIMEOUT / len(grids))
+                        paused = False
+                    else:
+                        for grid in grids:
+                            grid.start_solve()
+                        paused = False
+                else:
+                    # Select the clicked cell, or nothing if the click was outside the boards.
+                    if active is not None:
+                        active.select(None)
+                        active = None
+                    for grid in grids:
+                        position = grid.cell_at(mouse_pos)
+                        if position is not None:
+                            grid.select(position)
+                            active = grid
+                            break
+
+        if not paused:
+            for grid in grids:
+                if grid.solving:
+                    grid.advance_solve(steps_per_frame, SKIP_TIME_PER_FRAME / len(grids))
+
+        # Show the state of the solve, or of the board being played, in the window title.
+        if any(grid.skipping for grid in grids if grid.solving):
+            new_caption = "Sudoku Generator & Solver - Skipping to the result"
+        elif any(grid.solving for grid in grids):
+            status = "Paused" if paused else "Solving at {} steps per frame".format(steps_per_frame)
+            new_caption = "Sudoku Generator & Solver - {}".format(status)
+        elif active is not None and active.solved:
+            new_caption = "Sudoku Generator & Solver - Solved"
+        elif active is not None and active.play.conflicts:
+            new_caption = "Sudoku Generator & Solver - {} conflicts".format(active.play.conflicts)
+        else:
+            new_caption = "Sudoku Generator & Solver"
+        if new_caption != caption:
+            caption = new_caption
+            pygame.display.set_caption(caption)
+
+        # Only the parts of the screen which changed are drawn and updated, unless the whole window needs repainting.
+        dirty_rects = []
+        if full_redraw:
+            screen.fill(white)
+            for grid in grids:
+                grid.draw_clues()
+            screen.blit(clues_text, (sc_width / 10, grid_height + height_diff / 4))
+
+            # Draw button to generate a new board and its text
+            pygame.draw.rect(screen, (105, 105, 105), new_board_button)
+            screen.blit(new_board_text, (sc_width * 2.5 / 5, grid_height + height_diff / 4))
+
+            dirty_rects.append(screen.get_rect())
+            text_state = None
+            solve_label = None
+            full_redraw = False
+        else:
+            for grid in grids:
+                dirty_rects.extend(grid.draw_changed())
+
+        # Draw button to solve board and its text
+        new_solve_label = skip_text if any(grid.solving for grid in grids) else solve_text
+        if new_solve_label is not solve_label:
+            solve_label = new_solve_label
+            pygame.draw.rect(screen, (105, 105, 105), solve_button)
+            screen.blit(solve_label, (sc_width * 3.5 / 5 + sc_width / 30, grid_height + height_diff / 4))
+            dirty_rects.append(solve_button)
+
+        # Update the TextInput object and display it if its text or cursor changed
+        if controls_solve or controls_play:
+            text_input.update([event for event in events if event.type != pygame.KEYDOWN])
+        else:
+            text_input.update([event for event in events
+                               if event.type != pygame.KEYDOWN or not event.mod & pygame.KMOD_CTRL])
+        new_text_state = (text_input.get_text(), text_input.get_cursor_position(), text_input.cursor_visible)
+        if new_text_state != text_state:
+            text_state = new_text_state
+            screen.fill(white, text_area)
+            screen.blit(text_input.get_surface(), (sc_width / 3, grid_height + height_diff / 3))
+            dirty_rects.append(text_area)
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    pygame.quit()
+
+
+def cli():
+    """Runs the window with the board size and number of boards given on the command line."""
+    parser = argparse.ArgumentParser(description="Generate, play, and solve sudoku boards in a window.")
+    parser.add_argument('-s', '--size', type=int, choices=SIZES, default=9, help="number of rows and columns")
+    parser.add_argument('-b', '--boards', type=int, default=1,
+                        help="number of boards shown side by side, e.g. 16 for a tournament (default: 1)")
+    args = parser.parse_args()
+    if args.boards < 1:
+        parser.error("--boards must be at least 1")
+    main(size=args.size, num_boards=args.boards)
+
+
+if __name__ == '__main__':
+    cli()
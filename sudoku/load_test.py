@@ -0,0 +1,148 @@
+import asyncio
+import collections
+import itertools
+import json
+import time
+
+from . import benchmark, server
+
+
+async def _connection(host, port, requests, depth, latencies, statuses):
+    """
+    Sends requests over one connection, keeping up to depth of them waiting for a response at a time.
+
+    Parameters:
+        requests (Iterator of dict): The requests to send, shared with the other connections.
+        depth (int): The most requests to send before their responses come back.
+        latencies (List of float): The time in seconds each request took is added to it.
+        statuses (collections.Counter): The status of each response is counted in it.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port, limit=server.MAX_LINE)
+    sent = {}
+
+    async def receive():
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+        response = json.loads(line)
+        latencies.append(time.perf_counter() - sent.pop(response['id']))
+        statuses[response['status']] += 1
+
+    try:
+        for request in requests:
+            sent[request['id']] = time.perf_counter()
+            writer.write(json.dumps(request).encode('ascii') + b'\n')
+            if len(sent) >= depth:
+                await receive()
+        await writer.drain()
+        while sent:
+            await receive()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def make_requests(puzzles, n, op='solve', clues=30, timeout=None):
+    """
+    Makes requests to send to a SolverServer.
+
+    Parameters:
+        puzzles (List of str): The puzzles to solve or count, used in turn.
+        n (int): The number of requests.
+        op (str): The operation, one of server.OPERATIONS.
+        clues (int): The number of clues for generate requests.
+        timeout (float): The time budget of each request in seconds. None for the server's default.
+
+    Returns:
+        List of dict: The requests, with ids from 0.
+    """
+
+    requests = []
+    for request_id, puzzle in zip(range(n), itertools.cycle(puzzles)):
+        request = {'id': request_id, 'op': op}
+        if op == 'generate':
+            request['clues'] = clues
+        else:
+            request['puzzle'] = puzzle
+        if timeout is not None:
+            request['timeout'] = timeout
+        requests.append(request)
+    return requests
+
+
+async def run_load(requests, host=server.DEFAULT_HOST, port=server.DEFAULT_PORT, connections=8, depth=4):
+    """
+    Sends requests to a SolverServer over several connections at once and times them.
+
+    Parameters:
+        requests (List of dict): The requests, each with a unique id.
+        host (str): The address of the server.
+        port (int): The port of the server.
+        connections (int): The number of connections to open.
+        depth (int): The most requests each connection sends before their responses come back.
+
+    Returns:
+        dict: The elapsed time in seconds, the latency summary of benchmark.summarize() with requests per second in
+            place of puzzles per second, and the number of responses with each status.
+    """
+
+    shared = iter(requests)
+    latencies = []
+    statuses = collections.Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection(host, port, shared, depth, latencies, statuses) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    summary = benchmark.summarize(latencies)
+    summary['requests_per_sec'] = len(latencies) / elapsed if elapsed else 0.0
+    del summary['puzzles_per_sec']
+    summary['elapsed'] = elapsed
+    summary['statuses'] = dict(statuses)
+    return summary
+
+
+async def _serve_and_load(requests, args):
+    """Starts a server on a free local port, runs the load against it, then stops it."""
+    solver_server = server.SolverServer(workers=args.workers)
+    port = await solver_server.start(server.DEFAULT_HOST, 0)
+    try:
+        return await run_load(requests, server.DEFAULT_HOST, port, args.connections, args.depth), solver_server
+    finally:
+        await solver_server.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test a sudoku solving server with the bundled puzzles.")
+    parser.add_argument('--host', default=server.DEFAULT_HOST, help="address of the server")
+    parser.add_argument('-p', '--port', type=int, default=server.DEFAULT_PORT, help="port of the server")
+    parser.add_argument('--serve', action='store_true', help="start a server for the test instead of using one")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes of the started server")
+    parser.add_argument('-n', '--requests', type=int, default=2000, help="number of requests (default: 2000)")
+    parser.add_argument('-c', '--connections', type=int, default=8, help="number of connections (default: 8)")
+    parser.add_argument('--depth', type=int, default=4, help="requests in flight per connection (default: 4)")
+    parser.add_argument('--op', choices=server.OPERATIONS, default='solve', help="operation to request")
+    parser.add_argument('--corpus', choices=benchmark.CORPORA, default='hard', help="puzzles to send (default: hard)")
+    parser.add_argument('--timeout', type=float, default=None, help="time budget of each request in seconds")
+    args = parser.parse_args()
+
+    requests = make_requests(benchmark.load_corpus(args.corpus), args.requests, args.op, timeout=args.timeout)
+    if args.serve:
+        summary, solver_server = asyncio.run(_serve_and_load(requests, args))
+        print("server: {} requests, {} coalesced, {} busy".format(
+            solver_server.requests, solver_server.coalesced, solver_server.rejected))
+    else:
+        summary = asyncio.run(run_load(requests, args.host, args.port, args.connections, args.depth))
+
+    print("{} requests in {:.2f}s, {:.1f} requests/s".format(
+        summary['count'], summary['elapsed'], summary['requests_per_sec']))
+    print("latency mean {:.2f}ms p50 {:.2f}ms p95 {:.2f}ms p99 {:.2f}ms max {:.2f}ms".format(
+        summary['mean_ms'], summary['p50_ms'], summary['p95_ms'], summary['p99_ms'], summary['max_ms']))
+    statuses = sorted(summary['statuses'].items())
+    print("statuses: " + ', '.join('{} {}'.format(status, count) for status, count in statuses))
+
+
+if __name__ == '__main__':
+    main()
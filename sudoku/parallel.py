@@ -0,0 +1,338 @@
+import collections
+import time
+
+from . import solver
+from .board import Board, get_geometry
+
+
+# How many subproblems per worker the search tree is split into before the workers start. Work stealing evens out
+# whatever imbalance is left.
+TASKS_PER_WORKER = 4
+
+# How many nodes a worker searches between checks for cancellation and for idle workers to give work to.
+CHECK_EVERY = 512
+
+# How long in seconds to wait for the workers to stop before they are killed.
+_STOP_TIMEOUT = 1.0
+
+# How long in seconds to wait for a result before checking that the workers are still running.
+_POLL_TIMEOUT = 1.0
+
+
+def split(board, parts):
+    """
+    Splits the search of a board into subproblems by filling its first cells in every way the search would, taking
+    the shallowest subproblem apart each time until there are enough.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board. It is not changed.
+        parts (int): The number of subproblems to split it into, if it has that many.
+
+    Returns:
+        tuple: Contains (tasks, solutions) where tasks is a list of subproblems as the bytes of their cells in
+            row-major order, whose solutions together are the solutions of the board, and solutions is a list of
+            the solutions which were found while splitting, as bytes.
+    """
+
+    geometry = solver.geometry_of(board)
+    tasks = collections.deque([bytes(solver.to_cells(board))])
+    solutions = []
+    while tasks and len(tasks) < parts:
+        cells = tasks.popleft()
+        search = solver.Search.from_board(Board(cells, geometry.size))
+        if search is None:
+            continue
+        if not search.empties:
+            solutions.append(cells)
+            continue
+        pos, mask = search.pick()
+        idx = search.empties[pos]
+        child = bytearray(cells)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            child[idx] = geometry.number_of_bit[bit]
+            tasks.append(bytes(child))
+    return list(tasks), solutions
+
+
+class _Shared:
+    """
+    The state shared by the workers of one parallel search.
+
+    Attributes:
+        tasks (multiprocessing.Queue): The subproblems waiting for a worker, as bytes of their cells. None stops a
+            worker.
+        results (multiprocessing.Queue): Messages to the main process: ('solution', cells) for each solution found
+            and ('done', found, nodes) for each finished subproblem.
+        stop (multiprocessing.Value): Set to 1 to cancel the search.
+        idle (multiprocessing.Value): The number of workers waiting for a subproblem.
+        queued (multiprocessing.Value): The number of subproblems in tasks.
+        created (multiprocessing.Value): The number of subproblems made so far, counted before they are queued.
+    """
+
+    def __init__(self, context):
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.stop = context.Value('b', 0)
+        self.idle = context.Value('i', 0)
+        self.queued = context.Value('i', 0)
+        self.created = context.Value('i', 0)
+
+    def put_tasks(self, tasks):
+        """Queues subproblems, counting them first so the search can't be seen to finish before they are done."""
+        with self.created.get_lock():
+            self.created.value += len(tasks)
+        with self.queued.get_lock():
+            self.queued.value += len(tasks)
+        for task in tasks:
+            self.tasks.put(task)
+
+
+def _donate(start, stack, geometry, shared):
+    """
+    Gives away the untried candidates of the shallowest cell on the search stack which has any, one subproblem per
+    candidate. The shallowest cell has the largest subtrees under it, so an idle worker gets as much work as possible.
+
+    Returns:
+        int: The number of subproblems given away.
+    """
+
+    for depth, frame in enumerate(stack):
+        if frame[2]:
+            break
+    else:
+        return 0
+    cells = bytearray(start)
+    for idx, _, _, bit in stack[:depth]:
+        cells[idx] = geometry.number_of_bit[bit]
+    idx = frame[0]
+    mask = frame[2]
+    frame[2] = 0
+    tasks = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        cells[idx] = geometry.number_of_bit[bit]
+        tasks.append(bytes(cells))
+    shared.put_tasks(tasks)
+    return len(tasks)
+
+
+def _search(start, geometry, shared, limit, send_solutions):
+    """
+    Searches one subproblem with a solver.Search, as solver.iter_solutions() does, giving work away whenever more
+    workers are idle than there are subproblems queued.
+
+    Returns:
+        tuple: Contains (found, nodes): the number of solutions found, at most limit, and the nodes searched.
+    """
+
+    search = solver.Search.from_board(Board(start, geometry.size))
+    if search is None:
+        return 0, 0
+    empties = search.empties
+    stack = search.stack
+    stop = shared.stop
+    idle = shared.idle
+    queued = shared.queued
+    found = 0
+    nodes = 0
+    while True:
+        if not empties:
+            found += 1
+            if send_solutions:
+                shared.results.put(('solution', bytes(search.cells)))
+            if found >= limit:
+                break
+        else:
+            nodes += 1
+            if nodes % CHECK_EVERY == 0:
+                if stop.value:
+                    break
+                if idle.value > queued.value:
+                    _donate(start, stack, geometry, shared)
+            pos, mask = search.pick()
+            if mask:
+                search.push(pos, mask)
+
+        search.advance()
+        if not stack:
+            break
+    return found, nodes
+
+
+def _worker(size, shared, limit, send_solutions):
+    """Runs in a worker process, searching subproblems from the queue until it is sent None."""
+    # Messages left unsent when the search is cancelled are not needed, so exiting doesn't wait to send them.
+    shared.results.cancel_join_thread()
+    shared.tasks.cancel_join_thread()
+    geometry = get_geometry(size)
+    while True:
+        with shared.idle.get_lock():
+            shared.idle.value += 1
+        task = shared.tasks.get()
+        with shared.idle.get_lock():
+            shared.idle.value -= 1
+        if task is None:
+            return
+        with shared.queued.get_lock():
+            shared.queued.value -= 1
+        if shared.stop.value:
+            found, nodes = 0, 0
+        else:
+            found, nodes = _search(task, geometry, shared, limit, send_solutions)
+        shared.results.put(('done', found, nodes))
+
+
+def _run(board, workers, limit, send_solutions):
+    """
+    Searches a board on a pool of worker processes until limit solutions are found or the search is finished.
+    Raises RuntimeError if a worker process exits before the search is finished.
+
+    Returns:
+        tuple: Contains (solution, found, nodes): the first solution received as bytes, or None if none was found or
+            solutions were not sent, the number of solutions found, at most limit, and the nodes searched.
+    """
+
+    import multiprocessing
+    import queue
+
+    geometry = solver.geometry_of(board)
+    tasks, solutions = split(board, workers * TASKS_PER_WORKER)
+    found = min(len(solutions), limit)
+    if found >= limit or not tasks:
+        return (solutions[0] if solutions else None), found, 0
+
+    context = multiprocessing.get_context()
+    shared = _Shared(context)
+    processes = [context.Process(target=_worker, args=(geometry.size, shared, limit - found, send_solutions),
+                                 daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    shared.put_tasks(tasks)
+
+    solution = solutions[0] if solutions else None
+    nodes = 0
+    received = 0
+    try:
+        while True:
+            try:
+                message = shared.results.get(timeout=_POLL_TIMEOUT)
+            except queue.Empty:
+                # Workers only exit when told to, so one which has exited was killed or crashed, and the work it
+                # held would never be finished.
+                for process in processes:
+                    if not process.is_alive():
+                        raise RuntimeError("A worker process exited with code {} before the search was finished"
+                                           .format(process.exitcode))
+                continue
+            if message[0] == 'solution':
+                if solution is None:
+                    solution = message[1]
+                continue
+            found += message[1]
+            nodes += message[2]
+            received += 1
+            if found >= limit:
+                break
+            with shared.created.get_lock():
+                if received == shared.created.value:
+                    # Every subproblem is finished, and a subproblem can only be made by an unfinished one.
+                    break
+    finally:
+        shared.stop.value = 1
+        for _ in processes:
+            shared.tasks.put(None)
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+        shared.tasks.cancel_join_thread()
+    return solution, min(found, limit), nodes
+
+
+def parallel_solve(board, workers=None):
+    """
+    Solves a sudoku board in place, searching parts of it on several processes at once. The search stops as soon as
+    any process finds a solution.
+
+    Starting the processes takes some milliseconds, so this is only faster than solver.solve() for boards which take
+    the search longer than that. The processes only search with the bitmask engine, which is slower than the 'dlx'
+    engine solver.solve() uses for boards larger than 9x9, so those are best solved with 1 worker.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        workers (int): The number of worker processes. Defaults to the number of CPUs. With 1 worker the board is
+            solved in the calling process.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution, in which case it is left
+            unchanged.
+    """
+
+    import multiprocessing
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers <= 1:
+        return solver.solve(board)
+    solution = _run(board, workers, 1, True)[0]
+    if solution is None:
+        return False
+    solver.store_cells(board, solution, range(len(solution)))
+    return True
+
+
+def parallel_count(board, limit=2, workers=None):
+    """
+    Counts the solutions of a sudoku board on several processes at once, stopping once limit solutions have been
+    found. With the default limit of 2 this checks whether a board has a unique solution. The board is not changed.
+
+    As in parallel_solve(), the processes only search with the bitmask engine, so boards larger than 9x9 are best
+    counted with 1 worker.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        limit (int): The number of solutions after which counting stops.
+        workers (int): The number of worker processes. Defaults to the number of CPUs. With 1 worker the solutions
+            are counted in the calling process.
+
+    Returns:
+        int: The number of solutions, at most limit.
+    """
+
+    import multiprocessing
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers <= 1:
+        return solver.count_solutions(board, limit)
+    return _run(board, workers, limit, False)[1]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve one hard sudoku puzzle on several processes at once.")
+    parser.add_argument('puzzle', help="the puzzle as a string with one character per cell, 0 or . for blanks")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--count', type=int, default=None, metavar='LIMIT',
+                        help="count the solutions up to LIMIT instead of solving, e.g. 2 to check uniqueness")
+    args = parser.parse_args()
+
+    board = Board.from_string(args.puzzle)
+    start = time.perf_counter()
+    if args.count is not None:
+        print("{} solutions".format(parallel_count(board, args.count, args.workers)))
+    elif parallel_solve(board, args.workers):
+        print(board.to_string())
+    else:
+        print("unsolvable")
+    print("{:.3f}s".format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
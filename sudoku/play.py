@@ -0,0 +1,202 @@
+from .board import Board, geometry_of
+
+
+class PlayBoard:
+    """
+    A sudoku board being filled in by hand, which keeps track of the numbers in each row, column, and box as moves are
+    made so that conflicts and candidates can be looked up without scanning the board.
+
+    Each move changes the counts of one number in the three units of one cell, so making, undoing, or redoing a move
+    takes the same time however full the board is.
+
+    Attributes:
+        size (int): The number of rows and columns of the board.
+        geometry (board.Geometry): The lookup tables for the size of the board.
+        cells (List of int): The number in each cell in row-major order, 0 if the cell is empty.
+        givens (List of bool): True for each cell which held a clue and can't be changed.
+        empty (int): The number of empty cells.
+        conflicts (int): The number of times a number is repeated in a unit, counting every row, column, and box.
+    """
+
+    def __init__(self, board, clues=None):
+        """
+        The constructor for a PlayBoard.
+
+        Parameters:
+            board (List of List of int or Board): The puzzle. Its filled cells are the clues unless clues is given.
+            clues (List of List of int or Board): The clues, for a board which has been partly or fully filled in.
+        """
+
+        self.geometry = geometry_of(board)
+        self.size = self.geometry.size
+        if isinstance(board, Board):
+            self.cells = list(board.cells)
+        else:
+            self.cells = [num for row in board for num in row]
+        if clues is None:
+            self.givens = [num != 0 for num in self.cells]
+        elif isinstance(clues, Board):
+            self.givens = [num != 0 for num in clues.cells]
+        else:
+            self.givens = [num != 0 for row in clues for num in row]
+        self.empty = self.cells.count(0)
+        self.conflicts = 0
+        # The cells holding each number in each unit, and the bitmask of the numbers each unit holds.
+        self._holders = [[set() for _ in range(self.size + 1)] for _ in range(3 * self.size)]
+        self._masks = [0] * (3 * self.size)
+        self._undo = []
+        self._redo = []
+        for idx, num in enumerate(self.cells):
+            if num:
+                self._add(idx, num)
+
+    def _add(self, idx, num):
+        """Counts a number placed in a cell in the three units of the cell."""
+        bit = self.geometry.bits[num - 1]
+        for unit in self.geometry.cell_units[idx]:
+            holders = self._holders[unit][num]
+            if holders:
+                self.conflicts += 1
+            else:
+                self._masks[unit] |= bit
+            holders.add(idx)
+
+    def _remove(self, idx, num):
+        """Stops counting a number removed from a cell in the three units of the cell."""
+        bit = self.geometry.bits[num - 1]
+        for unit in self.geometry.cell_units[idx]:
+            holders = self._holders[unit][num]
+            holders.discard(idx)
+            if holders:
+                self.conflicts -= 1
+            else:
+                self._masks[unit] &= ~bit
+
+    def _change(self, idx, num):
+        """
+        Puts a number in a cell without recording the move.
+
+        Returns:
+            set: The cells whose conflict state may have changed, including the cell itself.
+        """
+
+        old = self.cells[idx]
+        changed = {idx}
+        if old:
+            self._remove(idx, old)
+            for unit in self.geometry.cell_units[idx]:
+                changed.update(self._holders[unit][old])
+        else:
+            self.empty -= 1
+        if num:
+            for unit in self.geometry.cell_units[idx]:
+                changed.update(self._holders[unit][num])
+            self._add(idx, num)
+        else:
+            self.empty += 1
+        self.cells[idx] = num
+        return changed
+
+    def set(self, idx, num):
+        """
+        Puts a number in a cell, or empties it, as a move which can be undone. Clears the moves which were undone.
+
+        Parameters:
+            idx (int): The index of the cell in row-major order.
+            num (int): The number, from 1 to size, or 0 to empty the cell.
+
+        Returns:
+            set: The cells whose conflict state may have changed, including the cell itself. Empty if the cell holds
+                a clue or already holds the number, in which case nothing is done.
+        """
+
+        if not 0 <= num <= self.size:
+            raise ValueError("Invalid number {} for a {}x{} board".format(num, self.size, self.size))
+        old = self.cells[idx]
+        if self.givens[idx] or old == num:
+            return set()
+        self._undo.append((idx, old, num))
+        self._redo.clear()
+        return self._change(idx, num)
+
+    def undo(self):
+        """
+        Takes back the last move.
+
+        Returns:
+            tuple: Contains (idx, changed) where idx is the cell of the move and changed is the cells whose conflict
+                state may have changed. Returns None if there are no moves to undo.
+        """
+
+        if not self._undo:
+            return None
+        idx, old, num = self._undo.pop()
+        self._redo.append((idx, old, num))
+        return idx, self._change(idx, old)
+
+    def redo(self):
+        """
+        Makes the last move which was undone again.
+
+        Returns:
+            tuple: Contains (idx, changed) where idx is the cell of the move and changed is the cells whose conflict
+                state may have changed. Returns None if there are no moves to redo.
+        """
+
+        if not self._redo:
+            return None
+        idx, old, num = self._redo.pop()
+        self._undo.append((idx, old, num))
+        return idx, self._change(idx, num)
+
+    def can_undo(self):
+        """bool: True if there is a move to undo."""
+        return bool(self._undo)
+
+    def can_redo(self):
+        """bool: True if there is an undone move to redo."""
+        return bool(self._redo)
+
+    def is_conflict(self, idx):
+        """
+        Checks whether the number in a cell is also in its row, column, or box.
+
+        Parameters:
+            idx (int): The index of the cell in row-major order.
+
+        Returns:
+            bool: True if the number is repeated, False if it isn't or the cell is empty.
+        """
+
+        num = self.cells[idx]
+        if not num:
+            return False
+        for unit in self.geometry.cell_units[idx]:
+            if len(self._holders[unit][num]) > 1:
+                return True
+        return False
+
+    def candidates(self, idx):
+        """
+        Finds the numbers which could go in a cell without repeating a number in its row, column, or box.
+
+        Parameters:
+            idx (int): The index of the cell in row-major order.
+
+        Returns:
+            int: The bitmask of the numbers, where the number n is stored as the bit 1 << (n - 1). 0 if the cell is
+                filled.
+        """
+
+        if self.cells[idx]:
+            return 0
+        row, column, box = self.geometry.cell_units[idx]
+        return self.geometry.all_numbers & ~(self._masks[row] | self._masks[column] | self._masks[box])
+
+    def is_solved(self):
+        """
+        Returns:
+            bool: True if every cell is filled and no number is repeated in a row, column, or box.
+        """
+
+        return self.empty == 0 and self.conflicts == 0
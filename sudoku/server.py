@@ -0,0 +1,329 @@
+import asyncio
+import concurrent.futures
+import json
+import random
+import time
+
+from . import solver
+from .board import Board, get_geometry
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# The operations a request can ask for.
+OPERATIONS = ('solve', 'count', 'generate')
+
+# The longest line a request may be, enough for a 25x25 puzzle and the other fields.
+MAX_LINE = 4096
+
+# The most solutions a count request may ask for.
+MAX_LIMIT = 10000
+
+# How many seconds before the deadline of a request a run it shares may stop, so that identical requests sent
+# together, whose deadlines are a moment apart, share one run.
+SHARE_SLACK = 0.05
+
+
+def _solve(puzzle, engine, deadline):
+    """Solves a puzzle in a worker process, stopping at the deadline."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        # The request waited in the queue for its whole budget.
+        return {'status': 'timeout'}
+    board = Board.from_string(puzzle)
+    status = solver.bounded_solve(board, timeout=remaining, engine=engine).status
+    if status == 'solved':
+        return {'status': status, 'solution': board.to_string()}
+    if status == 'budget_exceeded':
+        status = 'timeout'
+    return {'status': status}
+
+
+def _count(puzzle, limit, deadline):
+    """Counts the solutions of a puzzle in a worker process, stopping at the deadline."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return {'status': 'timeout'}
+    count = solver.count_solutions(Board.from_string(puzzle), limit, timeout=remaining)
+    if count is None:
+        return {'status': 'timeout'}
+    return {'status': 'ok', 'count': count}
+
+
+def _generate(clues, size, seed, deadline):
+    """Generates a puzzle in a worker process, stopping at the deadline. A seed always gives the same puzzle."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return {'status': 'timeout'}
+    rng = None if seed is None else random.Random(seed)
+    board = solver.new_random_board(clues, size, rng=rng, timeout=remaining)
+    if board is None:
+        return {'status': 'timeout'}
+    return {'status': 'ok', 'puzzle': solver.board_to_string(board)}
+
+
+class SolverServer:
+    """
+    A TCP server which runs the solver in a pool of worker processes, so that one slow puzzle doesn't hold up the
+    others.
+
+    Requests and responses are JSON objects, one per line. A request has an op, one of OPERATIONS, and:
+        solve: puzzle, and optionally engine.
+        count: puzzle, and optionally limit, the most solutions to count (default 2, at most MAX_LIMIT).
+        generate: clues, and optionally size (default 9) and seed, a number which always gives the same puzzle.
+    Any request may also have an id, which is copied into its response, and a timeout in seconds. Responses have a
+    status, one of 'solved', 'unsolvable', or 'ok' with the result, 'timeout' if the request ran out of time, 'busy'
+    if the server had too many requests waiting, or 'error' with an error message. Responses on one connection are
+    written as the requests finish, which may be out of order.
+
+    Every search in the workers stops itself at the deadline of its request, so no worker is kept busy by a request
+    which has already been answered 'timeout'.
+
+    Requests to solve or count the same puzzle while it is already being worked on share the work and the result,
+    unless the work would stop at its deadline before the new request's, in which case the new request starts its own.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        max_pending (int): The most requests which may wait for the workers at a time. More are answered 'busy'.
+        max_per_connection (int): The most requests from one connection which may be in progress at a time. The
+            connection isn't read from while it has this many, which pushes back on the client.
+        timeout (float): The time budget of a request in seconds, and the most a request may ask for.
+        requests (int): The number of requests answered.
+        coalesced (int): The number of requests which shared the work of an identical request.
+        rejected (int): The number of requests answered 'busy'.
+    """
+
+    def __init__(self, workers=None, max_pending=256, max_per_connection=32, timeout=10.0):
+        """
+        The constructor for a SolverServer.
+
+        Parameters:
+            workers (int): The number of worker processes. Defaults to the number of CPUs.
+            max_pending (int): The most requests which may wait for the workers at a time.
+            max_per_connection (int): The most requests from one connection which may be in progress at a time.
+            timeout (float): The time budget of a request in seconds, and the most a request may ask for.
+        """
+
+        import multiprocessing
+
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+        self.max_per_connection = max_per_connection
+        self.timeout = timeout
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._pool = None
+        self._server = None
+        self._pending = 0
+        self._in_flight = {}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Starts the worker processes and listens for connections.
+
+        Parameters:
+            host (str): The address to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+
+        Returns:
+            int: The port the server is listening on.
+        """
+
+        self._pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_LINE)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Serves connections until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening and shuts down the worker processes."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader, writer):
+        """Reads the requests of a connection and starts answering each one as it arrives."""
+        slots = asyncio.Semaphore(self.max_per_connection)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._answer(line, writer, write_lock, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except asyncio.CancelledError:
+            # The server is shutting down.
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, line, writer, write_lock, slots):
+        """Answers one request and writes the response."""
+        try:
+            response = await self.handle(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode('ascii') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            slots.release()
+
+    async def handle(self, line):
+        """
+        Answers one request.
+
+        Parameters:
+            line (bytes or str): The request as a JSON object.
+
+        Returns:
+            dict: The response.
+        """
+
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+        except ValueError as error:
+            return {'status': 'error', 'error': str(error)}
+        response = await self._run(request)
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def _run(self, request):
+        """Checks a request, then runs it in the worker pool or shares the run of an identical request."""
+        op = request.get('op')
+        timeout = request.get('timeout', self.timeout)
+        try:
+            if op not in OPERATIONS:
+                raise ValueError("Unknown op {!r}, expected one of {}".format(op, ', '.join(OPERATIONS)))
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise ValueError("timeout must be a positive number of seconds")
+            timeout = min(timeout, self.timeout)
+            deadline = time.time() + timeout
+            if op == 'generate':
+                clues = request.get('clues')
+                size = request.get('size', 9)
+                get_geometry(size)
+                if not isinstance(clues, int) or not 0 <= clues <= size * size:
+                    raise ValueError("clues must be a number from 0 to {}".format(size * size))
+                seed = request.get('seed')
+                if seed is not None and not isinstance(seed, int):
+                    raise ValueError("seed must be a number")
+                # A seeded puzzle is the same every time, so identical requests can share it.
+                key = None if seed is None else (op, clues, size, seed)
+                args = (_generate, clues, size, seed, deadline)
+            else:
+                puzzle = request.get('puzzle')
+                if not isinstance(puzzle, str):
+                    raise ValueError("puzzle must be a string")
+                Board.from_string(puzzle)
+                if op == 'solve':
+                    engine = request.get('engine')
+                    if engine is not None and engine not in solver.ENGINES:
+                        raise ValueError("Unknown engine {!r}, expected one of {}".format(
+                            engine, ', '.join(solver.ENGINES)))
+                    key = (op, puzzle, engine)
+                    args = (_solve, puzzle, engine, deadline)
+                else:
+                    limit = request.get('limit', 2)
+                    if not isinstance(limit, int) or not 1 <= limit <= MAX_LIMIT:
+                        raise ValueError("limit must be a number from 1 to {}".format(MAX_LIMIT))
+                    key = (op, puzzle, limit)
+                    args = (_count, puzzle, limit, deadline)
+        except ValueError as error:
+            return {'status': 'error', 'error': str(error)}
+
+        # A run stops at the deadline of the request which started it, so only a run which may go on for at least as
+        # long as this request may wait is shared.
+        future, run_deadline = self._in_flight.get(key, (None, None))
+        if future is not None and run_deadline >= deadline - SHARE_SLACK:
+            self.coalesced += 1
+        else:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                return {'status': 'busy'}
+            self._pending += 1
+            future = asyncio.get_running_loop().run_in_executor(self._pool, *args)
+            future.add_done_callback(lambda done: self._finish(key, done))
+            if key is not None:
+                self._in_flight[key] = (future, deadline)
+
+        try:
+            # Shielded so that a timed out request doesn't cancel the work other requests are sharing.
+            return dict(await asyncio.wait_for(asyncio.shield(future), timeout))
+        except asyncio.TimeoutError:
+            return {'status': 'timeout'}
+        except Exception as error:
+            return {'status': 'error', 'error': str(error)}
+
+    def _finish(self, key, future):
+        """Frees the place of a finished run in the worker pool."""
+        self._pending -= 1
+        # A later request with a longer timeout may have replaced the run under its key, which is left to finish.
+        if key is not None and self._in_flight.get(key, (None,))[0] is future:
+            del self._in_flight[key]
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """
+    Runs a SolverServer until cancelled.
+
+    Parameters:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        options: Passed to the SolverServer constructor.
+    """
+
+    server = SolverServer(**options)
+    port = await server.start(host, port)
+    print("Serving on {}:{} with {} workers".format(host, port, server.workers))
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the sudoku solver over TCP, one JSON request per line.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on (default: {})".format(DEFAULT_HOST))
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT,
+                        help="port to listen on (default: {})".format(DEFAULT_PORT))
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--max-pending', type=int, default=256,
+                        help="requests which may wait for the workers before more are answered busy (default: 256)")
+    parser.add_argument('--max-per-connection', type=int, default=32,
+                        help="requests from one connection which may be in progress at a time (default: 32)")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="time budget of a request in seconds, and the most one may ask for (default: 10)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_pending=args.max_pending,
+                          max_per_connection=args.max_per_connection, timeout=args.timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1996 @@
+import itertools
+import random
+import time
+
+from .board import Board, DIGITS, GEOMETRY, ROW_OF, COL_OF, BOX_OF, get_geometry, geometry_of
+
+
+def new_blank_board(size=9):
+    """
+    Creates a new sudoku board with no numbers entered.
+
+    Parameters:
+        size (int): The number of rows and columns, one of board.SIZES.
+
+    Returns:
+        List of List of int: A 2D array which represents a sudoku board.
+    """
+
+    get_geometry(size)
+    return [[0] * size for _ in range(size)]
+
+
+def board_from_string(puzzle):
+    """
+    Creates a sudoku board from a string with one character per cell, e.g. 81 characters for a 9x9 board.
+
+    Parameters:
+        puzzle (str): The numbers of the board in row-major order, with 0 or . for empty cells and the letters A-P
+            for the numbers 10-25.
+
+    Returns:
+        List of List of int: A 2D array which represents a sudoku board.
+    """
+
+    return Board.from_string(puzzle).to_rows()
+
+
+def board_to_string(board):
+    """
+    Converts a sudoku board into a string with one character per cell.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        str: The numbers of the board in row-major order, with 0 for empty cells and the letters A-P for the numbers
+            10-25.
+    """
+
+    if isinstance(board, Board):
+        return board.to_string()
+    return ''.join(DIGITS[num] for row in board for num in row)
+
+
+def new_random_board(num_clues, size=9, store=None, rng=None, timeout=None):
+    """
+    Creates a new sudoku board with random clues entered in.
+
+    The board always has exactly one solution. If there is no way to remove enough numbers while keeping the solution
+    unique, the board is returned with as few clues as could be reached.
+
+    Parameters:
+        num_clues (int): The number of clues which the board will have. Must be from [0, size * size].
+        size (int): The number of rows and columns, one of board.SIZES.
+        store (store.PuzzleStore): Pre-generated puzzles to take the board from instead of generating one. A stored
+            puzzle with fewer clues is given more from its solution. A board is generated if there is none.
+        rng (random.Random): The random number generator to use. None for the random module. A generator seeded
+            with the same seed always gives the same board, e.g. random.Random(seed) to reproduce a reported board.
+        timeout (float): The most seconds to spend generating. None for no limit.
+
+    Returns:
+        List of List of int: A 2D array which represents a sudoku board. Returns None if it ran out of time.
+    """
+
+    get_geometry(size)
+    if not 0 <= num_clues <= size * size:
+        raise ValueError("A {0}x{0} board can have from 0 to {1} clues, got {2}".format(size, size * size, num_clues))
+    if rng is None:
+        rng = random
+    deadline = None if timeout is None else time.perf_counter() + timeout
+
+    if store is not None and store.size == size:
+        board = _stored_board(num_clues, store, rng)
+        if board is not None:
+            return board
+
+    board = new_blank_board(size)
+
+    # Fill the first row of the board with random numbers from 1 to size.
+    numbers = list(range(1, size + 1))
+    for i in range(size):
+        rand_idx = rng.randrange(len(numbers))
+        board[0][i] = numbers.pop(rand_idx)
+
+    # Solve the board to get a complete and correct board.
+    if random_solve(board, rng, None if deadline is None else deadline - time.perf_counter()) is None:
+        return None
+
+    # Remove numbers in a random order, putting back any number whose removal would give the board more than one
+    # solution.
+    num_removals = size * size - num_clues
+    filled_indices = list(range(size * size))
+    rng.shuffle(filled_indices)
+    if size != 9:
+        # Larger boards are checked by count_solutions(), which uses Dancing Links for them.
+        for idx in filled_indices:
+            if num_removals == 0:
+                break
+            row, column = divmod(idx, size)
+            num = board[row][column]
+            board[row][column] = 0
+            count = count_solutions(board, timeout=None if deadline is None else deadline - time.perf_counter())
+            if count is None:
+                return None
+            if count == 1:
+                num_removals -= 1
+            else:
+                board[row][column] = num
+        return board
+
+    # The bitmasks are updated in place so that each uniqueness check works on the current board.
+    _, empties, rows, cols, boxes = init_masks(board)
+    for idx in filled_indices:
+        if num_removals == 0:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            # Each check of a 9x9 board takes at most a few milliseconds, so the time is only checked between them.
+            return None
+        row = ROW_OF[idx]
+        column = COL_OF[idx]
+        bit = 1 << (board[row][column] - 1)
+        rows[row] ^= bit
+        cols[column] ^= bit
+        boxes[BOX_OF[idx]] ^= bit
+        empties.append(idx)
+
+        if _count(empties, rows, cols, boxes, 2, GEOMETRY) == 1:
+            board[row][column] = 0
+            num_removals -= 1
+        else:
+            empties.pop()
+            rows[row] |= bit
+            cols[column] |= bit
+            boxes[BOX_OF[idx]] |= bit
+    return board
+
+
+def _stored_board(num_clues, store, rng):
+    """
+    Takes a random puzzle with up to num_clues clues from a store, adding clues from its solution until it has
+    num_clues. Adding clues keeps the solution unique.
+
+    Returns:
+        List of List of int: A 2D array which represents a sudoku board. Returns None if the store has no puzzle with
+            few enough clues.
+    """
+
+    for clues in range(num_clues, -1, -1):
+        idx = store.choice(clues, rng=rng)
+        if idx is not None:
+            break
+    else:
+        return None
+
+    puzzle, solution, _ = store[idx]
+    empties = [idx for idx, num in enumerate(puzzle.cells) if num == 0]
+    for idx in rng.sample(empties, num_clues - clues):
+        puzzle.cells[idx] = solution.cells[idx]
+    return puzzle.to_rows()
+
+
+def is_used_in_row(board, row, num):
+    """
+    Checks to see if a number is already being used in a certain row.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        row (int): The row to be checked.
+        num (int): The number that we want to see if it is already being used.
+
+    Returns:
+        bool: True if the number is being used in the row, False otherwise.
+    """
+
+    return num in board[row]
+
+
+def is_used_in_col(board, column, num):
+    """
+    Checks to see if a number is already being used in a certain column.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        column (int): The column to be checked.
+        num (int): The number that we want to see if it is already being used.
+
+    Returns:
+        bool: True if the number is being used in the column, False otherwise.
+    """
+
+    geometry = geometry_of(board)
+    for cell_row, cell_column in geometry.unit_positions[geometry.size + column]:
+        if board[cell_row][cell_column] == num:
+            return True
+    return False
+
+
+def is_used_in_box(board, row, column, num):
+    """
+    Checks to see if a number is already being used in a certain box.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        row (int): The row to be checked.
+        column (int): The column to be checked.
+        num (int): The number that we want to see if it is already being used.
+
+    Returns:
+        bool: True if the number is being used in the box, False otherwise.
+    """
+
+    geometry = geometry_of(board)
+    size = geometry.size
+    for cell_row, cell_column in geometry.unit_positions[2 * size + geometry.box_of[row * size + column]]:
+        if board[cell_row][cell_column] == num:
+            return True
+    return False
+
+
+def is_valid(board, row, column, num):
+    """
+    Checks to see if a number in a specified position is valid according to the rules of sudoku.
+
+    A number is valid if no other cell in its row, column, or box (its peers, 20 of them on a 9x9 board) already holds
+    it.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        row (int): The row to be checked.
+        column (int): The column to be checked.
+        num (int): The number to be checked.
+
+    Returns:
+        bool: True if the number is valid in the position, False otherwise.
+    """
+
+    if isinstance(board, Board):
+        geometry = get_geometry(board.size)
+        cells = board.cells
+        for peer in geometry.peers[row * board.size + column]:
+            if cells[peer] == num:
+                return False
+        return True
+
+    geometry = get_geometry(len(board))
+    for peer_row, peer_column in geometry.peer_positions[row * geometry.size + column]:
+        if board[peer_row][peer_column] == num:
+            return False
+    return True
+
+
+def validate_board(board):
+    """
+    Checks in one pass that a whole board follows the rules of sudoku.
+
+    A board is valid if it has n rows of n cells for one of the supported sizes n, every cell is empty (0) or holds a
+    number from 1 to n, and no number is repeated in a row, column, or box. The board does not have to be solvable.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        bool: True if the board is valid, False otherwise.
+    """
+
+    if isinstance(board, Board):
+        geometry = get_geometry(board.size)
+        cells = board.cells
+    else:
+        try:
+            geometry = get_geometry(len(board))
+        except ValueError:
+            return False
+        if any(len(row) != geometry.size for row in board):
+            return False
+        cells = to_cells(board)
+
+    bit_of_number = geometry.bit_of_number
+    cell_units = geometry.cell_units
+    used = [0] * (3 * geometry.size)
+    for idx in range(geometry.num_cells):
+        num = cells[idx]
+        if num == 0:
+            continue
+        bit = bit_of_number.get(num)
+        if bit is None:
+            return False
+        row, column, box = cell_units[idx]
+        if (used[row] | used[column] | used[box]) & bit:
+            return False
+        used[row] |= bit
+        used[column] |= bit
+        used[box] |= bit
+    return True
+
+
+def find_empty(board):
+    """
+    Finds the first cell (row, column) in a board that is empty.
+
+    A cell is empty if it is 0.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        tuple: Contains the indices (row, column). Returns None if there is not an empty cell.
+    """
+
+    size = len(board)
+    for row in range(size):
+        for column in range(size):
+            if board[row][column] == 0:
+                return (row, column)
+    return None
+
+
+class _BudgetExceeded(Exception):
+    """Raised inside a recursive search to stop it once it is out of budget. Its argument is the depth it stopped at."""
+
+
+def backtracking_solve(board, stats=None):
+    """
+    Recursively solves a sudoku board using the naive backtracking algorithm.
+
+    This is the original solver which rescans the row, column, and box for every candidate number. It is kept as a
+    reference implementation for comparing against the faster engines. It is far too slow for boards larger than 9x9.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        stats (SearchStats): Counters to add the work of the search to. None to not count.
+
+    Returns:
+        bool: True if the board is solved. Returns False if there are no valid numbers for a cell and retries.
+    """
+
+    if stats is None:
+        return _backtrack(board)
+    return _counted_backtrack(board, stats, 0)
+
+
+def _backtrack(board):
+    """The recursion of backtracking_solve()."""
+    find = find_empty(board)
+    if find is None:
+        return True
+    else:
+        row = find[0]
+        column = find[1]
+
+    for num in range(1, len(board) + 1):
+        if is_valid(board, row, column, num):
+            board[row][column] = num
+
+            if _backtrack(board):
+                return True
+
+            board[row][column] = 0
+    return False
+
+
+def _counted_backtrack(board, stats, depth, max_nodes=None, deadline=None):
+    """
+    Same as _backtrack() but counts its work in stats, raising _BudgetExceeded once stats.nodes reaches max_nodes or
+    deadline, a time.perf_counter() value, has passed. The board is left part filled in if it is raised.
+    """
+
+    if depth > stats.max_depth:
+        stats.max_depth = depth
+    if stats.nodes == max_nodes or deadline is not None and stats.nodes & 255 == 0 and time.perf_counter() > deadline:
+        raise _BudgetExceeded(depth)
+    stats.nodes += 1
+    find = find_empty(board)
+    if find is None:
+        return True
+    else:
+        row = find[0]
+        column = find[1]
+
+    for num in range(1, len(board) + 1):
+        stats.candidate_checks += 1
+        if is_valid(board, row, column, num):
+            board[row][column] = num
+            if stats.trace_every:
+                stats.record_placement(row, column, num, depth + 1)
+
+            if _counted_backtrack(board, stats, depth + 1, max_nodes, deadline):
+                return True
+
+            board[row][column] = 0
+    stats.backtracks += 1
+    return False
+
+
+# Lookup tables for the bitmask engine on 9x9 boards. The number n is stored as the bit 1 << (n - 1). Other sizes use
+# the same tables from their board.Geometry.
+ALL_NUMBERS = GEOMETRY.all_numbers
+BIT_COUNT = GEOMETRY.bit_count
+NUMBER_OF_BIT = GEOMETRY.number_of_bit
+BIT_OF_NUMBER = GEOMETRY.bit_of_number
+
+
+def to_cells(board):
+    """
+    Flattens a sudoku board into a list of its numbers in row-major order.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        List of int: The numbers of the board, with 0 for empty cells.
+    """
+
+    if isinstance(board, Board):
+        return list(board.cells)
+    return [num for row in board for num in row]
+
+
+def store_cells(board, cells, indices):
+    """
+    Copies numbers from a flat list of cells back into a sudoku board.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        cells (List of int): The numbers of the board in row-major order.
+        indices (Iterable of int): The indices of the cells to copy.
+    """
+
+    if isinstance(board, Board):
+        board_cells = board.cells
+        for idx in indices:
+            board_cells[idx] = cells[idx]
+    else:
+        size = len(board)
+        for idx in indices:
+            board[idx // size][idx % size] = cells[idx]
+
+
+def init_masks(board):
+    """
+    Builds the bitmask state used by the bitmask engine.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+
+    Returns:
+        tuple: Contains (cells, empties, rows, cols, boxes) where cells is a flat list of the numbers, empties is a
+            list of the indices of the empty cells, and rows, cols, and boxes are lists of bitmasks of the numbers
+            used in each row, column, and box. Returns None if the clues already break the rules of sudoku.
+    """
+
+    geometry = geometry_of(board)
+    row_of = geometry.row_of
+    col_of = geometry.col_of
+    box_of = geometry.box_of
+    cells = to_cells(board)
+    empties = []
+    rows = [0] * geometry.size
+    cols = [0] * geometry.size
+    boxes = [0] * geometry.size
+    for idx in range(geometry.num_cells):
+        num = cells[idx]
+        if num == 0:
+            empties.append(idx)
+            continue
+        bit = 1 << (num - 1)
+        row = row_of[idx]
+        column = col_of[idx]
+        box = box_of[idx]
+        if (rows[row] | cols[column] | boxes[box]) & bit:
+            return None
+        rows[row] |= bit
+        cols[column] |= bit
+        boxes[box] |= bit
+    return cells, empties, rows, cols, boxes
+
+
+def pick_cell(empties, rows, cols, boxes, geometry):
+    """
+    Finds the empty cell with the fewest candidates (minimum remaining values).
+
+    Parameters:
+        empties (List of int): The indices of the empty cells.
+        rows (List of int): The bitmask of the numbers used in each row.
+        cols (List of int): The bitmask of the numbers used in each column.
+        boxes (List of int): The bitmask of the numbers used in each box.
+        geometry (board.Geometry): The lookup tables for the size of the board.
+
+    Returns:
+        tuple: Contains (pos, mask) where pos is the position of the cell in empties and mask is the bitmask of its
+            candidates. The mask is 0 if some empty cell has no candidates.
+    """
+
+    # The tables are looked up once per call, as locals are faster than attributes or globals in the loop.
+    row_of = geometry.row_of
+    col_of = geometry.col_of
+    box_of = geometry.box_of
+    all_numbers = geometry.all_numbers
+    bit_count = geometry.bit_count
+    best_pos = 0
+    best_count = geometry.size + 1
+    best_mask = 0
+    for pos in range(len(empties)):
+        idx = empties[pos]
+        mask = ~(rows[row_of[idx]] | cols[col_of[idx]] | boxes[box_of[idx]]) & all_numbers
+        count = bit_count[mask]
+        if count < best_count:
+            if count == 0:
+                return pos, 0
+            best_pos = pos
+            best_count = count
+            best_mask = mask
+            if count == 1:
+                break
+    return best_pos, best_mask
+
+
+class Search:
+    """
+    The state of the bitmask search, moved forward a step at a time by bounded_solve(), iter_solutions(),
+    solve_steps(), and the workers of parallel.py.
+
+    The cells being guessed in are kept in an explicit stack instead of recursing, so a search can stop at any point
+    and carry on later. Each frame of the stack is [idx, pos, mask, bit]: the cell being filled, its position in
+    empties before it was removed, the candidates still to try, and the candidate currently placed (0 if none).
+
+    Attributes:
+        cells (List of int): The number in each cell in row-major order, 0 if the cell is empty.
+        empties (List of int): The indices of the empty cells which are not on the stack.
+        rows (List of int): The bitmask of the numbers used in each row.
+        cols (List of int): The bitmask of the numbers used in each column.
+        boxes (List of int): The bitmask of the numbers used in each box.
+        geometry (board.Geometry): The lookup tables for the size of the board.
+        stack (List of List of int): The frames of the cells being guessed in, the deepest last.
+    """
+
+    __slots__ = ('cells', 'empties', 'rows', 'cols', 'boxes', 'geometry', 'stack', '_row_of', '_col_of', '_box_of',
+                 '_number_of_bit')
+
+    def __init__(self, cells, empties, rows, cols, boxes, geometry):
+        """
+        The constructor for a Search. The lists are searched in place, not copied.
+
+        Parameters:
+            cells (List of int): The numbers of the board in row-major order, e.g. from init_masks().
+            empties (List of int): The indices of the empty cells.
+            rows (List of int): The bitmask of the numbers used in each row.
+            cols (List of int): The bitmask of the numbers used in each column.
+            boxes (List of int): The bitmask of the numbers used in each box.
+            geometry (board.Geometry): The lookup tables for the size of the board.
+        """
+
+        self.cells = cells
+        self.empties = empties
+        self.rows = rows
+        self.cols = cols
+        self.boxes = boxes
+        self.geometry = geometry
+        self.stack = []
+        # The tables used on every step, looked up once.
+        self._row_of = geometry.row_of
+        self._col_of = geometry.col_of
+        self._box_of = geometry.box_of
+        self._number_of_bit = geometry.number_of_bit
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Starts a search of a sudoku board. The board is not changed by the search.
+
+        Parameters:
+            board (List of List of int or Board): A sudoku board.
+
+        Returns:
+            Search: The search, with nothing on its stack. Returns None if the clues already break the rules of
+                sudoku.
+        """
+
+        state = init_masks(board)
+        if state is None:
+            return None
+        return cls(*state, geometry_of(board))
+
+    def pick(self):
+        """
+        Finds the empty cell to guess in next, as pick_cell() does.
+
+        Returns:
+            tuple: Contains (pos, mask) where pos is the position of the cell in empties and mask is the bitmask of its
+                candidates. The mask is 0 if some empty cell has no candidates.
+        """
+
+        return pick_cell(self.empties, self.rows, self.cols, self.boxes, self.geometry)
+
+    def push(self, pos, mask):
+        """
+        Starts guessing in an empty cell, moving it from empties onto the stack. Nothing is placed in the cell until
+        advance() is called.
+
+        Parameters:
+            pos (int): The position of the cell in empties, e.g. from pick().
+            mask (int): The bitmask of the candidates to try, which must not be 0.
+        """
+
+        empties = self.empties
+        idx = empties[pos]
+        empties[pos] = empties[-1]
+        empties[-1] = idx
+        empties.pop()
+        self.stack.append([idx, pos, mask, 0])
+
+    def advance(self, undone=None):
+        """
+        Takes back the number placed in the deepest cell on the stack and places its next candidate, backtracking out
+        of the cells which have none left.
+
+        Parameters:
+            undone (List of int): A list to append the index of each cell backtracked out of to, in order. None to
+                not keep them.
+
+        Returns:
+            int: The number of cells backtracked out of. The stack is empty if every candidate has been tried.
+        """
+
+        stack = self.stack
+        rows = self.rows
+        cols = self.cols
+        boxes = self.boxes
+        cells = self.cells
+        backtracks = 0
+        while stack:
+            frame = stack[-1]
+            idx, pos, mask, bit = frame
+            row = self._row_of[idx]
+            column = self._col_of[idx]
+            box = self._box_of[idx]
+            if bit:
+                rows[row] ^= bit
+                cols[column] ^= bit
+                boxes[box] ^= bit
+            if mask:
+                bit = mask & -mask
+                frame[2] = mask ^ bit
+                frame[3] = bit
+                rows[row] |= bit
+                cols[column] |= bit
+                boxes[box] |= bit
+                cells[idx] = self._number_of_bit[bit]
+                break
+            cells[idx] = 0
+            empties = self.empties
+            empties.append(idx)
+            empties[pos], empties[-1] = empties[-1], empties[pos]
+            stack.pop()
+            backtracks += 1
+            if undone is not None:
+                undone.append(idx)
+        return backtracks
+
+    def unwind(self):
+        """Takes back every guess on the stack, leaving the state as it was before the first push()."""
+        geometry = self.geometry
+        empties = self.empties
+        while self.stack:
+            idx, pos, mask, bit = self.stack.pop()
+            self.rows[geometry.row_of[idx]] ^= bit
+            self.cols[geometry.col_of[idx]] ^= bit
+            self.boxes[geometry.box_of[idx]] ^= bit
+            self.cells[idx] = 0
+            empties.append(idx)
+            empties[pos], empties[-1] = empties[-1], empties[pos]
+
+
+def bitmask_solve(board, stats=None):
+    """
+    Solves a sudoku board in place using backtracking over bitmasks.
+
+    The solver keeps bitmasks of the numbers used in every row, column, and box, updates them as numbers are
+    placed and removed, and always branches on the empty cell with the fewest candidates.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        stats (SearchStats): Counters to add the work of the search to. None to not count.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution, in which case it is left
+            unchanged.
+    """
+
+    search = Search.from_board(board)
+    if search is None:
+        return False
+    empties = list(search.empties)
+    if _iterative_search(search, stats=stats)[0] != 'solved':
+        return False
+
+    store_cells(board, search.cells, empties)
+    return True
+
+
+def _count(empties, rows, cols, boxes, limit, geometry):
+    """
+    Counts the ways the empty cells can be filled, stopping once limit solutions have been found.
+
+    Returns:
+        int: The number of solutions found, at most limit. The state is restored to how it was found.
+    """
+
+    if not empties:
+        return 1
+
+    best_pos, mask = pick_cell(empties, rows, cols, boxes, geometry)
+    if not mask:
+        return 0
+
+    idx = empties[best_pos]
+    row = geometry.row_of[idx]
+    column = geometry.col_of[idx]
+    box = geometry.box_of[idx]
+    empties[best_pos], empties[-1] = empties[-1], empties[best_pos]
+    empties.pop()
+
+    found = 0
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        rows[row] |= bit
+        cols[column] |= bit
+        boxes[box] |= bit
+
+        found += _count(empties, rows, cols, boxes, limit - found, geometry)
+
+        rows[row] ^= bit
+        cols[column] ^= bit
+        boxes[box] ^= bit
+        if found >= limit:
+            break
+
+    empties.append(idx)
+    empties[best_pos], empties[-1] = empties[-1], empties[best_pos]
+    return found
+
+
+def _bounded_count(search, limit, max_nodes, deadline):
+    """
+    Same as _count() but moving a Search forward a step at a time, giving up once it has visited max_nodes nodes or
+    run past deadline, a time.perf_counter() value.
+
+    Returns:
+        int: The number of solutions found, at most limit. Returns None if the search ran out of budget. The search
+            is unwound before returning.
+    """
+
+    empties = search.empties
+    stack = search.stack
+    found = 0
+    nodes = 0
+    while True:
+        if not empties:
+            found += 1
+            if found >= limit:
+                break
+        else:
+            if max_nodes is not None and nodes >= max_nodes:
+                found = None
+                break
+            if deadline is not None and nodes & 255 == 0 and time.perf_counter() > deadline:
+                found = None
+                break
+            nodes += 1
+            pos, mask = search.pick()
+            if mask:
+                search.push(pos, mask)
+        search.advance()
+        if not stack:
+            break
+    search.unwind()
+    return found
+
+
+def count_solutions(board, limit=2, max_nodes=None, timeout=None):
+    """
+    Counts the solutions of a sudoku board, stopping early once limit solutions have been found.
+
+    With the default limit of 2 this checks whether a board has a unique solution. The board is not changed.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        limit (int): The number of solutions after which counting stops.
+        max_nodes (int): The most search nodes to visit. None for no limit.
+        timeout (float): The most seconds to search for. None for no limit.
+
+    Returns:
+        int: The number of solutions, at most limit. Returns None if the count ran out of budget.
+    """
+
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    if len(board) > 9:
+        # Without guessing, the bitmask search only fills cells which have one candidate left. On larger boards that
+        # is too weak to rule out a second solution in reasonable time, so they are counted with Dancing Links, which
+        # also fills numbers which have one cell left in a row, column, or box.
+        return _dlx_search(board, limit, None, max_nodes, deadline)[0]
+
+    if max_nodes is not None or deadline is not None:
+        search = Search.from_board(board)
+        if search is None:
+            return 0
+        return _bounded_count(search, limit, max_nodes, deadline)
+
+    state = init_masks(board)
+    if state is None:
+        return 0
+    cells, empties, rows, cols, boxes = state
+    return _count(empties, rows, cols, boxes, limit, geometry_of(board))
+
+
+def first_branch(board):
+    """
+    Finds the first cell where the bitmask search has to guess, after placing the numbers it is forced to place.
+
+    The candidates of this cell split the solutions of the board into parts which don't overlap. Pass some of them as
+    the first argument of iter_solutions() to search only those parts, e.g. in separate processes.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board. It is not changed.
+
+    Returns:
+        tuple: Contains (row, column, numbers) where numbers is the list of candidates of the cell in the order they
+            are searched. Returns None if the board is solved, has no solution, or has only forced numbers left.
+    """
+
+    state = init_masks(board)
+    if state is None:
+        return None
+    _, empties, rows, cols, boxes = state
+    geometry = geometry_of(board)
+    while empties:
+        pos, mask = pick_cell(empties, rows, cols, boxes, geometry)
+        if not mask:
+            return None
+        idx = empties[pos]
+        if geometry.bit_count[mask] > 1:
+            return geometry.row_of[idx], geometry.col_of[idx], _numbers(mask, geometry)
+        rows[geometry.row_of[idx]] |= mask
+        cols[geometry.col_of[idx]] |= mask
+        boxes[geometry.box_of[idx]] |= mask
+        empties[pos] = empties[-1]
+        empties.pop()
+    return None
+
+
+def iter_solutions(board, limit=None, first=None, after=None):
+    """
+    Finds the solutions of a sudoku board one at a time, as they are needed.
+
+    This is the same search as bounded_solve(), kept going after each solution. Only the search stack is kept between
+    solutions, so enumerating many solutions takes no more memory than finding one, and solutions always come in the
+    same order.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board. It is not changed.
+        limit (int): The most solutions to yield. None for every solution.
+        first (Iterable of int): The numbers to try in the cell given by first_branch(). None to try every candidate.
+            Splitting the candidates of that cell between searches splits the solutions between them.
+        after (bytes): A solution yielded by an earlier search of the same board and first, to carry on from just
+            after it without searching again for the solutions before it.
+
+    Yields:
+        bytes: Each solution as the numbers of its cells in row-major order, e.g. Board(solution, size) for a Board.
+    """
+
+    search = Search.from_board(board)
+    if search is None or limit == 0:
+        return
+    cells = search.cells
+    empties = search.empties
+    stack = search.stack
+    geometry = search.geometry
+    bit_count = geometry.bit_count
+    first_mask = None
+    if first is not None:
+        first_mask = 0
+        for num in first:
+            first_mask |= geometry.bit_of_number[num]
+
+    found = 0
+    while True:
+        if not empties:
+            if after is not None:
+                # The replay has reached the solution to carry on from, which is not yielded again.
+                after = None
+            else:
+                yield bytes(cells)
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        else:
+            pos, mask = search.pick()
+            if first_mask is not None and bit_count[mask] > 1:
+                mask &= first_mask
+                first_mask = None
+            if mask:
+                if after is not None:
+                    # Place the number of the solution to carry on from, as the search did when it found it, leaving
+                    # the candidates which come after it to try.
+                    bit = geometry.bit_of_number[after[empties[pos]]]
+                    if not mask & bit:
+                        raise ValueError("after is not a solution of this search")
+                    mask &= ~((bit << 1) - 1)
+                    mask |= bit
+                search.push(pos, mask)
+
+        search.advance()
+        if not stack:
+            return
+
+
+class SearchStats:
+    """
+    Counters filled in by a search, for finding out which puzzles make the search blow up.
+
+    Pass a SearchStats as the stats argument of solve(), bounded_solve(), or solve_steps(). The counters add up over
+    every search it is passed to. Searches which are not given one do not count anything.
+
+    Attributes:
+        nodes (int): The number of search nodes visited.
+        backtracks (int): The number of times a cell ran out of candidates and was emptied again.
+        max_depth (int): The largest number of cells the search had filled at one time.
+        candidate_checks (int): The number of times the candidates of a cell, or for the naive backtracker a single
+            number in a cell, were checked.
+        elapsed (float): The time in seconds spent searching.
+        placements (int): The number of numbers the search placed. Only counted when tracing.
+        trace_every (int): One in every this many placements is recorded in trace. 0 records none.
+        trace_limit (int): The most placements kept in trace.
+        trace (List of tuple): Contains (row, column, num, depth) for each recorded placement.
+    """
+
+    __slots__ = ('nodes', 'backtracks', 'max_depth', 'candidate_checks', 'elapsed', 'placements', 'trace_every',
+                 'trace_limit', 'trace')
+
+    def __init__(self, trace_every=0, trace_limit=1000):
+        """
+        The constructor for a SearchStats.
+
+        Parameters:
+            trace_every (int): Record one in every this many placements. 0 records none.
+            trace_limit (int): The most placements to keep.
+        """
+
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.candidate_checks = 0
+        self.elapsed = 0.0
+        self.placements = 0
+        self.trace_every = trace_every
+        self.trace_limit = trace_limit
+        self.trace = []
+
+    def add(self, nodes, backtracks, max_depth, candidate_checks):
+        """Adds the counts of a finished search."""
+        self.nodes += nodes
+        self.backtracks += backtracks
+        self.max_depth = max(self.max_depth, max_depth)
+        self.candidate_checks += candidate_checks
+
+    def record_placement(self, row, column, num, depth):
+        """Counts a placement and records it in the trace if it is one of the sampled ones."""
+        self.placements += 1
+        if self.placements % self.trace_every == 0 and len(self.trace) < self.trace_limit:
+            self.trace.append((row, column, num, depth))
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: The counters by attribute name, without the trace settings.
+        """
+
+        return {
+            'nodes': self.nodes,
+            'backtracks': self.backtracks,
+            'max_depth': self.max_depth,
+            'candidate_checks': self.candidate_checks,
+            'elapsed': self.elapsed,
+            'placements': self.placements,
+            'trace': list(self.trace),
+        }
+
+    def __repr__(self):
+        return 'SearchStats(nodes={}, backtracks={}, max_depth={}, candidate_checks={}, elapsed={:.6f})'.format(
+            self.nodes, self.backtracks, self.max_depth, self.candidate_checks, self.elapsed)
+
+
+class SearchResult:
+    """
+    The outcome of a search with a work budget.
+
+    A SearchResult is truthy if the board was solved.
+
+    Attributes:
+        status (str): 'solved' if the board was solved, 'unsolvable' if the whole search tree was explored without
+            finding a solution, or 'budget_exceeded' if the search was stopped by max_nodes or timeout.
+        nodes (int): The number of search nodes visited.
+        depth (int): How many cells had been filled by the search when it stopped.
+        max_depth (int): The largest number of cells the search had filled at one time.
+        elapsed (float): The time in seconds the search took.
+    """
+
+    __slots__ = ('status', 'nodes', 'depth', 'max_depth', 'elapsed')
+
+    def __init__(self, status, nodes, depth, max_depth, elapsed):
+        self.status = status
+        self.nodes = nodes
+        self.depth = depth
+        self.max_depth = max_depth
+        self.elapsed = elapsed
+
+    @property
+    def solved(self):
+        return self.status == 'solved'
+
+    def __bool__(self):
+        return self.solved
+
+    def __repr__(self):
+        return 'SearchResult(status={!r}, nodes={}, depth={}, max_depth={}, elapsed={:.6f})'.format(
+            self.status, self.nodes, self.depth, self.max_depth, self.elapsed)
+
+
+def _iterative_search(search, max_nodes=None, deadline=None, stats=None):
+    """
+    Fills the empty cells of a search, always branching on the cell with the fewest candidates, until it is solved,
+    shown to have no solution, or out of budget.
+
+    Returns:
+        tuple: Contains (status, nodes, depth, max_depth) as described in SearchResult. The state is only restored
+            to how it was found if the status is not 'solved'.
+    """
+
+    cells = search.cells
+    empties = search.empties
+    rows = search.rows
+    cols = search.cols
+    boxes = search.boxes
+    stack = search.stack
+    geometry = search.geometry
+    bit_count = geometry.bit_count
+    nodes = 0
+    max_depth = 0
+    backtracks = 0
+    checks = 0
+    trace_every = 0 if stats is None else stats.trace_every
+    status = 'budget_exceeded'
+    while True:
+        if not empties:
+            status = 'solved'
+            break
+
+        if max_nodes is not None and nodes >= max_nodes:
+            break
+        if deadline is not None and nodes & 255 == 0 and time.perf_counter() > deadline:
+            break
+        nodes += 1
+
+        pos, mask = pick_cell(empties, rows, cols, boxes, geometry)
+        if stats is not None:
+            # pick_cell() stops scanning at the first cell with one or no candidates.
+            checks += pos + 1 if bit_count[mask] <= 1 else len(empties)
+        if mask:
+            search.push(pos, mask)
+            if len(stack) > max_depth:
+                max_depth = len(stack)
+
+        backtracks += search.advance()
+        if not stack:
+            status = 'unsolvable'
+            break
+        if trace_every:
+            idx = stack[-1][0]
+            stats.record_placement(geometry.row_of[idx], geometry.col_of[idx], cells[idx], len(stack))
+
+    depth = len(stack)
+    if status == 'budget_exceeded':
+        search.unwind()
+
+    if stats is not None:
+        stats.add(nodes, backtracks, max_depth, checks)
+    return status, nodes, depth, max_depth
+
+
+def bounded_solve(board, max_nodes=None, timeout=None, stats=None, engine=None):
+    """
+    Solves a sudoku board in place, giving up once a work budget is used.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        max_nodes (int): The most search nodes to visit. None for no limit.
+        timeout (float): The most seconds to search for. None for no limit.
+        stats (SearchStats): Counters to add the work of the search to. None to not count.
+        engine (str): The name of the engine to search with, as in solve(). Defaults to 'bitmask' for 9x9 boards and
+            smaller, and 'dlx' for larger ones. The bitmask and logic searches are the only ones which run without
+            recursion. The logical techniques of 'logic' are not counted as nodes.
+
+    Returns:
+        SearchResult: What the search found and how much work it did. The board is only changed if it was solved.
+    """
+
+    if engine is None:
+        engine = 'bitmask' if len(board) <= 9 else 'dlx'
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine {!r}, expected one of {}".format(engine, ', '.join(ENGINES)))
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+    if engine == 'bitmask':
+        search = Search.from_board(board)
+        if search is None:
+            return SearchResult('unsolvable', 0, 0, 0, time.perf_counter() - start)
+        empties = list(search.empties)
+        status, nodes, depth, max_depth = _iterative_search(search, max_nodes, deadline, stats)
+        if status == 'solved':
+            store_cells(board, search.cells, empties)
+    elif engine == 'logic':
+        status, nodes, depth, max_depth = _logic_search(board, max_nodes, deadline, stats)
+    elif engine == 'dlx':
+        count, cells, nodes, depth, max_depth = _dlx_search(board, 1, stats, max_nodes, deadline)
+        status = 'budget_exceeded' if count is None else 'solved' if count else 'unsolvable'
+        if status == 'solved':
+            store_cells(board, cells, range(len(cells)))
+    else:
+        status, nodes, depth, max_depth = _bounded_backtrack(board, max_nodes, deadline, stats)
+    elapsed = time.perf_counter() - start
+    if stats is not None:
+        stats.elapsed += elapsed
+    return SearchResult(status, nodes, depth, max_depth, elapsed)
+
+
+def _bounded_backtrack(board, max_nodes, deadline, stats):
+    """
+    Runs the naive backtracker within a budget, as in _iterative_search().
+
+    Returns:
+        tuple: Contains (status, nodes, depth, max_depth) as described in SearchResult. The board is only changed if
+            it was solved.
+    """
+
+    empties = [(row, column) for row in range(len(board)) for column in range(len(board)) if not board[row][column]]
+    # The counters of this search alone, so that the budget and the result don't include earlier searches.
+    counters = SearchStats(0 if stats is None else stats.trace_every)
+    try:
+        status = 'solved' if _counted_backtrack(board, counters, 0, max_nodes, deadline) else 'unsolvable'
+        depth = len(empties) if status == 'solved' else 0
+    except _BudgetExceeded as stop:
+        for row, column in empties:
+            board[row][column] = 0
+        status, depth = 'budget_exceeded', stop.args[0]
+    if stats is not None:
+        stats.add(counters.nodes, counters.backtracks, counters.max_depth, counters.candidate_checks)
+        stats.placements += counters.placements
+        stats.trace.extend(counters.trace[:stats.trace_limit - len(stats.trace)])
+    return status, counters.nodes, depth, counters.max_depth
+
+
+def solve_steps(board, stats=None):
+    """
+    Solves a sudoku board in place one step at a time, so that the search can be shown or paused.
+
+    This is the same search as bitmask_solve(). The board is updated before each step is yielded.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        stats (SearchStats): Counters to add the work of the search to. None to not count. The elapsed time includes
+            the time the caller spends between steps.
+
+    Yields:
+        tuple: ('place', row, column, num) when a number is placed in a cell, or ('undo', row, column) when a cell is
+            emptied again because the search backtracked.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution.
+    """
+
+    start = time.perf_counter()
+    search = Search.from_board(board)
+    if search is None:
+        return False
+    empties = search.empties
+    stack = search.stack
+    geometry = search.geometry
+    while True:
+        if not empties:
+            if stats is not None:
+                stats.elapsed += time.perf_counter() - start
+            return True
+
+        pos, mask = search.pick()
+        if stats is not None:
+            stats.add(1, 0, 0, pos + 1 if geometry.bit_count[mask] <= 1 else len(empties))
+        if mask:
+            search.push(pos, mask)
+            if stats is not None:
+                stats.max_depth = max(stats.max_depth, len(stack))
+
+        undone = []
+        backtracks = search.advance(undone)
+        for idx in undone:
+            row = geometry.row_of[idx]
+            column = geometry.col_of[idx]
+            board[row][column] = 0
+            yield 'undo', row, column
+        if stats is not None:
+            stats.backtracks += backtracks
+        if not stack:
+            if stats is not None:
+                stats.elapsed += time.perf_counter() - start
+            return False
+        idx = stack[-1][0]
+        row = geometry.row_of[idx]
+        column = geometry.col_of[idx]
+        num = search.cells[idx]
+        board[row][column] = num
+        if stats is not None and stats.trace_every:
+            stats.record_placement(row, column, num, len(stack))
+        yield 'place', row, column, num
+
+
+# Dancing links structure for sudoku as an exact cover problem. Node 0 is the root, the next 4 * size * size nodes are
+# the column headers for the constraints (each cell has a number, and each row, column, and box has each number; 324
+# on a 9x9 board), and every candidate (cell, number) is a row of 4 nodes. The structure is built once for each size
+# of board and copied for each solve.
+_dlx_templates = {}
+
+
+def _build_dlx(geometry):
+    """
+    Builds the linked lists of the dancing links structure for an empty board.
+
+    Returns:
+        tuple: Contains the lists (left, right, up, down, column, choice, sizes) which describe every node.
+    """
+
+    size = geometry.size
+    num_cells = geometry.num_cells
+    num_columns = 4 * num_cells
+    num_headers = num_columns + 1
+    left = [node - 1 for node in range(num_headers)]
+    left[0] = num_columns
+    right = [node + 1 for node in range(num_headers)]
+    right[num_columns] = 0
+    up = list(range(num_headers))
+    down = list(range(num_headers))
+    column = list(range(num_headers))
+    choice = [-1] * num_headers
+    sizes = [0] * num_headers
+
+    for idx in range(num_cells):
+        row = geometry.row_of[idx]
+        col = geometry.col_of[idx]
+        box = geometry.box_of[idx]
+        for n in range(size):
+            headers = (1 + idx, 1 + num_cells + row * size + n, 1 + 2 * num_cells + col * size + n,
+                       1 + 3 * num_cells + box * size + n)
+            first = len(left)
+            for k in range(4):
+                node = first + k
+                header = headers[k]
+                left.append(first + (k - 1) % 4)
+                right.append(first + (k + 1) % 4)
+                up.append(up[header])
+                down.append(header)
+                down[up[header]] = node
+                up[header] = node
+                column.append(header)
+                choice.append(idx * size + n)
+                sizes[header] += 1
+    return left, right, up, down, column, choice, sizes
+
+
+def _dlx_search(board, limit, stats=None, max_nodes=None, deadline=None):
+    """
+    Searches for the solutions of a sudoku board with Dancing Links, stopping once limit solutions have been found,
+    or once the search has visited max_nodes nodes or run past deadline, a time.perf_counter() value.
+
+    Returns:
+        tuple: Contains (count, cells, nodes, depth, max_depth) where count is the number of solutions found, at most
+            limit, and cells is a flat list of the numbers of the first solution. count is None if the search ran out
+            of budget, and cells is None if no solution was found. nodes, depth and max_depth are as described in
+            SearchResult.
+    """
+
+    geometry = geometry_of(board)
+    size = geometry.size
+    num_columns = 4 * geometry.num_cells
+    template = _dlx_templates.get(size)
+    if template is None:
+        template = _dlx_templates[size] = _build_dlx(geometry)
+    left, right, up, down, column, choice, sizes = [list(links) for links in template]
+
+    def cover(header):
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                sizes[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(header):
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                sizes[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    first_solution = []
+    nodes = 0
+    max_depth = 0
+
+    def search(solution, limit):
+        nonlocal nodes, max_depth
+        if len(solution) > max_depth:
+            max_depth = len(solution)
+        if max_nodes is not None or deadline is not None:
+            if right[0] and (nodes == max_nodes or
+                             deadline is not None and nodes & 255 == 0 and time.perf_counter() > deadline):
+                raise _BudgetExceeded(len(solution))
+        nodes += 1
+        if stats is not None:
+            # Every chosen row covers 4 constraints, so this is how many column sizes are compared below.
+            stats.nodes += 1
+            stats.candidate_checks += num_columns - 4 * (num_clues + len(solution))
+            stats.max_depth = max(stats.max_depth, len(solution))
+
+        header = right[0]
+        if header == 0:
+            if not first_solution:
+                first_solution.extend(solution)
+            return 1
+
+        # Branch on the constraint with the fewest candidates.
+        best = header
+        best_size = sizes[header]
+        while header != 0:
+            if sizes[header] < best_size:
+                best = header
+                best_size = sizes[header]
+            header = right[header]
+        if best_size == 0:
+            if stats is not None:
+                stats.backtracks += 1
+            return 0
+
+        found = 0
+        cover(best)
+        i = down[best]
+        while i != best:
+            solution.append(choice[i])
+            if stats is not None and stats.trace_every:
+                stats.record_placement(choice[i] // size // size, choice[i] // size % size, choice[i] % size + 1,
+                                       len(solution))
+            j = right[i]
+            while j != i:
+                cover(column[j])
+                j = right[j]
+
+            found += search(solution, limit - found)
+            if found >= limit:
+                # The links are thrown away once the search is over, so they are not restored.
+                return found
+
+            j = left[i]
+            while j != i:
+                uncover(column[j])
+                j = left[j]
+            solution.pop()
+            i = down[i]
+        uncover(best)
+        if not found and stats is not None:
+            stats.backtracks += 1
+        return found
+
+    # Select the rows of the clues. A clue conflicts with an earlier one if any of its constraints is already covered.
+    covered = [False] * (num_columns + 1)
+    cells = to_cells(board)
+    num_clues = 0
+    for idx in range(geometry.num_cells):
+        num = cells[idx]
+        if num == 0:
+            continue
+        num_clues += 1
+        first = num_columns + 1 + (idx * size + num - 1) * 4
+        for node in range(first, first + 4):
+            if covered[column[node]]:
+                return 0, None, 0, 0, 0
+            covered[column[node]] = True
+            cover(column[node])
+
+    try:
+        count = search([], limit)
+    except _BudgetExceeded as stop:
+        return None, None, nodes, stop.args[0], max_depth
+    if not count:
+        return 0, None, nodes, 0, max_depth
+    for candidate in first_solution:
+        cells[candidate // size] = candidate % size + 1
+    return count, cells, nodes, len(first_solution), max_depth
+
+
+def dlx_solve(board, stats=None):
+    """
+    Solves a sudoku board in place by modelling it as an exact cover problem and using Dancing Links (Algorithm X).
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        stats (SearchStats): Counters to add the work of the search to. None to not count.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution, in which case it is left
+            unchanged.
+    """
+
+    count, cells = _dlx_search(board, 1, stats)[:2]
+    if not count:
+        return False
+    store_cells(board, cells, range(len(cells)))
+    return True
+
+
+# Logical techniques in the order a person would try them, easiest first.
+TECHNIQUES = ('naked_single', 'hidden_single', 'pointing', 'claiming', 'naked_pair', 'hidden_pair', 'naked_triple',
+              'hidden_triple', 'x_wing')
+
+
+class Deduction:
+    """
+    One step of a logical solve: a number placed or candidates removed by a technique.
+
+    Attributes:
+        technique (str): The technique used, one of TECHNIQUES.
+        cells (tuple): The (row, column) positions of the cells the step is based on, e.g. the two cells of a pair.
+        placements (List of tuple): (row, column, num) for each number the step places.
+        eliminations (List of tuple): (row, column, num) for each candidate the step removes.
+    """
+
+    __slots__ = ('technique', 'cells', 'placements', 'eliminations')
+
+    def __init__(self, technique, cells, placements=(), eliminations=(), size=9):
+        """
+        The constructor for a Deduction.
+
+        Parameters:
+            technique (str): The technique used, one of TECHNIQUES.
+            cells (Iterable of int): The indices of the cells the step is based on.
+            placements (Iterable of tuple): (idx, num) for each number the step places.
+            eliminations (Iterable of tuple): (idx, num) for each candidate the step removes.
+            size (int): The number of rows and columns of the board.
+        """
+
+        self.technique = technique
+        self.cells = tuple(divmod(idx, size) for idx in cells)
+        self.placements = [divmod(idx, size) + (num,) for idx, num in placements]
+        self.eliminations = [divmod(idx, size) + (num,) for idx, num in eliminations]
+
+    def __repr__(self):
+        return 'Deduction({!r}, cells={}, placements={}, eliminations={})'.format(
+            self.technique, self.cells, self.placements, self.eliminations)
+
+
+class _Contradiction(Exception):
+    """Raised when a deduction leaves a cell with no candidates or a number with no cell in a unit."""
+
+
+def _numbers(mask, geometry):
+    """Returns the numbers whose bits are set in a bitmask, smallest first."""
+    numbers = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        numbers.append(geometry.number_of_bit[bit])
+    return numbers
+
+
+def _init_candidates(board):
+    """
+    Builds the candidate bitmask of every cell.
+
+    Returns:
+        tuple: Contains (cells, cands, used) where cells is a flat list of the numbers, cands is a list of the
+            candidate bitmasks with 0 for filled cells, and used is a list of bitmasks of the numbers placed in each
+            unit, in the order of Geometry.units. Returns None if the clues break the rules of sudoku or leave a
+            cell with no candidates.
+    """
+
+    state = init_masks(board)
+    if state is None:
+        return None
+    cells, empties, rows, cols, boxes = state
+    geometry = geometry_of(board)
+    cands = [0] * geometry.num_cells
+    for idx in empties:
+        mask = ~(rows[geometry.row_of[idx]] | cols[geometry.col_of[idx]] | boxes[geometry.box_of[idx]]) \
+            & geometry.all_numbers
+        if not mask:
+            return None
+        cands[idx] = mask
+    return cells, cands, rows + cols + boxes
+
+
+def _find_naked_single(cands, used, geometry):
+    """Finds a cell with only one candidate."""
+    for idx in range(geometry.num_cells):
+        mask = cands[idx]
+        if mask and not mask & (mask - 1):
+            return Deduction('naked_single', (idx,), [(idx, geometry.number_of_bit[mask])], size=geometry.size)
+    return None
+
+
+def _find_hidden_single(cands, used, geometry):
+    """Finds a number which fits in only one cell of a unit."""
+    for unit_num in range(3 * geometry.size):
+        unit = geometry.units[unit_num]
+        seen_once = 0
+        seen_twice = 0
+        for idx in unit:
+            mask = cands[idx]
+            seen_twice |= seen_once & mask
+            seen_once |= mask
+        if (seen_once | used[unit_num]) != geometry.all_numbers:
+            raise _Contradiction
+        singles = seen_once & ~seen_twice
+        if singles:
+            bit = singles & -singles
+            for idx in unit:
+                if cands[idx] & bit:
+                    return Deduction('hidden_single', (idx,), [(idx, geometry.number_of_bit[bit])], size=geometry.size)
+    return None
+
+
+def _find_pointing(cands, used, geometry):
+    """Finds a number whose cells in a box all lie in one row or column, which removes it from the rest of that line."""
+    size = geometry.size
+    row_of = geometry.row_of
+    col_of = geometry.col_of
+    for box in range(size):
+        unit = geometry.units[2 * size + box]
+        for bit in geometry.bits:
+            cells = [idx for idx in unit if cands[idx] & bit]
+            if len(cells) < 2:
+                continue
+            if all(row_of[idx] == row_of[cells[0]] for idx in cells):
+                line = geometry.units[row_of[cells[0]]]
+            elif all(col_of[idx] == col_of[cells[0]] for idx in cells):
+                line = geometry.units[size + col_of[cells[0]]]
+            else:
+                continue
+            eliminations = [(idx, geometry.number_of_bit[bit]) for idx in line
+                            if cands[idx] & bit and geometry.box_of[idx] != box]
+            if eliminations:
+                return Deduction('pointing', cells, eliminations=eliminations, size=size)
+    return None
+
+
+def _find_claiming(cands, used, geometry):
+    """Finds a number whose cells in a row or column all lie in one box, which removes it from the rest of the box."""
+    size = geometry.size
+    box_of = geometry.box_of
+    for unit_num in range(2 * size):
+        unit = geometry.units[unit_num]
+        for bit in geometry.bits:
+            cells = [idx for idx in unit if cands[idx] & bit]
+            if len(cells) < 2 or any(box_of[idx] != box_of[cells[0]] for idx in cells):
+                continue
+            eliminations = [(idx, geometry.number_of_bit[bit]) for idx in geometry.units[2 * size + box_of[cells[0]]]
+                            if cands[idx] & bit and idx not in cells]
+            if eliminations:
+                return Deduction('claiming', cells, eliminations=eliminations, size=size)
+    return None
+
+
+def _find_naked_subset(cands, geometry, subset_size, technique):
+    """Finds subset_size cells of a unit which together have only that many candidates, which removes those from the
+    rest of the unit."""
+    bit_count = geometry.bit_count
+    for unit in geometry.units:
+        empties = [idx for idx in unit if cands[idx]]
+        if len(empties) <= subset_size:
+            continue
+        small = [idx for idx in empties if bit_count[cands[idx]] <= subset_size]
+        for group in itertools.combinations(small, subset_size):
+            union = 0
+            for idx in group:
+                union |= cands[idx]
+            if bit_count[union] != subset_size:
+                continue
+            eliminations = [(idx, num) for idx in empties if idx not in group
+                            for num in _numbers(cands[idx] & union, geometry)]
+            if eliminations:
+                return Deduction(technique, group, eliminations=eliminations, size=geometry.size)
+    return None
+
+
+def _find_hidden_subset(cands, geometry, subset_size, technique):
+    """Finds subset_size numbers which fit in only that many cells of a unit, which removes the other candidates of
+    those cells."""
+    size = geometry.size
+    bit_count = geometry.bit_count
+    for unit in geometry.units:
+        # The positions in the unit where each number fits, as bitmasks over the cells of the unit.
+        places = {}
+        for pos in range(size):
+            mask = cands[unit[pos]]
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                places[bit] = places.get(bit, 0) | 1 << pos
+        bits = [bit for bit in places if 2 <= bit_count[places[bit]] <= subset_size]
+        for group in itertools.combinations(bits, subset_size):
+            union = 0
+            numbers = 0
+            for bit in group:
+                union |= places[bit]
+                numbers |= bit
+            if bit_count[union] != subset_size:
+                continue
+            cells = [unit[pos] for pos in range(size) if union & 1 << pos]
+            eliminations = [(idx, num) for idx in cells for num in _numbers(cands[idx] & ~numbers, geometry)]
+            if eliminations:
+                return Deduction(technique, cells, eliminations=eliminations, size=size)
+    return None
+
+
+def _find_x_wing(cands, used, geometry):
+    """
+    Finds a number which fits in exactly the same two columns of two rows, which removes it from the rest of those
+    columns, or the same with rows and columns swapped.
+    """
+
+    size = geometry.size
+    rows = geometry.units[:size]
+    columns = geometry.units[size:2 * size]
+    for lines, crosses in ((rows, columns), (columns, rows)):
+        for bit in geometry.bits:
+            # The lines where the number fits in exactly two places, keyed by the bitmask of those places.
+            seen = {}
+            for line_num in range(size):
+                line = lines[line_num]
+                places = 0
+                for pos in range(size):
+                    if cands[line[pos]] & bit:
+                        places |= 1 << pos
+                if geometry.bit_count[places] != 2:
+                    continue
+                other = seen.get(places)
+                if other is None:
+                    seen[places] = line_num
+                    continue
+                positions = [pos for pos in range(size) if places & 1 << pos]
+                eliminations = [(idx, geometry.number_of_bit[bit]) for pos in positions for idx in crosses[pos]
+                                if cands[idx] & bit and idx not in lines[line_num] and idx not in lines[other]]
+                if eliminations:
+                    cells = [lines[num][pos] for num in (other, line_num) for pos in positions]
+                    return Deduction('x_wing', cells, eliminations=eliminations, size=size)
+    return None
+
+
+_FINDERS = {
+    'naked_single': _find_naked_single,
+    'hidden_single': _find_hidden_single,
+    'pointing': _find_pointing,
+    'claiming': _find_claiming,
+    'naked_pair': lambda cands, used, geometry: _find_naked_subset(cands, geometry, 2, 'naked_pair'),
+    'hidden_pair': lambda cands, used, geometry: _find_hidden_subset(cands, geometry, 2, 'hidden_pair'),
+    'naked_triple': lambda cands, used, geometry: _find_naked_subset(cands, geometry, 3, 'naked_triple'),
+    'hidden_triple': lambda cands, used, geometry: _find_hidden_subset(cands, geometry, 3, 'hidden_triple'),
+    'x_wing': _find_x_wing,
+}
+
+
+def _apply(deduction, cells, cands, used, geometry):
+    """Places the numbers and removes the candidates of a deduction, raising _Contradiction if that leaves a cell
+    with no candidates."""
+    size = geometry.size
+    for row, column, num in deduction.placements:
+        idx = row * size + column
+        bit = 1 << (num - 1)
+        cells[idx] = num
+        cands[idx] = 0
+        for unit_num in geometry.cell_units[idx]:
+            used[unit_num] |= bit
+        for peer in geometry.peers[idx]:
+            if cands[peer] & bit:
+                cands[peer] ^= bit
+                if not cands[peer]:
+                    raise _Contradiction
+    for row, column, num in deduction.eliminations:
+        idx = row * size + column
+        cands[idx] &= ~(1 << (num - 1))
+        if not cands[idx]:
+            raise _Contradiction
+
+
+def _deduce(cells, cands, used, geometry, techniques, until_placement=False):
+    """
+    Applies the techniques to the candidates until none of them make progress, always retrying the easiest technique
+    first after a step.
+
+    Returns:
+        List of Deduction: The steps taken, in order. Returns None if they lead to a contradiction.
+    """
+
+    finders = [_FINDERS[technique] for technique in techniques]
+    deductions = []
+    remaining = cells.count(0)
+    try:
+        while remaining:
+            for find in finders:
+                deduction = find(cands, used, geometry)
+                if deduction is not None:
+                    break
+            else:
+                return deductions
+            _apply(deduction, cells, cands, used, geometry)
+            deductions.append(deduction)
+            remaining -= len(deduction.placements)
+            if until_placement and deduction.placements:
+                return deductions
+    except _Contradiction:
+        return None
+    return deductions
+
+
+def _check_techniques(techniques):
+    """Raises ValueError if any of the techniques is unknown."""
+    for technique in techniques:
+        if technique not in _FINDERS:
+            raise ValueError("Unknown technique {!r}, expected one of {}".format(technique, ', '.join(TECHNIQUES)))
+
+
+def deduce(board, techniques=TECHNIQUES):
+    """
+    Fills in a sudoku board in place as far as logical techniques can, without guessing.
+
+    The techniques are naked and hidden singles, pointing and claiming, naked and hidden pairs and triples, and
+    X-wings. They are applied until none of them make progress, which solves most easy and medium puzzles outright
+    and leaves fewer empty cells for a search to fill in the rest.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        techniques (Iterable of str): The techniques to use, from TECHNIQUES. Defaults to all of them.
+
+    Returns:
+        List of Deduction: The steps taken, in order. Returns None if the board has no solution, in which case it is
+            left unchanged.
+    """
+
+    _check_techniques(techniques)
+    state = _init_candidates(board)
+    if state is None:
+        return None
+    cells, cands, used = state
+    size = len(board)
+    deductions = _deduce(cells, cands, used, geometry_of(board), techniques)
+    if deductions is None:
+        return None
+    store_cells(board, cells, [row * size + column for deduction in deductions
+                               for row, column, num in deduction.placements])
+    return deductions
+
+
+def hint(board, techniques=TECHNIQUES):
+    """
+    Finds the next number which can be placed on a sudoku board by logic. The board is not changed.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        techniques (Iterable of str): The techniques to use, from TECHNIQUES. Defaults to all of them.
+
+    Returns:
+        List of Deduction: The steps which lead to the number, ending with the one which places it. Returns None if
+            logic can't place any number or the board has no solution.
+    """
+
+    _check_techniques(techniques)
+    state = _init_candidates(board)
+    if state is None:
+        return None
+    deductions = _deduce(*state, geometry_of(board), techniques, until_placement=True)
+    if not deductions or not deductions[-1].placements:
+        return None
+    return deductions
+
+
+def _logic_search(board, max_nodes=None, deadline=None, stats=None):
+    """
+    Fills in a sudoku board with logical techniques, then the bitmask search for any cells logic can't fill, within a
+    budget for the search as in _iterative_search(). The board is only changed if it was solved.
+
+    Returns:
+        tuple: Contains (status, nodes, depth, max_depth) as described in SearchResult.
+    """
+
+    state = _init_candidates(board)
+    if state is None:
+        return 'unsolvable', 0, 0, 0
+    cells, cands, used = state
+    geometry = geometry_of(board)
+    size = geometry.size
+    empties = [idx for idx in range(geometry.num_cells) if not cells[idx]]
+    if _deduce(cells, cands, used, geometry, TECHNIQUES) is None:
+        return 'unsolvable', 0, 0, 0
+    remaining = [idx for idx in empties if not cells[idx]]
+    result = 'solved', 0, 0, 0
+    if remaining:
+        search = Search(cells, remaining, used[:size], used[size:2 * size], used[2 * size:], geometry)
+        result = _iterative_search(search, max_nodes, deadline, stats)
+    if result[0] == 'solved':
+        store_cells(board, cells, empties)
+    return result
+
+
+def logic_solve(board, stats=None):
+    """
+    Solves a sudoku board in place with logical techniques, then the bitmask search for any cells logic can't fill.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        stats (SearchStats): Counters to add the work of the search to. None to not count.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution, in which case it is left
+            unchanged.
+    """
+
+    return _logic_search(board, stats=stats)[0] == 'solved'
+
+
+ENGINES = {
+    'bitmask': bitmask_solve,
+    'dlx': dlx_solve,
+    'logic': logic_solve,
+    'backtracking': backtracking_solve,
+}
+
+
+def solve(board, engine=None, stats=None, cache=None):
+    """
+    Solves a sudoku board in place.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        engine (str): The name of the solving engine to use, one of 'bitmask', 'dlx', 'logic', or 'backtracking'.
+            Defaults to 'bitmask' for 9x9 boards and smaller, and 'dlx' for larger ones.
+        stats (SearchStats): Counters to add the work of the search to. None to not count, which costs nothing.
+        cache (cache.SolutionCache): Solutions of earlier puzzles to check before searching, which the solution is
+            added to. Equivalent puzzles are found as well as repeated ones. None to always search.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution.
+    """
+
+    if engine is None:
+        # The bitmask search only fills cells which have one candidate left without guessing, which makes it the
+        # fastest on 9x9 boards but lets it wander for minutes on harder 16x16 ones that Dancing Links solves at once.
+        engine = 'bitmask' if len(board) <= 9 else 'dlx'
+    try:
+        engine_solve = ENGINES[engine]
+    except KeyError:
+        raise ValueError("Unknown engine {!r}, expected one of {}".format(engine, ', '.join(ENGINES)))
+    if cache is not None:
+        return cache.solve(board, lambda puzzle: solve(puzzle, engine, stats))
+    if stats is None:
+        return engine_solve(board)
+
+    start = time.perf_counter()
+    solved = engine_solve(board, stats)
+    stats.elapsed += time.perf_counter() - start
+    return solved
+
+
+def _random_search(cells, empties, rows, cols, boxes, geometry, budget, rng, deadline=None):
+    """
+    Same search as bitmask_solve() but recursive and trying the candidates of each cell in an order shuffled by rng.
+
+    Returns:
+        bool: True if the cells are filled, False if they can't be. Returns None if the search visited budget[0]
+            nodes or ran past deadline, a time.perf_counter() value, without finishing, in which case the state is
+            restored to how it was found.
+    """
+
+    if not empties:
+        return True
+    if budget[0] == 0 or deadline is not None and budget[0] & 255 == 0 and time.perf_counter() > deadline:
+        return None
+    budget[0] -= 1
+
+    best_pos, mask = pick_cell(empties, rows, cols, boxes, geometry)
+    if not mask:
+        return False
+
+    idx = empties[best_pos]
+    row = geometry.row_of[idx]
+    column = geometry.col_of[idx]
+    box = geometry.box_of[idx]
+    empties[best_pos], empties[-1] = empties[-1], empties[best_pos]
+    empties.pop()
+
+    bits = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        bits.append(bit)
+    rng.shuffle(bits)
+
+    found = False
+    for bit in bits:
+        rows[row] |= bit
+        cols[column] |= bit
+        boxes[box] |= bit
+        cells[idx] = geometry.number_of_bit[bit]
+
+        found = _random_search(cells, empties, rows, cols, boxes, geometry, budget, rng, deadline)
+        if found:
+            return True
+
+        rows[row] ^= bit
+        cols[column] ^= bit
+        boxes[box] ^= bit
+        if found is None:
+            break
+
+    cells[idx] = 0
+    empties.append(idx)
+    empties[best_pos], empties[-1] = empties[-1], empties[best_pos]
+    return found
+
+
+def random_solve(board, rng=None, timeout=None):
+    """
+    Same as solve() but tries the numbers of every cell in a random order rather than in order.
+
+    Solving a blank board this way gives a random complete board.
+
+    Parameters:
+        board (List of List of int or Board): A sudoku board.
+        rng (random.Random): The random number generator which orders the numbers. None for the random module. The
+            same board and a generator in the same state always give the same result.
+        timeout (float): The most seconds to search for. None for no limit.
+
+    Returns:
+        bool: True if the board is solved. Returns False if the board has no solution, in which case it is left
+            unchanged. Returns None if the search ran out of time, which also leaves the board unchanged.
+    """
+
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    state = init_masks(board)
+    if state is None:
+        return False
+    cells, empties, rows, cols, boxes = state
+    geometry = geometry_of(board)
+    if rng is None:
+        rng = random
+
+    # Now and then a random search makes an early choice which leaves no solutions and takes very long to find that
+    # out, which on boards larger than 9x9 happens on most tries. The search is restarted with twice the budget
+    # whenever it uses its budget up, which fills even a blank 25x25 board in a few seconds.
+    budget = 2 * geometry.num_cells
+    found = _random_search(cells, list(empties), rows, cols, boxes, geometry, [budget], rng, deadline)
+    while found is None:
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        budget *= 2
+        found = _random_search(cells, list(empties), rows, cols, boxes, geometry, [budget], rng, deadline)
+    if not found:
+        return False
+
+    store_cells(board, cells, empties)
+    return True
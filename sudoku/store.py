@@ -0,0 +1,347 @@
+import array
+import mmap
+import os
+import random
+import struct
+
+from . import generator
+from .board import Board
+
+
+# A store is a header followed by fixed size records, one per puzzle, in the order they were added:
+#   header: the magic bytes, the format version, and the number of rows and columns of the boards.
+#   record: the puzzle and its solution packed two cells to a byte, then the difficulty as an index into
+#       DIFFICULTY_CODES.
+# A board of 81 cells packs into 41 bytes, so a 9x9 record is 83 bytes.
+_MAGIC = b'SUDOKUPS'
+_VERSION = 1
+_HEADER = struct.Struct('<8sBB6x')
+
+# The index of a store is kept next to it in the file path + '.idx': a header, then each group of records with the
+# same number of clues and difficulty as a group header followed by the record numbers.
+#   header: the magic bytes and the number of records the index covers.
+#   group header: the number of clues, the difficulty code, and the number of records.
+_INDEX_MAGIC = b'SUDOKUIX'
+_INDEX_HEADER = struct.Struct('<8sQ')
+_GROUP_HEADER = struct.Struct('<HBxI')
+
+# The difficulty stored for each code. 0 is for puzzles which were stored without a difficulty.
+DIFFICULTY_CODES = (None,) + generator.DIFFICULTIES
+
+# Tables which take a packed byte to the number in its first or second cell.
+_HIGH = bytes(byte >> 4 for byte in range(256))
+_LOW = bytes(byte & 15 for byte in range(256))
+
+
+def pack(cells):
+    """
+    Packs the numbers of a board two to a byte, the first number in the high four bits.
+
+    Parameters:
+        cells (bytes or bytearray): The numbers of the board in row-major order. Each must be from 0 to 15.
+
+    Returns:
+        bytes: The packed numbers, padded with a 0 if there are an odd number.
+    """
+
+    return bytes([cells[idx] << 4 | cells[idx + 1] for idx in range(0, len(cells) - 1, 2)]
+                 + ([cells[-1] << 4] if len(cells) % 2 else []))
+
+
+def unpack(packed, num_cells):
+    """
+    Unpacks numbers which were packed by pack().
+
+    Parameters:
+        packed (bytes): The packed numbers.
+        num_cells (int): The number of cells of the board.
+
+    Returns:
+        bytearray: The numbers of the board in row-major order.
+    """
+
+    cells = bytearray(len(packed) * 2)
+    cells[0::2] = packed.translate(_HIGH)
+    cells[1::2] = packed.translate(_LOW)
+    del cells[num_cells:]
+    return cells
+
+
+class PuzzleStore:
+    """
+    Puzzles and their solutions stored in an append-only file, which is memory-mapped so that any puzzle can be read
+    by its index without loading the rest.
+
+    Puzzles are also indexed by their number of clues and difficulty. The index is saved next to the store when it is
+    closed, so opening a store only reads the index, not every puzzle.
+
+    Boards larger than 9x9 have numbers which do not fit in four bits and can't be stored.
+
+    Attributes:
+        path (str): The path of the store file.
+        size (int): The number of rows and columns of the boards.
+        writable (bool): True if puzzles can be added.
+    """
+
+    def __init__(self, path, mode='r', size=9):
+        """
+        The constructor for a PuzzleStore.
+
+        Parameters:
+            path (str): The path of the store file.
+            mode (str): 'r' to only read the store, or 'a' to add puzzles to it, creating it if it doesn't exist.
+            size (int): The number of rows and columns of the boards, for a new store. An existing store keeps its
+                own size.
+        """
+
+        if mode not in ('r', 'a'):
+            raise ValueError("Unknown mode {!r}, expected 'r' or 'a'".format(mode))
+        self.path = path
+        self.writable = mode == 'a'
+        if self.writable and not os.path.exists(path):
+            if size > 9:
+                raise ValueError("Only boards of up to 9x9 can be stored, got {0}x{0}".format(size))
+            with open(path, 'wb') as new_file:
+                new_file.write(_HEADER.pack(_MAGIC, _VERSION, size))
+
+        self._file = open(path, 'r+b' if self.writable else 'rb')
+        magic, version, self.size = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != _MAGIC:
+            self._file.close()
+            raise ValueError("{} is not a puzzle store".format(path))
+        if version != _VERSION:
+            self._file.close()
+            raise ValueError("{} has format version {}, expected {}".format(path, version, _VERSION))
+        self._num_cells = self.size * self.size
+        self._packed_size = (self._num_cells + 1) // 2
+        self._record_size = 2 * self._packed_size + 1
+
+        self._file.seek(0, os.SEEK_END)
+        self._count = (self._file.tell() - _HEADER.size) // self._record_size
+        self._map = None
+        self._mapped_count = 0
+        self._index = {}
+        self._load_index()
+
+    def _load_index(self):
+        """Reads the saved index, then indexes any records which were added after it was saved."""
+        indexed = 0
+        try:
+            with open(self.path + '.idx', 'rb') as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            data = b''
+        if data[:len(_INDEX_MAGIC)] == _INDEX_MAGIC:
+            indexed = _INDEX_HEADER.unpack_from(data)[1]
+            offset = _INDEX_HEADER.size
+            while offset < len(data):
+                clues, code, count = _GROUP_HEADER.unpack_from(data, offset)
+                offset += _GROUP_HEADER.size
+                records = array.array('I')
+                records.frombytes(data[offset:offset + count * records.itemsize])
+                offset += count * records.itemsize
+                self._index[(clues, code)] = records
+        if indexed > self._count:
+            # The index is from a longer store, so it can't be trusted.
+            indexed = 0
+            self._index = {}
+
+        for idx in range(indexed, self._count):
+            record = self._record(idx)
+            clues = self._num_cells - unpack(record[:self._packed_size], self._num_cells).count(0)
+            self._add_to_index(idx, clues, record[-1])
+
+    def _save_index(self):
+        """Writes the index next to the store, replacing the old one in one step."""
+        parts = [_INDEX_HEADER.pack(_INDEX_MAGIC, self._count)]
+        for (clues, code), records in sorted(self._index.items()):
+            parts.append(_GROUP_HEADER.pack(clues, code, len(records)))
+            parts.append(records.tobytes())
+        with open(self.path + '.idx.tmp', 'wb') as index_file:
+            index_file.write(b''.join(parts))
+        os.replace(self.path + '.idx.tmp', self.path + '.idx')
+
+    def _add_to_index(self, idx, clues, code):
+        records = self._index.get((clues, code))
+        if records is None:
+            records = self._index[(clues, code)] = array.array('I')
+        records.append(idx)
+
+    def _record(self, idx):
+        """Returns the bytes of a record, mapping the file again if it has grown since it was mapped."""
+        if idx >= self._mapped_count:
+            if self.writable:
+                self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_count = (len(self._map) - _HEADER.size) // self._record_size
+        offset = _HEADER.size + idx * self._record_size
+        return self._map[offset:offset + self._record_size]
+
+    def append(self, puzzle, solution, difficulty=None):
+        """
+        Adds a puzzle to the end of the store.
+
+        Parameters:
+            puzzle (List of List of int or Board): The puzzle.
+            solution (List of List of int or Board): The solved puzzle.
+            difficulty (str): The difficulty of the puzzle, one of generator.DIFFICULTIES, or None.
+
+        Returns:
+            int: The index of the puzzle.
+        """
+
+        if not self.writable:
+            raise ValueError("The store was opened read-only")
+        puzzle = puzzle if isinstance(puzzle, Board) else Board.from_rows(puzzle)
+        solution = solution if isinstance(solution, Board) else Board.from_rows(solution)
+        if puzzle.size != self.size or solution.size != self.size:
+            raise ValueError("The store holds {0}x{0} boards, got {1}x{1}".format(self.size, puzzle.size))
+        code = DIFFICULTY_CODES.index(difficulty)
+
+        idx = self._count
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(pack(puzzle.cells) + pack(solution.cells) + bytes([code]))
+        self._count += 1
+        self._add_to_index(idx, self._num_cells - puzzle.cells.count(0), code)
+        return idx
+
+    def extend(self, puzzles):
+        """
+        Adds many puzzles to the end of the store.
+
+        Parameters:
+            puzzles (Iterable of tuple): Contains (puzzle, solution, difficulty) for each puzzle, as returned by
+                generator.generate().
+        """
+
+        for puzzle, solution, difficulty in puzzles:
+            self.append(puzzle, solution, difficulty)
+
+    def __getitem__(self, idx):
+        """
+        Reads a puzzle.
+
+        Parameters:
+            idx (int): The index of the puzzle.
+
+        Returns:
+            tuple: Contains (puzzle, solution, difficulty) where puzzle and solution are Boards and difficulty is one
+                of generator.DIFFICULTIES, or None.
+        """
+
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("Puzzle {} is not in a store of {}".format(idx, self._count))
+        record = self._record(idx)
+        puzzle = Board(unpack(record[:self._packed_size], self._num_cells), self.size)
+        solution = Board(unpack(record[self._packed_size:-1], self._num_cells), self.size)
+        return puzzle, solution, DIFFICULTY_CODES[record[-1]]
+
+    def __len__(self):
+        return self._count
+
+    def counts(self):
+        """
+        Returns:
+            dict: The number of puzzles with each (number of clues, difficulty).
+        """
+
+        return {(clues, DIFFICULTY_CODES[code]): len(records) for (clues, code), records in self._index.items()}
+
+    def find(self, clues=None, difficulty=None):
+        """
+        Finds the puzzles with a number of clues and difficulty.
+
+        Parameters:
+            clues (int): The number of clues. None for any number.
+            difficulty (str): The difficulty, one of generator.DIFFICULTIES. None for any difficulty, including
+                puzzles which were stored without one.
+
+        Returns:
+            List of int: The indices of the puzzles in increasing order.
+        """
+
+        code = None if difficulty is None else DIFFICULTY_CODES.index(difficulty)
+        found = []
+        for (group_clues, group_code), records in self._index.items():
+            if (clues is None or group_clues == clues) and (code is None or group_code == code):
+                found.extend(records)
+        found.sort()
+        return found
+
+    def choice(self, clues=None, difficulty=None, rng=None):
+        """
+        Picks a random puzzle with a number of clues and difficulty. Takes the same time however large the store is.
+
+        Parameters:
+            clues (int): The number of clues. None for any number.
+            difficulty (str): The difficulty, one of generator.DIFFICULTIES. None for any difficulty.
+            rng (random.Random): The random number generator which picks the puzzle. None for the random module.
+
+        Returns:
+            int: The index of the puzzle. Returns None if there is no such puzzle.
+        """
+
+        code = None if difficulty is None else DIFFICULTY_CODES.index(difficulty)
+        groups = [records for (group_clues, group_code), records in self._index.items()
+                  if (clues is None or group_clues == clues) and (code is None or group_code == code)]
+        total = sum(len(records) for records in groups)
+        if total == 0:
+            return None
+        if rng is None:
+            rng = random
+        pick = rng.randrange(total)
+        for records in groups:
+            if pick < len(records):
+                return records[pick]
+            pick -= len(records)
+
+    def flush(self):
+        """Writes the added puzzles and the index to disk."""
+        if self.writable:
+            self._file.flush()
+            self._save_index()
+
+    def close(self):
+        """Saves the index and closes the store."""
+        if self._file.closed:
+            return
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or inspect a store of generated sudoku puzzles.")
+    parser.add_argument('path', help="store file")
+    parser.add_argument('-n', type=int, default=0, help="number of puzzles to generate and add (default: 0)")
+    parser.add_argument('-d', '--difficulty', choices=generator.DIFFICULTIES, default=None,
+                        help="difficulty of the puzzles")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('-s', '--size', type=int, choices=(4, 9), default=9, help="number of rows and columns")
+    args = parser.parse_args()
+
+    with PuzzleStore(args.path, 'a' if args.n else 'r', args.size) as store:
+        if args.n:
+            store.extend(generator.generate_batch(args.n, args.difficulty, args.workers, size=args.size))
+        print("{} puzzles of {}x{}".format(len(store), store.size, store.size))
+        counts = store.counts()
+        for clues, difficulty in sorted(counts, key=lambda group: (group[0], DIFFICULTY_CODES.index(group[1]))):
+            print("{:3d} clues {:8s} {}".format(clues, str(difficulty), counts[(clues, difficulty)]))
+
+
+if __name__ == '__main__':
+    main()
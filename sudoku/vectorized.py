@@ -0,0 +1,397 @@
+import time
+
+import numpy as np
+
+from . import formats, solver
+from .board import Board, DIGITS, get_geometry
+from .board import _FROM_TEXT as _FROM_TEXT_BYTES, _TO_TEXT as _TO_TEXT_BYTES
+
+
+# The most boards worked on at once, which bounds the memory of the temporary arrays.
+CHUNK_SIZE = 65536
+
+# The translation tables of board.py as arrays. Characters which are not a number or a blank are mapped to 255.
+_FROM_TEXT = np.frombuffer(_FROM_TEXT_BYTES, dtype=np.uint8)
+_TO_TEXT = np.frombuffer(_TO_TEXT_BYTES, dtype=np.uint8)
+
+
+def boards_from_strings(puzzles):
+    """
+    Converts puzzle strings into an array of boards.
+
+    Parameters:
+        puzzles (List of str): The puzzles, all of the same size, with 0 or . for empty cells.
+
+    Returns:
+        numpy.ndarray: An (N, size, size) array of uint8 with 0 for empty cells.
+    """
+
+    if not puzzles:
+        return np.zeros((0, 9, 9), dtype=np.uint8)
+    num_cells = len(puzzles[0])
+    size = round(num_cells ** 0.5)
+    get_geometry(size)
+    text = ''.join(puzzles).encode('ascii')
+    if len(text) != num_cells * len(puzzles):
+        raise ValueError("Every puzzle must have {} characters".format(num_cells))
+    boards = _FROM_TEXT[np.frombuffer(text, dtype=np.uint8)]
+    if boards.max(initial=0) > size:
+        raise ValueError("A {0}x{0} puzzle may only contain the numbers 0-{1} and .".format(size, DIGITS[size]))
+    return boards.reshape(len(puzzles), size, size)
+
+
+def boards_from_boards(boards):
+    """
+    Converts Boards, e.g. from formats.read_puzzles(), into an array of boards.
+
+    Parameters:
+        boards (List of Board): The boards, all of the same size.
+
+    Returns:
+        numpy.ndarray: An (N, size, size) array of uint8 with 0 for empty cells.
+    """
+
+    if not boards:
+        return np.zeros((0, 9, 9), dtype=np.uint8)
+    size = boards[0].size
+    if any(board.size != size for board in boards):
+        raise ValueError("Every puzzle must be {0}x{0}".format(size))
+    cells = np.frombuffer(b''.join(board.cells for board in boards), dtype=np.uint8)
+    return cells.reshape(len(boards), size, size)
+
+
+def boards_to_strings(boards):
+    """
+    Converts an array of boards into puzzle strings.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards.
+
+    Returns:
+        List of str: The boards as strings with 0 for empty cells.
+    """
+
+    num_cells = boards.shape[1] * boards.shape[2]
+    text = _TO_TEXT[boards.reshape(-1)].tobytes().decode('ascii')
+    return [text[start:start + num_cells] for start in range(0, len(text), num_cells)]
+
+
+def _dtype(size):
+    """Returns the smallest unsigned integer type which holds a bitmask of the numbers of a board."""
+    return np.uint16 if size <= 16 else np.uint32
+
+
+# The functions below work on arrays indexed (row, column, board) rather than (board, row, column), so that each
+# operation on one cell or unit runs over the boards in one contiguous stretch of memory.
+
+def _by_cell(boards):
+    """Reorders an (N, size, size) array of boards into a (size, size, N) array."""
+    return np.ascontiguousarray(boards.transpose(1, 2, 0))
+
+
+def _by_board(cells):
+    """Reorders a (size, size, N) array back into an (N, size, size) array of boards."""
+    return np.ascontiguousarray(cells.transpose(2, 0, 1))
+
+
+def _bits(cells):
+    """Returns an array of the bit of the number in each cell, where the number n is the bit 1 << (n - 1)."""
+    size = cells.shape[0]
+    return np.array([0] + [1 << (num - 1) for num in range(1, size + 1)], dtype=_dtype(size))[cells]
+
+
+def _units(cells):
+    """
+    Regroups cells by unit.
+
+    Parameters:
+        cells (numpy.ndarray): A (size, size, N) array indexed by row, column, then board.
+
+    Returns:
+        tuple: Contains (rows, cols, boxes), each a (size, size, N) array indexed by unit, position in the unit, then
+            board.
+    """
+
+    size, _, num_boards = cells.shape
+    box_size = get_geometry(size).box_size
+    boxes = cells.reshape(box_size, box_size, box_size, box_size, num_boards).transpose(0, 2, 1, 3, 4)
+    return cells, cells.transpose(1, 0, 2), boxes.reshape(size, size, num_boards)
+
+
+def _scan(units):
+    """
+    Finds the bits set in each unit.
+
+    Parameters:
+        units (numpy.ndarray): A (size, size, N) array of bitmasks indexed by unit, position in the unit, then board.
+
+    Returns:
+        tuple: Contains (seen, repeated), (size, N) arrays of the bits set in at least one and in more than one
+            position of each unit.
+    """
+
+    seen = units[:, 0].copy()
+    repeated = np.zeros_like(seen)
+    both = np.empty_like(seen)
+    for position in range(1, units.shape[1]):
+        np.bitwise_and(seen, units[:, position], out=both)
+        repeated |= both
+        seen |= units[:, position]
+    return seen, repeated
+
+
+def _spread(rows, cols, boxes):
+    """
+    Combines a value of every row, column, and box into a value for every cell by bitwise or.
+
+    Parameters:
+        rows, cols, boxes (numpy.ndarray): A (size, N) array of the value of each unit.
+
+    Returns:
+        numpy.ndarray: A (size, size, N) array of the values of the row, column, and box of each cell.
+    """
+
+    size, num_boards = rows.shape
+    box_size = get_geometry(size).box_size
+    cells = rows[:, None] | cols[None, :]
+    cells.reshape(box_size, box_size, box_size, box_size, num_boards)[...] |= \
+        boxes.reshape(box_size, 1, box_size, 1, num_boards)
+    return cells
+
+
+def _validate(cells):
+    valid = np.ones(cells.shape[2], dtype=bool)
+    for unit in _units(_bits(cells)):
+        valid &= ~_scan(unit)[1].any(axis=0)
+    return valid
+
+
+def _candidates(cells, placed):
+    """
+    Finds the candidates of every cell.
+
+    Parameters:
+        cells (numpy.ndarray): A (size, size, N) array of the numbers of the boards.
+        placed (tuple): Contains (rows, cols, boxes), (size, N) arrays of the bits of the numbers placed in each unit.
+
+    Returns:
+        numpy.ndarray: A (size, size, N) array of the bitmasks of the candidates of each cell.
+    """
+
+    size = cells.shape[0]
+    cands = ~_spread(*placed) & _dtype(size)((1 << size) - 1)
+    cands[cells > 0] = 0
+    return cands
+
+
+def _propagate(cells):
+    """Fills in singles until no board changes. Returns the filled cells and which boards hit a contradiction."""
+    cells = cells.copy()
+    size = cells.shape[0]
+    all_numbers = (1 << size) - 1
+    dead = np.zeros(cells.shape[2], dtype=bool)
+    active = np.arange(cells.shape[2])
+
+    while len(active):
+        work = cells[:, :, active]
+        placed_scans = [_scan(unit) for unit in _units(_bits(work))]
+        cands = _candidates(work, [placed for placed, _ in placed_scans])
+        cand_scans = [_scan(unit) for unit in _units(cands)]
+
+        # A board is dead if a number is repeated in a unit, which also catches two singles which put the same
+        # number in one unit on the last pass, if an empty cell has no candidates, or if a number has nowhere to go
+        # in a unit.
+        stuck = ((work == 0) & (cands == 0)).any(axis=(0, 1))
+        for (placed, repeated), (possible, _) in zip(placed_scans, cand_scans):
+            stuck |= repeated.any(axis=0) | ((placed | possible) != all_numbers).any(axis=0)
+
+        # Naked singles are cells with one candidate. Hidden singles are numbers with one place in a row, column, or
+        # box, which are found as the candidates set in only one cell of the unit.
+        hidden = cands & _spread(*(possible & ~repeated for possible, repeated in cand_scans))
+        naked = (cands & (cands - 1)) == 0
+        singles = np.where(naked, cands, hidden)
+        # A cell which is the only place for two numbers makes the board dead.
+        stuck |= ((singles & (singles - 1)) != 0).any(axis=(0, 1))
+        singles[:, :, stuck] = 0
+
+        # The exponent frexp gives a power of two is one more than its bit's position, which is the number.
+        work += np.frexp(singles.astype(np.float64))[1].astype(np.uint8)
+        changed = (singles != 0).any(axis=(0, 1))
+
+        cells[:, :, active] = work
+        dead[active[stuck]] = True
+        active = active[changed & ~stuck]
+
+    return cells, dead
+
+
+def _chunked(function, boards):
+    """Runs a function on boards CHUNK_SIZE at a time and joins the results."""
+    if len(boards) <= CHUNK_SIZE:
+        return function(boards)
+    results = [function(boards[start:start + CHUNK_SIZE]) for start in range(0, len(boards), CHUNK_SIZE)]
+    if isinstance(results[0], tuple):
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+    return np.concatenate(results)
+
+
+def validate(boards):
+    """
+    Checks that no number is repeated in a row, column, or box of any board.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards with 0 for empty cells.
+
+    Returns:
+        numpy.ndarray: An (N,) array which is True for each board which follows the rules.
+    """
+
+    return _chunked(lambda chunk: _validate(_by_cell(chunk)), boards)
+
+
+def is_solved(boards):
+    """
+    Checks that every board is completely and correctly filled in.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards with 0 for empty cells.
+
+    Returns:
+        numpy.ndarray: An (N,) array which is True for each solved board.
+    """
+
+    return validate(boards) & (boards != 0).all(axis=(1, 2))
+
+
+def candidates(boards):
+    """
+    Finds the candidates of every cell of every board.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards with 0 for empty cells.
+
+    Returns:
+        numpy.ndarray: An (N, size, size) array of bitmasks of the numbers which could go in each cell, where the
+            number n is the bit 1 << (n - 1). Filled cells have no candidates.
+    """
+
+    def chunk_candidates(chunk):
+        cells = _by_cell(chunk)
+        return _by_board(_candidates(cells, [_scan(unit)[0] for unit in _units(_bits(cells))]))
+
+    return _chunked(chunk_candidates, boards)
+
+
+def propagate(boards):
+    """
+    Fills in every cell of every board which naked and hidden singles can fill, repeating until no more can be.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards with 0 for empty cells.
+
+    Returns:
+        tuple: Contains (filled, dead) where filled is a new (N, size, size) array of the boards with the singles
+            filled in and dead is an (N,) array which is True for each board found to have no solution.
+    """
+
+    def chunk_propagate(chunk):
+        cells, dead = _propagate(_by_cell(chunk))
+        return _by_board(cells), dead
+
+    return _chunked(chunk_propagate, boards)
+
+
+def solve_batch(boards, engine=None):
+    """
+    Solves many boards, filling in singles on all of them at once and only searching the boards which need it.
+
+    Parameters:
+        boards (numpy.ndarray): An (N, size, size) array of boards with 0 for empty cells.
+        engine (str): The solving engine for the boards singles can't fill. None for the default engine for the size
+            of board.
+
+    Returns:
+        tuple: Contains (solutions, solved, searched) where solutions is a new (N, size, size) array of the solved
+            boards, solved is an (N,) array which is True for each board which was solved, and searched is an (N,)
+            array which is True for each board which needed the search.
+    """
+
+    solutions, dead = propagate(boards)
+    filled = (solutions != 0).all(axis=(1, 2))
+    solved = filled & ~dead
+    searched = ~filled & ~dead
+    size = boards.shape[1]
+    for idx in np.flatnonzero(searched):
+        board = Board(solutions[idx].tobytes(), size)
+        if solver.solve(board, engine):
+            solutions[idx] = np.frombuffer(bytes(board.cells), dtype=np.uint8).reshape(size, size)
+            solved[idx] = True
+    return solutions, solved, searched
+
+
+def check_solutions(puzzles, solutions):
+    """
+    Checks that each solution is a solved board which keeps every clue of its puzzle.
+
+    Parameters:
+        puzzles (numpy.ndarray): An (N, size, size) array of puzzles with 0 for empty cells.
+        solutions (numpy.ndarray): An (N, size, size) array of their solutions.
+
+    Returns:
+        numpy.ndarray: An (N,) array which is True for each correct solution.
+    """
+
+    keeps_clues = ((puzzles == 0) | (puzzles == solutions)).all(axis=(1, 2))
+    return keeps_clues & is_solved(solutions)
+
+
+def _read_file(puzzle_file, format):
+    """Reads a puzzle file into a list of puzzles and a list of the solutions given with them, as Boards."""
+    if format != 'csv':
+        return list(formats.read_puzzles(puzzle_file, format)), []
+    puzzles = []
+    solutions = []
+    for puzzle, solution, _ in formats.read_csv(puzzle_file):
+        puzzles.append(puzzle)
+        if solution is not None:
+            solutions.append(solution)
+    return puzzles, solutions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check or solve a file of sudoku puzzles in bulk with NumPy.")
+    parser.add_argument('input', help="file of puzzles, or the puzzle,solution,difficulty lines written by "
+                                      "generator.py; - for standard input; may be compressed with gzip")
+    parser.add_argument('-f', '--format', choices=formats.FORMATS, default=None,
+                        help="format of the input (default: guessed from its name)")
+    parser.add_argument('--engine', default=None, choices=list(solver.ENGINES),
+                        help="solving engine for puzzles singles can't fill")
+    args = parser.parse_args()
+
+    in_file = formats.open_file(args.input)
+    try:
+        puzzle_boards, solution_boards = _read_file(in_file, args.format or formats.guess_format(args.input))
+    finally:
+        if args.input != '-':
+            in_file.close()
+
+    start = time.perf_counter()
+    puzzles = boards_from_boards(puzzle_boards)
+    valid = validate(puzzles)
+    print("{} puzzles, {} break the rules".format(len(puzzles), int((~valid).sum())))
+    if solution_boards:
+        if len(solution_boards) != len(puzzle_boards):
+            raise ValueError("Either every line or no line must have a solution")
+        correct = check_solutions(puzzles, boards_from_boards(solution_boards))
+        print("{} solutions are wrong".format(int((~correct).sum())))
+    else:
+        solutions, solved, searched = solve_batch(puzzles, args.engine)
+        print("{} solved by singles, {} by search, {} unsolvable".format(
+            int((solved & ~searched).sum()), int((solved & searched).sum()), int((~solved).sum())))
+    print("{:.2f}s".format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
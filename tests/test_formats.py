@@ -0,0 +1,26 @@
+import io
+import unittest
+
+from sudoku import formats
+
+
+PUZZLE = '003020600900305001001806400008102900700000008006708200002609500800203009005010300'
+
+
+class BadCharacterTest(unittest.TestCase):
+    def bad_puzzle(self):
+        return PUZZLE[:10] + 'X' + PUZZLE[11:]
+
+    def test_read_puzzles(self):
+        source = io.BytesIO((PUZZLE + '\n' + self.bad_puzzle() + '\n').encode('ascii'))
+        with self.assertRaisesRegex(ValueError, r"Line 2: .* only contain the characters 0123456789 and \."):
+            list(formats.read_puzzles(source, 'line'))
+
+    def test_read_csv(self):
+        source = io.BytesIO(('puzzle,solution\n' + self.bad_puzzle() + ',\n').encode('ascii'))
+        with self.assertRaisesRegex(ValueError, r"Line 2: .* only contain the characters 0123456789 and \."):
+            list(formats.read_csv(source))
+
+
+if __name__ == '__main__':
+    unittest.main()
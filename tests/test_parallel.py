@@ -0,0 +1,39 @@
+import os
+import unittest
+from unittest import mock
+
+from sudoku import parallel, solver
+from sudoku.board import Board
+
+
+PUZZLE = '000000010400000000020000000000050407008000300001090000300400200050100000000806000'
+
+
+def _crash(*args):
+    os._exit(3)
+
+
+def _is_solved(board):
+    return '0' not in board.to_string() and solver.validate_board(board)
+
+
+class ParallelTest(unittest.TestCase):
+    def test_solve(self):
+        board = Board.from_string(PUZZLE)
+        self.assertTrue(parallel.parallel_solve(board, workers=2))
+        self.assertTrue(_is_solved(board))
+
+    def test_one_worker_solves_large_boards_in_process(self):
+        board = Board.from_string('.' * 256)
+        self.assertTrue(parallel.parallel_solve(board, workers=1))
+        self.assertTrue(_is_solved(board))
+
+    def test_crashed_worker_raises(self):
+        # The workers are forked, so they run the patched function.
+        with mock.patch.object(parallel, '_worker', _crash):
+            with self.assertRaisesRegex(RuntimeError, "exited with code 3"):
+                parallel.parallel_count(Board.from_string(PUZZLE), workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import asyncio
+import json
+import unittest
+
+from sudoku import server
+
+
+# A puzzle the naive backtracker takes most of a second to solve.
+SLOW_PUZZLE = '092000060005003100040090000000000510000087000170030840008040000009006205000301000'
+
+
+async def _answer(requests, workers=2):
+    """Sends the requests to a new server at the same time and returns the server and the responses."""
+    solver_server = server.SolverServer(workers=workers)
+    await solver_server.start(port=0)
+    try:
+        responses = await asyncio.gather(*(solver_server.handle(json.dumps(request)) for request in requests))
+    finally:
+        await solver_server.close()
+    return solver_server, responses
+
+
+class CoalescingTest(unittest.TestCase):
+    def test_identical_requests_share_a_run(self):
+        request = {'op': 'solve', 'puzzle': SLOW_PUZZLE, 'engine': 'backtracking', 'timeout': 8}
+        solver_server, responses = asyncio.run(_answer([request, request]))
+        self.assertEqual([response['status'] for response in responses], ['solved', 'solved'])
+        self.assertEqual(solver_server.coalesced, 1)
+
+    def test_longer_request_does_not_share_a_shorter_run(self):
+        short = {'op': 'solve', 'puzzle': SLOW_PUZZLE, 'engine': 'backtracking', 'timeout': 0.1}
+        long = dict(short, timeout=8)
+        solver_server, responses = asyncio.run(_answer([short, long]))
+        self.assertEqual([response['status'] for response in responses], ['timeout', 'solved'])
+        self.assertEqual(solver_server.coalesced, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()